@@ -1,12 +1,40 @@
 #include <LiquidCrystal.h>
+#include "species_table.h"
 
 LiquidCrystal lcd(12, 11, 5, 4, 3, 2);
 
-String msg = "";
+const byte LCD_COLS = 16;
+const byte LCD_ROWS = 2;
+
+// Binary alert frame: 0xA5 | seq | code | flags | crc8(seq, code, flags)
+// Ack frame:          0x5A | seq | crc8(seq)
+const byte FRAME_START = 0xA5;
+const byte ACK_START = 0x5A;
+const byte FRAME_SIZE = 5;
+const byte CODE_NONE = 0x00;
+const byte CODE_UNKNOWN = 0xFF;
+const byte FLAG_ACK_REQUEST = 0x01;
+
+byte frame[FRAME_SIZE];
+byte frameLen = 0;
+bool haveSeq = false;
+byte expectedSeq = 0;
+unsigned long lostFrames = 0;
+unsigned long crcErrors = 0;
+
+// Legacy newline-terminated text alerts (serial_test.py, old hosts).
+// Fixed buffer instead of String so long uptimes never fragment SRAM;
+// characters past the buffer are dropped until the newline.
+char textBuf[LCD_COLS + 1];
+byte textLen = 0;
+
+// What the LCD currently shows, space padded, so only changed cells are rewritten
+char shown[LCD_ROWS][LCD_COLS + 1];
+char target[LCD_ROWS][LCD_COLS + 1];
 
 void setup() {
   Serial.begin(9600);
-  lcd.begin(16, 2);
+  lcd.begin(LCD_COLS, LCD_ROWS);
 
   lcd.setCursor(0, 0);
   lcd.print("Animal Monitor");
@@ -14,41 +42,151 @@ void setup() {
   lcd.print("System Ready...");
   delay(2000);
   lcd.clear();
+
+  for (byte row = 0; row < LCD_ROWS; row++) {
+    memset(shown[row], ' ', LCD_COLS);
+    shown[row][LCD_COLS] = '\0';
+  }
 }
 
 void loop() {
 
   // Check if any message is coming
   while (Serial.available()) {
-    char c = Serial.read();
-
-    if (c == '\n') {
-      msg.trim();
-      handleMessage(msg);
-      msg = ""; 
-    } 
-    else {
-      msg += c;
+    byte c = Serial.read();
+
+    if (frameLen > 0 || (c == FRAME_START && textLen == 0)) {
+      frame[frameLen++] = c;
+      if (frameLen == FRAME_SIZE) {
+        handleFrame();
+        frameLen = 0;
+      }
+    }
+    else if (c == '\n') {
+      textBuf[textLen] = '\0';
+      handleMessage(trim(textBuf));
+      textLen = 0;
+    }
+    else if (textLen < LCD_COLS) {
+      textBuf[textLen++] = (char)c;
     }
   }
 }
 
-void handleMessage(String m) {
+char *trim(char *s) {
+  while (*s == ' ' || *s == '\r' || *s == '\t') s++;
+  byte len = strlen(s);
+  while (len > 0 && (s[len - 1] == ' ' || s[len - 1] == '\r' || s[len - 1] == '\t')) {
+    s[--len] = '\0';
+  }
+  return s;
+}
 
-  lcd.clear();
+byte crc8(const byte *data, byte len) {
+  byte crc = 0;
+  for (byte i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (byte b = 0; b < 8; b++) {
+      crc = (crc & 0x80) ? (byte)((crc << 1) ^ 0x07) : (byte)(crc << 1);
+    }
+  }
+  return crc;
+}
+
+void sendAck(byte seq) {
+  byte ack[3] = { ACK_START, seq, crc8(&seq, 1) };
+  Serial.write(ack, 3);
+}
+
+void handleFrame() {
+  byte seq = frame[1];
+  byte code = frame[2];
+  byte flags = frame[3];
 
-  if (m == "NONE") {
-    lcd.setCursor(0, 0);
-    lcd.print("No Animal");
-    lcd.setCursor(0, 1);
-    lcd.print("Detected");
+  if (crc8(&frame[1], 3) != frame[4]) {
+    crcErrors++;
+    return;  // corrupted: no ack, the host retransmits
+  }
+
+  if (flags & FLAG_ACK_REQUEST) {
+    sendAck(seq);
+  }
+
+  if (haveSeq && seq != expectedSeq) {
+    if (seq == (byte)(expectedSeq - 1)) {
+      return;  // retransmission of the frame already shown
+    }
+    lostFrames += (byte)(seq - expectedSeq);
+  }
+  haveSeq = true;
+  expectedSeq = seq + 1;
+
+  showCode(code);
+}
+
+// Copy a RAM string into a target row, padding with spaces
+void setRow(byte row, const char *text) {
+  byte i = 0;
+  for (; i < LCD_COLS && text[i] != '\0'; i++) target[row][i] = text[i];
+  for (; i < LCD_COLS; i++) target[row][i] = ' ';
+  target[row][LCD_COLS] = '\0';
+}
+
+// Write only the runs of cells that differ from what is shown
+void render() {
+  for (byte row = 0; row < LCD_ROWS; row++) {
+    byte col = 0;
+    while (col < LCD_COLS) {
+      if (target[row][col] == shown[row][col]) {
+        col++;
+        continue;
+      }
+      lcd.setCursor(col, row);
+      while (col < LCD_COLS && target[row][col] != shown[row][col]) {
+        lcd.write(target[row][col]);
+        shown[row][col] = target[row][col];
+        col++;
+      }
+    }
+  }
+}
+
+void showNone() {
+  setRow(0, "No Animal");
+  setRow(1, "Detected");
+  render();
+}
+
+void showSpecies(const char *name) {
+  char line[LCD_COLS + 1] = "Species: ";
+  strncat(line, name, LCD_COLS - strlen(line));
+  setRow(0, "Animal Detected");
+  setRow(1, line);
+  render();
+}
+
+void showCode(byte code) {
+  if (code == CODE_NONE) {
+    showNone();
+    return;
+  }
+  if (code == CODE_UNKNOWN || code > SPECIES_COUNT) {
+    showSpecies("?");
+    return;
+  }
+
+  char name[LCD_COLS + 1];
+  strncpy_P(name, (const char *)pgm_read_word(&SPECIES_NAMES[code]), LCD_COLS);
+  name[LCD_COLS] = '\0';
+  showSpecies(name);
+}
+
+void handleMessage(const char *m) {
+  if (strcmp(m, "NONE") == 0) {
+    showNone();
     return;
   }
 
   // If any animal detected (general case)
-  lcd.setCursor(0, 0);
-  lcd.print("Animal Detected");
-  lcd.setCursor(0, 1);
-  lcd.print("Species: ");
-  lcd.print(m);
-}
\ No newline at end of file
+  showSpecies(m);
+}
@@ -0,0 +1,177 @@
+// Generated from coco.names by vehicle_animal_detection.src.alerts.protocol.
+// Do not edit by hand; regenerate with:
+//   python -m vehicle_animal_detection.src.alerts.protocol <coco.names> <species_table.h>
+#ifndef SPECIES_TABLE_H
+#define SPECIES_TABLE_H
+
+#include <avr/pgmspace.h>
+
+#define SPECIES_COUNT 80
+
+const char SPECIES_1[] PROGMEM = "PERSON";
+const char SPECIES_2[] PROGMEM = "BICYCLE";
+const char SPECIES_3[] PROGMEM = "CAR";
+const char SPECIES_4[] PROGMEM = "MOTORBIKE";
+const char SPECIES_5[] PROGMEM = "AEROPLANE";
+const char SPECIES_6[] PROGMEM = "BUS";
+const char SPECIES_7[] PROGMEM = "TRAIN";
+const char SPECIES_8[] PROGMEM = "TRUCK";
+const char SPECIES_9[] PROGMEM = "BOAT";
+const char SPECIES_10[] PROGMEM = "TRAFFIC LIGHT";
+const char SPECIES_11[] PROGMEM = "FIRE HYDRANT";
+const char SPECIES_12[] PROGMEM = "STOP SIGN";
+const char SPECIES_13[] PROGMEM = "PARKING METER";
+const char SPECIES_14[] PROGMEM = "BENCH";
+const char SPECIES_15[] PROGMEM = "BIRD";
+const char SPECIES_16[] PROGMEM = "CAT";
+const char SPECIES_17[] PROGMEM = "DOG";
+const char SPECIES_18[] PROGMEM = "HORSE";
+const char SPECIES_19[] PROGMEM = "SHEEP";
+const char SPECIES_20[] PROGMEM = "COW";
+const char SPECIES_21[] PROGMEM = "ELEPHANT";
+const char SPECIES_22[] PROGMEM = "BEAR";
+const char SPECIES_23[] PROGMEM = "ZEBRA";
+const char SPECIES_24[] PROGMEM = "GIRAFFE";
+const char SPECIES_25[] PROGMEM = "BACKPACK";
+const char SPECIES_26[] PROGMEM = "UMBRELLA";
+const char SPECIES_27[] PROGMEM = "HANDBAG";
+const char SPECIES_28[] PROGMEM = "TIE";
+const char SPECIES_29[] PROGMEM = "SUITCASE";
+const char SPECIES_30[] PROGMEM = "FRISBEE";
+const char SPECIES_31[] PROGMEM = "SKIS";
+const char SPECIES_32[] PROGMEM = "SNOWBOARD";
+const char SPECIES_33[] PROGMEM = "SPORTS BALL";
+const char SPECIES_34[] PROGMEM = "KITE";
+const char SPECIES_35[] PROGMEM = "BASEBALL BAT";
+const char SPECIES_36[] PROGMEM = "BASEBALL GLOVE";
+const char SPECIES_37[] PROGMEM = "SKATEBOARD";
+const char SPECIES_38[] PROGMEM = "SURFBOARD";
+const char SPECIES_39[] PROGMEM = "TENNIS RACKET";
+const char SPECIES_40[] PROGMEM = "BOTTLE";
+const char SPECIES_41[] PROGMEM = "WINE GLASS";
+const char SPECIES_42[] PROGMEM = "CUP";
+const char SPECIES_43[] PROGMEM = "FORK";
+const char SPECIES_44[] PROGMEM = "KNIFE";
+const char SPECIES_45[] PROGMEM = "SPOON";
+const char SPECIES_46[] PROGMEM = "BOWL";
+const char SPECIES_47[] PROGMEM = "BANANA";
+const char SPECIES_48[] PROGMEM = "APPLE";
+const char SPECIES_49[] PROGMEM = "SANDWICH";
+const char SPECIES_50[] PROGMEM = "ORANGE";
+const char SPECIES_51[] PROGMEM = "BROCCOLI";
+const char SPECIES_52[] PROGMEM = "CARROT";
+const char SPECIES_53[] PROGMEM = "HOT DOG";
+const char SPECIES_54[] PROGMEM = "PIZZA";
+const char SPECIES_55[] PROGMEM = "DONUT";
+const char SPECIES_56[] PROGMEM = "CAKE";
+const char SPECIES_57[] PROGMEM = "CHAIR";
+const char SPECIES_58[] PROGMEM = "SOFA";
+const char SPECIES_59[] PROGMEM = "POTTEDPLANT";
+const char SPECIES_60[] PROGMEM = "BED";
+const char SPECIES_61[] PROGMEM = "DININGTABLE";
+const char SPECIES_62[] PROGMEM = "TOILET";
+const char SPECIES_63[] PROGMEM = "TVMONITOR";
+const char SPECIES_64[] PROGMEM = "LAPTOP";
+const char SPECIES_65[] PROGMEM = "MOUSE";
+const char SPECIES_66[] PROGMEM = "REMOTE";
+const char SPECIES_67[] PROGMEM = "KEYBOARD";
+const char SPECIES_68[] PROGMEM = "CELL PHONE";
+const char SPECIES_69[] PROGMEM = "MICROWAVE";
+const char SPECIES_70[] PROGMEM = "OVEN";
+const char SPECIES_71[] PROGMEM = "TOASTER";
+const char SPECIES_72[] PROGMEM = "SINK";
+const char SPECIES_73[] PROGMEM = "REFRIGERATOR";
+const char SPECIES_74[] PROGMEM = "BOOK";
+const char SPECIES_75[] PROGMEM = "CLOCK";
+const char SPECIES_76[] PROGMEM = "VASE";
+const char SPECIES_77[] PROGMEM = "SCISSORS";
+const char SPECIES_78[] PROGMEM = "TEDDY BEAR";
+const char SPECIES_79[] PROGMEM = "HAIR DRIER";
+const char SPECIES_80[] PROGMEM = "TOOTHBRUSH";
+
+// Index 0 is unused: code 0 means NONE
+const char* const SPECIES_NAMES[SPECIES_COUNT + 1] PROGMEM = {
+  0,
+  SPECIES_1,
+  SPECIES_2,
+  SPECIES_3,
+  SPECIES_4,
+  SPECIES_5,
+  SPECIES_6,
+  SPECIES_7,
+  SPECIES_8,
+  SPECIES_9,
+  SPECIES_10,
+  SPECIES_11,
+  SPECIES_12,
+  SPECIES_13,
+  SPECIES_14,
+  SPECIES_15,
+  SPECIES_16,
+  SPECIES_17,
+  SPECIES_18,
+  SPECIES_19,
+  SPECIES_20,
+  SPECIES_21,
+  SPECIES_22,
+  SPECIES_23,
+  SPECIES_24,
+  SPECIES_25,
+  SPECIES_26,
+  SPECIES_27,
+  SPECIES_28,
+  SPECIES_29,
+  SPECIES_30,
+  SPECIES_31,
+  SPECIES_32,
+  SPECIES_33,
+  SPECIES_34,
+  SPECIES_35,
+  SPECIES_36,
+  SPECIES_37,
+  SPECIES_38,
+  SPECIES_39,
+  SPECIES_40,
+  SPECIES_41,
+  SPECIES_42,
+  SPECIES_43,
+  SPECIES_44,
+  SPECIES_45,
+  SPECIES_46,
+  SPECIES_47,
+  SPECIES_48,
+  SPECIES_49,
+  SPECIES_50,
+  SPECIES_51,
+  SPECIES_52,
+  SPECIES_53,
+  SPECIES_54,
+  SPECIES_55,
+  SPECIES_56,
+  SPECIES_57,
+  SPECIES_58,
+  SPECIES_59,
+  SPECIES_60,
+  SPECIES_61,
+  SPECIES_62,
+  SPECIES_63,
+  SPECIES_64,
+  SPECIES_65,
+  SPECIES_66,
+  SPECIES_67,
+  SPECIES_68,
+  SPECIES_69,
+  SPECIES_70,
+  SPECIES_71,
+  SPECIES_72,
+  SPECIES_73,
+  SPECIES_74,
+  SPECIES_75,
+  SPECIES_76,
+  SPECIES_77,
+  SPECIES_78,
+  SPECIES_79,
+  SPECIES_80,
+};
+
+#endif
@@ -0,0 +1,2 @@
+# Scripts that talk to real hardware or check the installed toolchain, not tests
+collect_ignore = ['test_setup.py', 'vehicle_animal_detection/src/gui/serial_test.py']
@@ -1,4 +1,34 @@
-from . import constants
-from . import viz_fx
-from . import preprocessing
-from . import models
\ No newline at end of file
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562), so `import src` or
+# `from src.export import TFLiteModel` does not pull in TensorFlow, plotly or sklearn.
+_SUBMODULES = (
+    'constants',
+    'viz_fx',
+    'preprocessing',
+    'models',
+    'features',
+    'datastore',
+    'runner',
+    'sweep',
+    'export',
+    'compression',
+    'evaluation',
+    'xla',
+    'experiments',
+    'importtime',
+)
+
+__all__ = list(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        module = importlib.import_module(f'.{name}', __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
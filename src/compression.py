@@ -0,0 +1,334 @@
+import os
+import numpy as np
+import tensorflow as tf
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from tensorflow import keras
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import (Input, Dense, MaxPooling2D, BatchNormalization, Dropout,
+                                     Conv2D, GlobalAveragePooling2D)
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import EarlyStopping
+
+from src.constants import INPUT_SHAPE
+from src.experiments import record_result
+from src.export import as_model_input, benchmark_latency
+from src.preprocessing import make_tf_dataset
+
+_EPS = 1e-7
+
+# Student widths tried by compress_to_budget, smallest first
+STUDENT_CANDIDATES = [
+    {'filters': (8, 16, 32), 'dense_units': 32},
+    {'filters': (16, 32, 64), 'dense_units': 64},
+    {'filters': (24, 48, 96), 'dense_units': 128},
+]
+
+
+def build_student_model(input_shape: tuple = INPUT_SHAPE,
+                        filters: Sequence[int] = (16, 32, 64),
+                        dense_units: int = 64,
+                        convs_per_block: int = 1) -> Sequential:
+    """
+    Builds a narrower version of the build_cnn_model architecture to be trained by distillation.
+
+    Args:
+        input_shape (tuple): The shape of the input data (height, width, channels).
+        filters (Sequence[int]): Filters of each convolutional block.
+        dense_units (int): Units of the hidden Dense layer.
+        convs_per_block (int): Conv2D + BatchNormalization pairs per block.
+
+    Returns:
+        Sequential: Uncompiled student model with a sigmoid output.
+    """
+
+    model = Sequential()
+    model.add(Input(shape=input_shape, name="Input Layer"))
+    for block, n_filters in enumerate(filters, start=1):
+        for conv in range(1, convs_per_block + 1):
+            model.add(Conv2D(filters=n_filters, kernel_size=(3, 3), padding="same", activation='relu',
+                             name=f"block{block}_conv{conv}"))
+            model.add(BatchNormalization())
+        model.add(MaxPooling2D(pool_size=(2, 2), padding="valid", name=f"block{block}_maxpool"))
+        model.add(Dropout(0.2))
+    model.add(GlobalAveragePooling2D())
+    model.add(Dense(units=dense_units, activation='relu'))
+    model.add(Dropout(0.3))
+    model.add(Dense(units=1, activation='sigmoid'))
+
+    return model
+
+
+def _logit(p: tf.Tensor) -> tf.Tensor:
+    p = tf.clip_by_value(p, _EPS, 1 - _EPS)
+    return tf.math.log(p) - tf.math.log1p(-p)
+
+
+def make_distillation_loss(alpha: float = 0.5, temperature: float = 4.0) -> Any:
+    """
+    Distillation loss for sigmoid models: alpha * BCE(labels) + (1 - alpha) * T^2 * BCE between
+    the temperature-softened teacher and student probabilities.
+
+    Labels are packed as (label, teacher_logit) pairs, see pack_teacher_targets.
+
+    Args:
+        alpha (float): Weight of the hard-label loss.
+        temperature (float): Softening temperature.
+
+    Returns:
+        Any: Keras-compatible loss function.
+    """
+
+    def distillation_loss(y_pack: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
+        y_true = y_pack[:, :1]
+        teacher_logit = y_pack[:, 1:2]
+        y_pred = tf.clip_by_value(y_pred, _EPS, 1 - _EPS)
+        hard = keras.losses.binary_crossentropy(y_true, y_pred)
+        soft_teacher = tf.sigmoid(teacher_logit / temperature)
+        soft_student = tf.sigmoid(_logit(y_pred) / temperature)
+        soft = keras.losses.binary_crossentropy(soft_teacher, soft_student) * temperature ** 2
+        return alpha * hard + (1 - alpha) * soft
+
+    return distillation_loss
+
+
+def packed_accuracy(y_pack: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
+    return tf.reduce_mean(tf.cast(tf.equal(tf.cast(y_pred > 0.5, tf.float32), y_pack[:, :1]), tf.float32))
+
+
+def pack_teacher_targets(teacher: keras.Model, X: np.ndarray, y: np.ndarray, batch_size: int = 256) -> np.ndarray:
+    """
+    Run the teacher once over the data and pack (label, teacher_logit) targets for distillation.
+
+    Args:
+        teacher (keras.Model): Trained teacher with a sigmoid output.
+        X (np.ndarray): Images (uint8 or normalized).
+        y (np.ndarray): Binary labels.
+        batch_size (int): Inference batch size.
+
+    Returns:
+        np.ndarray: float32 array of shape (num_samples, 2).
+    """
+
+    logits = []
+    for start in range(0, len(X), batch_size):
+        probs = teacher(as_model_input(X[start:start + batch_size]), training=False)
+        logits.append(_logit(tf.reshape(probs, (-1,))).numpy())
+    return np.stack([np.asarray(y, dtype=np.float32).reshape(-1), np.concatenate(logits)], axis=1)
+
+
+def distill(student: keras.Model,
+            train_targets: Tuple[np.ndarray, np.ndarray],
+            val_targets: Tuple[np.ndarray, np.ndarray],
+            epochs: int = 30,
+            learning_rate: float = 1e-3,
+            alpha: float = 0.5,
+            temperature: float = 4.0,
+            early_stop_patience: int = 5) -> keras.Model:
+    """
+    Train a student on (images, packed targets) with the distillation loss.
+
+    Args:
+        student (keras.Model): Student (or pruned teacher) with a sigmoid output.
+        train_targets (Tuple[np.ndarray, np.ndarray]): Training images and pack_teacher_targets output.
+        val_targets (Tuple[np.ndarray, np.ndarray]): Validation images and packed targets.
+        epochs (int): Maximum number of epochs.
+        learning_rate (float): Adam learning rate.
+        alpha (float): Weight of the hard-label loss.
+        temperature (float): Softening temperature.
+        early_stop_patience (int): Patience for early stopping on val_loss.
+
+    Returns:
+        keras.Model: The trained student, recompiled with the standard loss and metrics.
+    """
+
+    student.compile(loss=make_distillation_loss(alpha, temperature),
+                    optimizer=Adam(learning_rate=learning_rate),
+                    metrics=[packed_accuracy])
+    train_ds = make_tf_dataset(*train_targets, training=True)
+    val_ds = make_tf_dataset(*val_targets, training=False)
+    student.fit(train_ds, validation_data=val_ds, epochs=epochs, verbose=1,
+                callbacks=[EarlyStopping(monitor='val_loss', patience=early_stop_patience, restore_best_weights=True)])
+
+    student.compile(loss='binary_crossentropy', optimizer=Adam(learning_rate=learning_rate),
+                    metrics=['accuracy', 'precision'])
+    return student
+
+
+def prune_cnn_filters(model: Sequential, keep_ratio: float = 0.5, prune_dense: bool = True) -> Sequential:
+    """
+    Structured L1-norm pruning of a build_cnn_model-style Sequential network: keep the strongest
+    Conv2D filters (and hidden Dense units) and rebuild a genuinely smaller dense model, which
+    reduces CPU latency unlike sparse weight masks.
+
+    Args:
+        model (Sequential): Trained model made of Conv2D, BatchNormalization, MaxPooling2D, Dropout,
+                            GlobalAveragePooling2D and Dense layers.
+        keep_ratio (float): Fraction of filters/units kept in every pruned layer.
+        prune_dense (bool): Also prune hidden Dense units (never the output layer).
+
+    Returns:
+        Sequential: Uncompiled pruned model initialized with the kept weights.
+    """
+
+    dense_layers = [layer for layer in model.layers if isinstance(layer, Dense)]
+    pruned = Sequential()
+    pruned.add(Input(shape=model.input_shape[1:], name="Input Layer"))
+    weights = []
+    keep = None  # indices of the channels/units kept from the previous layer
+
+    for layer in model.layers:
+        config = layer.get_config()
+        if isinstance(layer, Conv2D):
+            kernel, bias = layer.get_weights()
+            if keep is not None:
+                kernel = kernel[:, :, keep, :]
+            n_keep = max(1, int(round(kernel.shape[-1] * keep_ratio)))
+            keep = np.sort(np.argsort(-np.abs(kernel).sum(axis=(0, 1, 2)))[:n_keep])
+            config['filters'] = n_keep
+            weights.append([kernel[..., keep], bias[keep]])
+        elif isinstance(layer, BatchNormalization):
+            weights.append([w[keep] for w in layer.get_weights()])
+        elif isinstance(layer, Dense):
+            kernel, bias = layer.get_weights()
+            if keep is not None:
+                kernel = kernel[keep, :]
+            if prune_dense and layer is not dense_layers[-1]:
+                n_keep = max(1, int(round(kernel.shape[1] * keep_ratio)))
+                keep = np.sort(np.argsort(-np.abs(kernel).sum(axis=0))[:n_keep])
+                config['units'] = n_keep
+                kernel, bias = kernel[:, keep], bias[keep]
+            else:
+                keep = None
+            weights.append([kernel, bias])
+        else:
+            weights.append(None)
+        pruned.add(layer.__class__.from_config(config))
+
+    for new_layer, layer_weights in zip(pruned.layers, weights):
+        if layer_weights is not None:
+            new_layer.set_weights(layer_weights)
+
+    return pruned
+
+
+def measure_crop_latency(model: keras.Model, batch_sizes: Sequence[int] = (1, 32), n_iter: int = 100) -> Dict[str, float]:
+    """
+    Per-crop CPU inference time of a classifier, as called by the crop classifier.
+
+    Args:
+        model (keras.Model): Model taking 32x32x3 inputs.
+        batch_sizes (Sequence[int]): Batch sizes to measure; per-crop time is latency / batch size.
+        n_iter (int): Timed iterations per batch size.
+
+    Returns:
+        Dict[str, float]: 'crop_ms_b<batch>' -> milliseconds per crop.
+    """
+
+    images = np.random.default_rng(0).random((max(batch_sizes), *model.input_shape[1:]), dtype=np.float32)
+    rows = benchmark_latency(lambda batch: model(batch, training=False), images, batch_sizes, n_iter)
+    return {f"crop_ms_b{row['Batch Size']}": row['Latency Mean (ms)'] / row['Batch Size'] for row in rows}
+
+
+def _evaluate(model: keras.Model, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, float]:
+    loss, accuracy, precision = model.evaluate(make_tf_dataset(X_test, y_test, training=False), verbose=0)[:3]
+    return {'loss': loss, 'accuracy': accuracy * 100, 'precision': precision * 100}
+
+
+def compress_to_budget(teacher: keras.Model,
+                       teacher_name: str,
+                       X_train: np.ndarray,
+                       y_train: np.ndarray,
+                       X_val: np.ndarray,
+                       y_val: np.ndarray,
+                       X_test: np.ndarray,
+                       y_test: np.ndarray,
+                       latency_budget_ms: float,
+                       max_accuracy_drop: float = 1.0,
+                       students: Optional[List[dict]] = None,
+                       prune_ratios: Sequence[float] = (0.75, 0.5, 0.25),
+                       epochs: int = 30,
+                       results_file: str = 'Results/test_metrics.csv',
+                       out_dir: str = 'models/classification_model/compressed') -> Optional[dict]:
+    """
+    Distill (and, for build_cnn_model teachers, prune) a trained classifier into smaller students,
+    then pick the smallest one that meets a per-crop CPU latency budget while keeping test accuracy
+    within max_accuracy_drop points of the teacher.
+
+    Every candidate is logged to the experiment store with its test metrics, per-crop latency and size;
+    the columns the results CSV already has are appended to it as well.
+
+    Args:
+        teacher (keras.Model): Trained teacher from src.models.
+        teacher_name (str): Name of the teacher in the report.
+        X_train (np.ndarray): Training images.
+        y_train (np.ndarray): Training binary labels.
+        X_val (np.ndarray): Validation images.
+        y_val (np.ndarray): Validation binary labels.
+        X_test (np.ndarray): Test images.
+        y_test (np.ndarray): Test binary labels.
+        latency_budget_ms (float): Maximum single-crop (batch 1) inference time in milliseconds.
+        max_accuracy_drop (float): Allowed test accuracy loss in percentage points.
+        students (Optional[List[dict]]): build_student_model arguments to try (default STUDENT_CANDIDATES).
+        prune_ratios (Sequence[float]): Filter keep ratios for pruned copies of a Sequential CNN teacher.
+        epochs (int): Maximum distillation epochs per candidate.
+        results_file (str): Results CSV to append to.
+        out_dir (str): Directory where candidate models are saved.
+
+    Returns:
+        Optional[dict]: The selected candidate (name, path, metrics, latency), or None if none qualifies.
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    def log(name: str, model: keras.Model, description: str) -> dict:
+        metrics = _evaluate(model, X_test, y_test)
+        latency = measure_crop_latency(model)
+        row = {
+            'Model': name,
+            'Test Loss': round(metrics['loss'], 3),
+            'Test Accuracy': round(metrics['accuracy'], 3),
+            'Test Precision': round(metrics['precision'], 3),
+            'Crop Latency b1 (ms)': round(latency['crop_ms_b1'], 4),
+            'Crop Latency b32 (ms)': round(latency['crop_ms_b32'], 4),
+            'Params': model.count_params(),
+            'Description': description
+        }
+        record_result(results_file, row)
+        print(f"{name}: accuracy {row['Test Accuracy']:.2f}%, {row['Crop Latency b1 (ms)']:.3f} ms/crop, "
+              f"{row['Params']} params")
+        return row
+
+    teacher_row = log(teacher_name, teacher, 'teacher')
+    train_targets = (X_train, pack_teacher_targets(teacher, X_train, y_train))
+    val_targets = (X_val, pack_teacher_targets(teacher, X_val, y_val))
+
+    candidates = []
+    for config in students or STUDENT_CANDIDATES:
+        name = f"{teacher_name} student {'-'.join(map(str, config['filters']))}/{config['dense_units']}"
+        student = distill(build_student_model(**config), train_targets, val_targets, epochs=epochs)
+        candidates.append((name, student, f"distilled from {teacher_name}: {config}"))
+
+    if isinstance(teacher, Sequential):
+        for ratio in prune_ratios:
+            pruned = distill(prune_cnn_filters(teacher, ratio), train_targets, val_targets, epochs=epochs,
+                             learning_rate=1e-4)
+            candidates.append((f"{teacher_name} pruned {int(ratio * 100)}%", pruned,
+                               f"L1 filter pruning keeping {ratio:.0%}, fine-tuned by distillation"))
+
+    selected = None
+    for name, model, description in candidates:
+        row = log(name, model, description)
+        row['path'] = os.path.join(out_dir, name.replace(' ', '_').replace('/', '_') + '.keras')
+        model.save(row['path'])
+        meets_budget = row['Crop Latency b1 (ms)'] <= latency_budget_ms
+        meets_accuracy = row['Test Accuracy'] >= teacher_row['Test Accuracy'] - max_accuracy_drop
+        if meets_budget and meets_accuracy and (selected is None or row['Params'] < selected['Params']):
+            selected = row
+
+    if selected is None:
+        print(f"No candidate meets {latency_budget_ms} ms/crop within {max_accuracy_drop} accuracy points")
+    else:
+        print(f"Selected {selected['Model']} ({selected['path']})")
+
+    return selected
@@ -0,0 +1,244 @@
+import os
+import json
+import numpy as np
+
+from typing import Dict, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from src.constants import BINARY_LABELS, BATCH_SIZE, SEED
+
+if TYPE_CHECKING:
+    import tensorflow as tf
+
+_RESCALE = np.float32(1. / 255)
+
+
+def make_label_lut(mapping: Dict[int, int] = BINARY_LABELS, fill: int = -1) -> np.ndarray:
+    """
+    Turn a label dictionary into a lookup table so labels can be mapped with one indexing operation.
+
+    Args:
+        mapping (Dict[int, int]): Original label -> new label.
+        fill (int): Value for labels missing from the mapping.
+
+    Returns:
+        np.ndarray: Array where lut[original] = new label.
+    """
+
+    lut = np.full(max(mapping) + 1, fill, dtype=np.int64)
+    lut[list(mapping.keys())] = list(mapping.values())
+    return lut
+
+
+def normalize_chunked(X: np.ndarray, out: Optional[np.ndarray] = None, chunk_size: int = 4096) -> np.ndarray:
+    """
+    Scale uint8 images to float32 [0, 1] chunk by chunk, without float64 temporaries.
+
+    Args:
+        X (np.ndarray): Images (may be a memory map).
+        out (Optional[np.ndarray]): Preallocated float32 destination (array or memory map).
+                                    A new array is allocated when None.
+        chunk_size (int): Number of images converted per step.
+
+    Returns:
+        np.ndarray: The normalized float32 images.
+    """
+
+    if out is None:
+        out = np.empty(X.shape, dtype=np.float32)
+    for start in range(0, X.shape[0], chunk_size):
+        stop = start + chunk_size
+        np.multiply(X[start:stop], _RESCALE, out=out[start:stop], dtype=np.float32)
+    return out
+
+
+def stratified_split(labels: np.ndarray, test_size: float = 0.1, seed: int = SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stratified train/validation split computed on the labels only, returning indices.
+
+    Args:
+        labels (np.ndarray): Labels of every sample (small enough to hold in RAM).
+        test_size (float): Fraction of each class sent to the validation split.
+        seed (int): Random seed.
+
+    Returns:
+        tuple: A tuple containing:
+               - train_idx (np.ndarray): Sorted training indices.
+               - val_idx (np.ndarray): Sorted validation indices.
+    """
+
+    rng = np.random.default_rng(seed)
+    train_idx, val_idx = [], []
+    for label in np.unique(labels):
+        idx = np.flatnonzero(labels == label)
+        rng.shuffle(idx)
+        n_val = int(round(len(idx) * test_size))
+        val_idx.append(idx[:n_val])
+        train_idx.append(idx[n_val:])
+    return np.sort(np.concatenate(train_idx)), np.sort(np.concatenate(val_idx))
+
+
+class DatasetStore:
+    """
+    Image dataset kept on disk as memory-mapped uint8 images plus labels.
+
+    Layout of ``root``: ``X.npy`` (num_samples, height, width, channels) uint8,
+    ``y.npy`` (num_samples,) int64 and ``meta.json``.
+    """
+
+    def __init__(self, root: str, mode: str = 'r') -> None:
+        self.root = root
+        self.X = np.load(os.path.join(root, 'X.npy'), mmap_mode=mode)
+        self.y = np.load(os.path.join(root, 'y.npy'), mmap_mode=mode)
+        with open(os.path.join(root, 'meta.json')) as f:
+            self.meta = json.load(f)
+
+    def __len__(self) -> int:
+        return self.X.shape[0]
+
+    @classmethod
+    def create(cls, root: str, num_samples: int, image_shape: tuple, meta: Optional[dict] = None) -> 'DatasetStore':
+        """Preallocate an empty store to be filled with ``write``."""
+        os.makedirs(root, exist_ok=True)
+        np.lib.format.open_memmap(os.path.join(root, 'X.npy'), mode='w+', dtype=np.uint8,
+                                  shape=(num_samples, *image_shape)).flush()
+        np.lib.format.open_memmap(os.path.join(root, 'y.npy'), mode='w+', dtype=np.int64,
+                                  shape=(num_samples,)).flush()
+        with open(os.path.join(root, 'meta.json'), 'w') as f:
+            json.dump({'num_samples': num_samples, 'image_shape': list(image_shape), **(meta or {})}, f)
+        return cls(root, mode='r+')
+
+    @classmethod
+    def from_chunks(cls, root: str, chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+                    num_samples: int, image_shape: tuple) -> 'DatasetStore':
+        """Build a store from an iterator of (images, labels) chunks, e.g. crops read from disk."""
+        store = cls.create(root, num_samples, image_shape)
+        start = 0
+        for X_chunk, y_chunk in chunks:
+            store.write(start, X_chunk, y_chunk)
+            start += len(X_chunk)
+        store.flush()
+        return cls(root)
+
+    @classmethod
+    def from_arrays(cls, root: str, X: np.ndarray, y: np.ndarray, chunk_size: int = 4096) -> 'DatasetStore':
+        chunks = ((X[i:i + chunk_size], y[i:i + chunk_size]) for i in range(0, len(X), chunk_size))
+        return cls.from_chunks(root, chunks, len(X), X.shape[1:])
+
+    def write(self, start: int, X_chunk: np.ndarray, y_chunk: np.ndarray) -> None:
+        self.X[start:start + len(X_chunk)] = X_chunk
+        self.y[start:start + len(y_chunk)] = np.asarray(y_chunk).flatten()
+
+    def flush(self) -> None:
+        self.X.flush()
+        self.y.flush()
+
+    def binary_labels(self, mapping: Dict[int, int] = BINARY_LABELS) -> np.ndarray:
+        """Map all labels through a lookup table (vehicle 0 / animal 1 by default)."""
+        return make_label_lut(mapping)[self.y]
+
+    def view(self, indices: Optional[np.ndarray] = None, binary: bool = True) -> 'DatasetView':
+        labels = self.binary_labels() if binary else np.asarray(self.y)
+        return DatasetView(self, np.arange(len(self)) if indices is None else indices, labels)
+
+    def train_splitting(self, test_size: float = 0.1, seed: int = SEED) -> Tuple['DatasetView', 'DatasetView']:
+        """
+        Streaming counterpart of preprocessing.train_splitting: a stratified split that only
+        touches the labels and returns views over the memory-mapped images.
+
+        Args:
+            test_size (float): The proportion of the dataset to include in the validation set.
+            seed (int): Random seed.
+
+        Returns:
+            tuple: A tuple containing:
+                   - train_view (DatasetView): The training split.
+                   - val_view (DatasetView): The validation split.
+        """
+
+        labels = self.binary_labels()
+        train_idx, val_idx = stratified_split(labels, test_size, seed)
+
+        print("=" * 60)
+        print(f"Training split: {len(train_idx)} samples ({len(train_idx) * 100 / len(self):.0f}%)")
+        print(f"Validation split: {len(val_idx)} samples ({len(val_idx) * 100 / len(self):.0f}%)")
+        print("=" * 60)
+
+        return DatasetView(self, train_idx, labels), DatasetView(self, val_idx, labels)
+
+
+class DatasetView:
+    """A subset of a DatasetStore that is read in normalized float32 batches."""
+
+    def __init__(self, store: DatasetStore, indices: np.ndarray, labels: np.ndarray) -> None:
+        self.store = store
+        self.indices = np.asarray(indices)
+        self.labels = labels
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.labels[self.indices]
+
+    def iter_batches(self, batch_size: int = BATCH_SIZE, shuffle: bool = False, seed: int = SEED,
+                     normalize: bool = True) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (images, labels) batches read from the memory map; only one batch is in RAM at a time.
+
+        Args:
+            batch_size (int): Batch size.
+            shuffle (bool): Shuffle sample order.
+            seed (int): Seed for shuffling.
+            normalize (bool): Return float32 images in [0, 1] instead of uint8.
+        """
+
+        order = self.indices.copy()
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for start in range(0, len(order), batch_size):
+            # Sorted reads keep memory-map access sequential
+            batch_idx = np.sort(order[start:start + batch_size])
+            images = self.store.X[batch_idx]
+            if normalize:
+                images = normalize_chunked(images)
+            yield images, self.labels[batch_idx]
+
+    def to_tf_dataset(self, training: bool, batch_size: int = BATCH_SIZE, seed: int = SEED) -> 'tf.data.Dataset':
+        """
+        tf.data pipeline over the view, with the same augmentation as preprocessing.make_tf_dataset.
+
+        Args:
+            training (bool): If True, reshuffle every epoch and augment.
+            batch_size (int): Batch size.
+            seed (int): Seed for shuffling and augmentation.
+
+        Returns:
+            tf.data.Dataset: Dataset of (images, labels) batches for model.fit/evaluate,
+                             with the view's labels kept on it as ``y``.
+        """
+
+        import tensorflow as tf
+        from src.preprocessing import _augment_batch
+
+        epoch = [0]
+
+        def generator():
+            epoch[0] += 1
+            yield from self.iter_batches(batch_size, shuffle=training, seed=seed + epoch[0])
+
+        height, width, channels = self.store.X.shape[1:]
+        dataset = tf.data.Dataset.from_generator(generator, output_signature=(
+            tf.TensorSpec(shape=(None, height, width, channels), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int64)
+        ))
+        if training:
+            batch_seeds = tf.data.Dataset.random(seed=seed, rerandomize_each_iteration=True).batch(2)
+            dataset = tf.data.Dataset.zip((dataset, batch_seeds)).map(
+                lambda batch, batch_seed: (_augment_batch(batch[0], batch_seed), batch[1]),
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=True
+            )
+        dataset = dataset.prefetch(tf.data.AUTOTUNE)
+        dataset.y = self.y
+        return dataset
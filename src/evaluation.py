@@ -0,0 +1,154 @@
+import hashlib
+import numpy as np
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.constants import BATCH_SIZE
+from src.datastore import normalize_chunked
+
+_EPS = 1e-7
+_MAX_CACHED = 8
+
+# (weights hash, dataset hash) -> predicted probabilities, most recently used last
+_prediction_cache: 'OrderedDict[Tuple[str, str], np.ndarray]' = OrderedDict()
+
+
+def weights_hash(model: Any) -> str:
+    """Fingerprint of a model's architecture name and current weights."""
+    digest = hashlib.sha1(model.name.encode())
+    for weights in model.get_weights():
+        digest.update(str(weights.shape).encode())
+        digest.update(np.ascontiguousarray(weights).data)
+    return digest.hexdigest()
+
+
+def dataset_hash(X: np.ndarray) -> str:
+    """Fingerprint of an image array (shape, dtype and content)."""
+    digest = hashlib.sha1(f'{X.shape}{X.dtype}'.encode())
+    digest.update(np.ascontiguousarray(X).data)
+    return digest.hexdigest()
+
+
+def predict_streaming(model: Any, X: np.ndarray, batch_size: int = BATCH_SIZE, rescale: bool = True,
+                      jit_compile: bool = False) -> np.ndarray:
+    """
+    Predict probabilities in one pass over X, normalizing each batch into a reused float32 buffer.
+
+    Args:
+        model (Any): Keras model with a sigmoid output.
+        X (np.ndarray): Images (uint8 when rescale is True).
+        batch_size (int): Inference batch size.
+        rescale (bool): If True, scale pixel values by 1./255 like the test ImageDataGenerator.
+        jit_compile (bool): Run batches through an XLA-compiled fixed-shape CompiledPredictor.
+
+    Returns:
+        np.ndarray: Predicted probabilities, shape (num_samples,).
+    """
+
+    if jit_compile:
+        from src.xla import CompiledPredictor
+        predict = CompiledPredictor(model, batch_size)
+    else:
+        predict = model.predict_on_batch
+    buffer = np.empty((batch_size, *X.shape[1:]), dtype=np.float32)
+    probs = np.empty(len(X), dtype=np.float32)
+    for start in range(0, len(X), batch_size):
+        chunk = X[start:start + batch_size]
+        batch = buffer[:len(chunk)]
+        if rescale:
+            normalize_chunked(chunk, out=batch)
+        else:
+            batch[...] = chunk
+        probs[start:start + len(chunk)] = np.asarray(predict(batch)).reshape(-1)
+    return probs
+
+
+def predict_cached(model: Any, X: np.ndarray, batch_size: int = BATCH_SIZE, rescale: bool = True,
+                   jit_compile: bool = False) -> np.ndarray:
+    """
+    predict_streaming with a cache keyed by the model weights and the dataset, so evaluation
+    and the plotting functions share a single inference pass.
+
+    Args:
+        model (Any): Keras model with a sigmoid output.
+        X (np.ndarray): Images.
+        batch_size (int): Inference batch size.
+        rescale (bool): If True, scale pixel values by 1./255.
+        jit_compile (bool): Use XLA-compiled inference on a cache miss.
+
+    Returns:
+        np.ndarray: Predicted probabilities, shape (num_samples,).
+    """
+
+    key = (weights_hash(model), f'{dataset_hash(X)}:{rescale}')
+    if key in _prediction_cache:
+        _prediction_cache.move_to_end(key)
+        return _prediction_cache[key]
+
+    probs = predict_streaming(model, X, batch_size, rescale, jit_compile)
+    _prediction_cache[key] = probs
+    while len(_prediction_cache) > _MAX_CACHED:
+        _prediction_cache.popitem(last=False)
+    return probs
+
+
+def clear_prediction_cache() -> None:
+    _prediction_cache.clear()
+
+
+def binary_metrics(y_true: np.ndarray, y_prob: np.ndarray, regularization_loss: float = 0.0) -> Dict[str, Any]:
+    """
+    Derive the metrics of model.evaluate and the confusion matrix from predicted probabilities.
+
+    Args:
+        y_true (np.ndarray): Binary labels.
+        y_prob (np.ndarray): Predicted probabilities.
+        regularization_loss (float): Weight penalties to add to the loss, as model.evaluate does.
+
+    Returns:
+        Dict[str, Any]: loss, accuracy, precision (fractions), y_pred, confusion_matrix and misclassified indices.
+    """
+
+    y_true = np.asarray(y_true).reshape(-1).astype(np.float32)
+    y_prob = np.asarray(y_prob, dtype=np.float32).reshape(-1)
+    p = np.clip(y_prob, _EPS, 1 - _EPS)
+    loss = float(-np.mean(y_true * np.log(p) + (1 - y_true) * np.log1p(-p))) + regularization_loss
+
+    y_pred = (y_prob > 0.5).astype(np.int64)
+    y_int = y_true.astype(np.int64)
+    cm = np.bincount(y_int * 2 + y_pred, minlength=4).reshape(2, 2)
+    predicted_positive = cm[0, 1] + cm[1, 1]
+
+    return {
+        'loss': loss,
+        'accuracy': float(np.trace(cm) / len(y_int)),
+        'precision': float(cm[1, 1] / predicted_positive) if predicted_positive else 0.0,
+        'y_pred': y_pred,
+        'confusion_matrix': cm,
+        'misclassified': np.flatnonzero(y_pred != y_int)
+    }
+
+
+def evaluate_single_pass(model: Any, X: np.ndarray, y: np.ndarray, batch_size: int = BATCH_SIZE,
+                         rescale: bool = True, jit_compile: bool = False) -> Dict[str, Any]:
+    """
+    Evaluate a binary classifier with one (cached) inference pass.
+
+    Args:
+        model (Any): Keras model with a sigmoid output.
+        X (np.ndarray): The test set features.
+        y (np.ndarray): The binary labels for the test set.
+        batch_size (int): Inference batch size.
+        rescale (bool): If True, scale pixel values by 1./255.
+        jit_compile (bool): Use XLA-compiled inference.
+
+    Returns:
+        Dict[str, Any]: binary_metrics output plus the predicted probabilities under 'y_prob'.
+    """
+
+    y_prob = predict_cached(model, X, batch_size, rescale, jit_compile)
+    regularization_loss = float(sum(np.sum(np.asarray(loss)) for loss in getattr(model, 'losses', [])))
+    metrics = binary_metrics(y, y_prob, regularization_loss)
+    metrics['y_prob'] = y_prob
+    return metrics
@@ -0,0 +1,311 @@
+import os
+import csv
+import glob
+import json
+import time
+import pickle
+import sqlite3
+import threading
+import numpy as np
+
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_DB = 'Results/experiments.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    source TEXT NOT NULL,
+    model TEXT NOT NULL,
+    description TEXT,
+    metrics TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_source ON results (source, id);
+CREATE INDEX IF NOT EXISTS results_model ON results (model, description);
+CREATE TABLE IF NOT EXISTS histories (
+    name TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    model TEXT,
+    description TEXT,
+    history TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS histories_model ON histories (model, description);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    imported REAL NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    return value
+
+
+def source_name(file_path: str) -> str:
+    """Results table name of a CSV path, e.g. 'Results/report_results.csv' -> 'report_results'."""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def append_csv_row(file_path: str, row: Dict[str, Any]) -> None:
+    """
+    Append one row to a CSV without rewriting it. The columns of an existing file are read from
+    its header line; values for other keys are left to the experiment store.
+
+    Args:
+        file_path (str): CSV file, created with the row's keys as header if missing.
+        row (Dict[str, Any]): Column -> value.
+    """
+
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        with open(file_path, newline='') as f:
+            columns = next(csv.reader(f))
+        header = False
+    else:
+        columns = list(row)
+        header = True
+
+    with open(file_path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        if header:
+            writer.writeheader()
+        writer.writerow({key: _to_builtin(value) for key, value in row.items()})
+
+
+class ExperimentStore:
+    """
+    Append-only SQLite store (WAL mode) for result rows and training histories.
+
+    Each insert is a single short transaction, so concurrent processes (parallel runs, sweeps)
+    append without overwriting each other's rows. Results are grouped by ``source`` (the stem of
+    the CSV they used to live in, e.g. 'report_results') and indexed on model and description.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB, timeout: float = 30.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def add_result(self, source: str, model: str, metrics: Dict[str, Any], description: Optional[str] = None) -> int:
+        """
+        Append one result row.
+
+        Args:
+            source (str): Results table, e.g. 'report_results' or 'test_metrics'.
+            model (str): The name of the model.
+            metrics (Dict[str, Any]): Metric columns and values.
+            description (Optional[str]): A brief description of the model.
+
+        Returns:
+            int: The row id.
+        """
+
+        metrics = {key: _to_builtin(value) for key, value in metrics.items()}
+        with self._connection() as conn:
+            cursor = conn.execute(
+                'INSERT INTO results (created, source, model, description, metrics) VALUES (?, ?, ?, ?, ?)',
+                (time.time(), source, model, description, json.dumps(metrics))
+            )
+        return cursor.lastrowid
+
+    def results(self, source: Optional[str] = None, model: Optional[str] = None,
+                description: Optional[str] = None) -> 'pd.DataFrame':
+        """
+        Query result rows as a DataFrame with the same columns as the legacy CSVs.
+
+        Args:
+            source (Optional[str]): Restrict to one results table.
+            model (Optional[str]): Restrict to one model name.
+            description (Optional[str]): Restrict to one description.
+
+        Returns:
+            pd.DataFrame: One row per result, in insertion order.
+        """
+
+        import pandas as pd
+
+        clauses, params = [], []
+        for column, value in (('source', source), ('model', model), ('description', description)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._connection().execute(
+            f'SELECT model, description, metrics FROM results{where} ORDER BY id', params
+        ).fetchall()
+
+        records = []
+        for model_name, model_description, metrics in rows:
+            record = {'Model': model_name, **json.loads(metrics)}
+            if model_description is not None:
+                record['Description'] = model_description
+            records.append(record)
+        return pd.DataFrame(records)
+
+    def add_history(self, name: str, history: Dict[str, List[float]], model: Optional[str] = None,
+                    description: Optional[str] = None) -> None:
+        """Store (or replace) a Keras history dictionary under a name, e.g. its former pickle file name."""
+        history = {key: [float(v) for v in values] for key, values in history.items()}
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO histories (name, created, model, description, history) VALUES (?, ?, ?, ?, ?)',
+                (name, time.time(), model, description, json.dumps(history))
+            )
+
+    def history(self, name: str) -> Optional[Dict[str, List[float]]]:
+        row = self._connection().execute('SELECT history FROM histories WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def history_names(self, model: Optional[str] = None) -> List[str]:
+        if model is None:
+            rows = self._connection().execute('SELECT name FROM histories ORDER BY name').fetchall()
+        else:
+            rows = self._connection().execute('SELECT name FROM histories WHERE model = ? ORDER BY name',
+                                              (model,)).fetchall()
+        return [row[0] for row in rows]
+
+    def imported(self, path: str) -> bool:
+        key = os.path.abspath(path)
+        return self._connection().execute('SELECT 1 FROM imports WHERE path = ?', (key,)).fetchone() is not None
+
+    def _mark_imported(self, conn: sqlite3.Connection, path: str, rows: int) -> None:
+        conn.execute('INSERT OR REPLACE INTO imports (path, imported, rows) VALUES (?, ?, ?)',
+                     (os.path.abspath(path), time.time(), rows))
+
+    def import_csv(self, file_path: str, source: Optional[str] = None, force: bool = False) -> int:
+        """
+        Import the rows of a legacy results CSV (once per file unless force is set).
+
+        Args:
+            file_path (str): CSV with a 'Model' column and optionally 'Description'.
+            source (Optional[str]): Results table name (default: the file stem).
+            force (bool): Import again even if the file was already imported.
+
+        Returns:
+            int: Number of imported rows.
+        """
+
+        import pandas as pd
+
+        source = source or source_name(file_path)
+        df = pd.read_csv(file_path)
+        now = time.time()
+        rows = []
+        for record in df.to_dict('records'):
+            model = str(record.pop('Model'))
+            description = record.pop('Description', None)
+            description = None if pd.isna(description) else str(description)
+            metrics = {key: None if pd.isna(value) else _to_builtin(value) for key, value in record.items()}
+            rows.append((now, source, model, description, json.dumps(metrics)))
+
+        conn = self._connection()
+        with conn:
+            # Check and insert in one write transaction so concurrent importers do not duplicate rows
+            conn.execute('BEGIN IMMEDIATE')
+            if not force and conn.execute('SELECT 1 FROM imports WHERE path = ?',
+                                          (os.path.abspath(file_path),)).fetchone():
+                return 0
+            conn.executemany('INSERT INTO results (created, source, model, description, metrics) VALUES (?, ?, ?, ?, ?)',
+                             rows)
+            self._mark_imported(conn, file_path, len(rows))
+        print(f"Imported {len(rows)} rows from {file_path} into '{source}'")
+        return len(rows)
+
+    def import_history_pickles(self, directory: str = 'History_models') -> int:
+        """
+        Import every pickled history dictionary of a directory, keyed by file name.
+
+        Args:
+            directory (str): Directory of pickle files written by the training notebooks and runner.
+
+        Returns:
+            int: Number of imported histories.
+        """
+
+        count = 0
+        for path in sorted(glob.glob(os.path.join(directory, '*'))):
+            if not os.path.isfile(path):
+                continue
+            try:
+                with open(path, 'rb') as history_file:
+                    history = pickle.load(history_file)
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            if isinstance(history, dict):
+                self.add_history(os.path.basename(path), history)
+                count += 1
+        print(f"Imported {count} histories from {directory}")
+        return count
+
+    def import_legacy(self, results_dir: str = 'Results', history_dir: str = 'History_models') -> None:
+        """Import all Results/*.csv files and History_models pickles."""
+        for path in sorted(glob.glob(os.path.join(results_dir, '*.csv'))):
+            self.import_csv(path)
+        if os.path.isdir(history_dir):
+            self.import_history_pickles(history_dir)
+
+
+_stores: Dict[str, ExperimentStore] = {}
+
+
+def get_store(path: str = DEFAULT_DB) -> ExperimentStore:
+    """Process-wide ExperimentStore for a database path."""
+    key = os.path.abspath(path)
+    if key not in _stores:
+        _stores[key] = ExperimentStore(path)
+    return _stores[key]
+
+
+def record_result(file_path: str, row: Dict[str, Any], db_path: str = DEFAULT_DB) -> None:
+    """
+    Append a result row to the experiment store and to the legacy CSV, without rewriting either.
+
+    The existing CSV is imported into the store the first time it is written to, so the store
+    holds every row the CSV does.
+
+    Args:
+        file_path (str): Legacy results CSV, e.g. 'Results/report_results.csv'.
+        row (Dict[str, Any]): Row with 'Model', optionally 'Description', and metric columns.
+        db_path (str): SQLite database of the experiment store.
+    """
+
+    store = get_store(db_path)
+    if os.path.exists(file_path) and not store.imported(file_path):
+        store.import_csv(file_path)
+    metrics = {key: value for key, value in row.items() if key not in ('Model', 'Description')}
+    store.add_result(source_name(file_path), row['Model'], metrics, row.get('Description'))
+    append_csv_row(file_path, row)
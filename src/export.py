@@ -0,0 +1,283 @@
+import os
+import time
+import numpy as np
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+from src.constants import SEED
+from src.experiments import record_result
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def as_model_input(X: np.ndarray) -> np.ndarray:
+    """
+    Convert images to the float32 [0, 1] inputs the classifier was trained on.
+
+    Args:
+        X (np.ndarray): Images, uint8 0-255 or already normalized floats.
+
+    Returns:
+        np.ndarray: float32 images in [0, 1].
+    """
+
+    rescale = np.issubdtype(np.asarray(X).dtype, np.integer)
+    X = np.asarray(X, dtype=np.float32)
+    return X * np.float32(1. / 255) if rescale else X
+
+
+def calibration_sample(X: np.ndarray, n: int = 200, seed: int = SEED) -> np.ndarray:
+    """
+    Draw a random calibration sample from the training images, rescaled like the model inputs.
+
+    Args:
+        X (np.ndarray): Training images (uint8 0-255 or already normalized floats).
+        n (int): Number of images to draw.
+        seed (int): Random seed.
+
+    Returns:
+        np.ndarray: float32 images in [0, 1].
+    """
+
+    idx = np.random.default_rng(seed).choice(len(X), size=min(n, len(X)), replace=False)
+    return as_model_input(X[np.sort(idx)])
+
+
+def _load_keras(model: Any) -> Any:
+    if isinstance(model, str):
+        from tensorflow import keras
+        return keras.models.load_model(model)
+    return model
+
+
+def export_tflite(model: Any, out_path: str, quantization: Optional[str] = 'float16',
+                  calibration_data: Optional[np.ndarray] = None) -> str:
+    """
+    Convert a Keras classifier to TFLite with optional post-training quantization.
+
+    Args:
+        model (Any): A Keras model or the path of a .keras file.
+        out_path (str): Destination .tflite file.
+        quantization (Optional[str]): None (float32), 'float16' or 'int8'. int8 keeps float32
+                                      inputs/outputs so it is a drop-in replacement.
+        calibration_data (Optional[np.ndarray]): Normalized images for int8 calibration (see calibration_sample).
+
+    Returns:
+        str: The path of the written model.
+    """
+
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(_load_keras(model))
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if calibration_data is None:
+            raise ValueError("int8 quantization needs calibration_data")
+
+        def representative_dataset():
+            for image in calibration_data:
+                yield [image[np.newaxis].astype(np.float32)]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantization is not None:
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    with open(out_path, 'wb') as f:
+        f.write(converter.convert())
+    print(f"Saved {quantization or 'float32'} TFLite model to {out_path} ({os.path.getsize(out_path) / 1024:.0f} KB)")
+
+    return out_path
+
+
+def export_onnx(model: Any, out_path: str, opset: int = 13) -> str:
+    """
+    Convert a Keras classifier to ONNX with an NCHW input so OpenCV DNN can load it
+    (cv2.dnn.readNetFromONNX) and feed it blobs like the YOLO detector. Requires tf2onnx.
+
+    Args:
+        model (Any): A Keras model or the path of a .keras file.
+        out_path (str): Destination .onnx file.
+        opset (int): ONNX opset.
+
+    Returns:
+        str: The path of the written model.
+    """
+
+    import tensorflow as tf
+    try:
+        import tf2onnx
+    except ImportError as e:
+        raise ImportError("ONNX export needs tf2onnx: pip install tf2onnx") from e
+
+    model = _load_keras(model)
+    spec = (tf.TensorSpec((None, *model.input_shape[1:]), tf.float32, name='input'),)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset,
+                               inputs_as_nchw=['input'], output_path=out_path)
+    print(f"Saved ONNX model to {out_path} ({os.path.getsize(out_path) / 1024:.0f} KB)")
+
+    return out_path
+
+
+class TFLiteModel:
+    """
+    Callable wrapper around a TFLite interpreter with the same call signature as a Keras model,
+    so it can replace one in the crop classifier. Uses tflite_runtime when installed, which
+    avoids importing TensorFlow at all.
+    """
+
+    def __init__(self, path: str, num_threads: Optional[int] = None) -> None:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_size = None
+
+    def __call__(self, batch: np.ndarray, training: bool = False) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        if batch.shape[0] != self.batch_size:
+            self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+            self.interpreter.allocate_tensors()
+            self.batch_size = batch.shape[0]
+        self.interpreter.set_tensor(self.input_index, batch)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index).copy()
+
+
+class OpenCVOnnxModel:
+    """Callable wrapper running an exported ONNX classifier with OpenCV DNN on NHWC batches."""
+
+    def __init__(self, path: str) -> None:
+        import cv2
+        self.net = cv2.dnn.readNetFromONNX(path)
+
+    def __call__(self, batch: np.ndarray, training: bool = False) -> np.ndarray:
+        self.net.setInput(np.ascontiguousarray(np.transpose(batch, (0, 3, 1, 2)), dtype=np.float32))
+        return self.net.forward()
+
+
+def benchmark_latency(predict: Callable[[np.ndarray], Any], images: np.ndarray,
+                      batch_sizes: Sequence[int] = (1, 8, 32), n_iter: int = 50, warmup: int = 5) -> List[Dict[str, float]]:
+    """
+    Measure CPU latency and throughput of a predict function at several batch sizes.
+
+    Args:
+        predict (Callable): Function taking a float32 NHWC batch.
+        images (np.ndarray): Normalized images to draw batches from.
+        batch_sizes (Sequence[int]): Batch sizes to measure.
+        n_iter (int): Timed iterations per batch size.
+        warmup (int): Untimed iterations per batch size.
+
+    Returns:
+        List[Dict[str, float]]: One row per batch size with mean/p95 latency (ms) and throughput (images/s).
+    """
+
+    rows = []
+    for batch_size in batch_sizes:
+        batch = np.ascontiguousarray(np.resize(images, (batch_size, *images.shape[1:])), dtype=np.float32)
+        for _ in range(warmup):
+            predict(batch)
+        timings = []
+        for _ in range(n_iter):
+            start = time.perf_counter()
+            predict(batch)
+            timings.append(time.perf_counter() - start)
+        timings = np.array(timings) * 1000
+        rows.append({
+            'Batch Size': batch_size,
+            'Latency Mean (ms)': round(float(timings.mean()), 3),
+            'Latency P95 (ms)': round(float(np.percentile(timings, 95)), 3),
+            'Throughput (img/s)': round(batch_size * 1000 / float(timings.mean()), 1)
+        })
+    return rows
+
+
+def _accuracy(predict: Callable[[np.ndarray], Any], X: np.ndarray, y: np.ndarray, batch_size: int = 256) -> float:
+    correct = 0
+    for start in range(0, len(X), batch_size):
+        probs = np.asarray(predict(X[start:start + batch_size])).reshape(-1)
+        correct += int(np.sum((probs > 0.5).astype(int) == np.asarray(y[start:start + batch_size]).reshape(-1)))
+    return correct / len(X)
+
+
+def export_and_benchmark(model_path: str,
+                         X_train: np.ndarray,
+                         X_test: np.ndarray,
+                         y_test_binary: np.ndarray,
+                         out_dir: str = 'models/classification_model/export',
+                         onnx: bool = True,
+                         batch_sizes: Sequence[int] = (1, 8, 32),
+                         n_calibration: int = 200,
+                         results_file: str = 'Results/export_benchmark.csv') -> 'pd.DataFrame':
+    """
+    Export the classifier to float16 and int8 TFLite (and ONNX if tf2onnx is available), then compare
+    test accuracy and CPU latency/throughput of every variant against the Keras model.
+
+    Args:
+        model_path (str): Path of the trained .keras classifier.
+        X_train (np.ndarray): Training images, used to draw the int8 calibration sample.
+        X_test (np.ndarray): Test images (uint8 or normalized).
+        y_test_binary (np.ndarray): The binary labels for the test set.
+        out_dir (str): Directory for the exported models.
+        onnx (bool): Also export and benchmark an ONNX model through OpenCV DNN.
+        batch_sizes (Sequence[int]): Batch sizes for the latency benchmark.
+        n_calibration (int): Size of the calibration sample.
+        results_file (str): Results CSV to append to.
+
+    Returns:
+        pd.DataFrame: One row per (format, batch size) with accuracy delta, size, latency and throughput.
+    """
+
+    import pandas as pd
+
+    model = _load_keras(model_path)
+    X_eval = as_model_input(X_test)
+    y_eval = np.asarray(y_test_binary).reshape(-1)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+
+    variants = {'keras': (lambda batch: model(batch, training=False).numpy(), model_path)}
+
+    fp16_path = export_tflite(model, os.path.join(out_dir, f'{name}_fp16.tflite'), 'float16')
+    variants['tflite_fp16'] = (TFLiteModel(fp16_path), fp16_path)
+
+    int8_path = export_tflite(model, os.path.join(out_dir, f'{name}_int8.tflite'), 'int8',
+                              calibration_sample(X_train, n_calibration))
+    variants['tflite_int8'] = (TFLiteModel(int8_path), int8_path)
+
+    if onnx:
+        try:
+            onnx_path = export_onnx(model, os.path.join(out_dir, f'{name}.onnx'))
+            variants['onnx_opencv'] = (OpenCVOnnxModel(onnx_path), onnx_path)
+        except ImportError as e:
+            print(f"Skipping ONNX export: {e}")
+
+    baseline = None
+    rows = []
+    for variant, (predict, path) in variants.items():
+        accuracy = _accuracy(predict, X_eval, y_eval) * 100
+        baseline = accuracy if baseline is None else baseline
+        for row in benchmark_latency(predict, X_eval, batch_sizes):
+            rows.append({
+                'Model': name,
+                'Format': variant,
+                'Size (KB)': round(os.path.getsize(path) / 1024, 1),
+                'Test Accuracy': round(accuracy, 3),
+                'Accuracy Delta': round(accuracy - baseline, 3),
+                **row
+            })
+
+    for row in rows:
+        record_result(results_file, row)
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False))
+
+    return df
@@ -0,0 +1,214 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+from typing import Callable, Optional
+from tensorflow import keras
+from tensorflow.keras import layers
+from tensorflow.keras.backend import clear_session
+from tensorflow.keras.applications import EfficientNetB0, ResNet50V2, InceptionV3
+from tensorflow.keras.applications import efficientnet, resnet_v2, inception_v3
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import EarlyStopping
+
+from src.constants import BATCH_SIZE, INPUT_SHAPE
+
+# Backbones used by build_resnet_model, build_inception_model and build_efficientnet_model
+BACKBONES = {
+    'resnet50v2': ResNet50V2,
+    'inceptionv3': InceptionV3,
+    'efficientnetb0': EfficientNetB0
+}
+
+PREPROCESSORS = {
+    None: None,
+    'resnet_v2': resnet_v2.preprocess_input,
+    'inception_v3': inception_v3.preprocess_input,
+    'efficientnet': efficientnet.preprocess_input
+}
+
+
+def build_backbone_extractor(backbone: str = 'resnet50v2', upsample: int = 7) -> keras.Model:
+    """
+    Build the frozen feature extractor used by the transfer-learning models:
+    upsampling of the 32x32 input followed by the ImageNet backbone with global average pooling.
+
+    Args:
+        backbone (str): Key in BACKBONES.
+        upsample (int): Upsampling factor applied to the input (7 gives 224x224 for 32x32 inputs).
+
+    Returns:
+        keras.Model: A non-trainable model mapping images to pooled features.
+    """
+
+    size = INPUT_SHAPE[0] * upsample
+    inputs = keras.Input(shape=INPUT_SHAPE)
+    x = layers.UpSampling2D(size=(upsample, upsample))(inputs)
+    base_model = BACKBONES[backbone](weights='imagenet', include_top=False, pooling='avg',
+                                     input_shape=(size, size, 3))
+    base_model.trainable = False
+    outputs = base_model(x, training=False)
+
+    return keras.Model(inputs, outputs, name=f'{backbone}_extractor')
+
+
+def _cache_key(X: np.ndarray, backbone: str, rescale: float, upsample: int, preprocess: Optional[str]) -> str:
+    digest = hashlib.sha1()
+    digest.update(json.dumps({
+        'backbone': backbone,
+        'weights': 'imagenet',
+        'rescale': rescale,
+        'upsample': upsample,
+        'preprocess': preprocess,
+        'shape': list(X.shape),
+        'dtype': str(X.dtype)
+    }, sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(X).data)
+    return digest.hexdigest()[:16]
+
+
+def extract_features(X: np.ndarray,
+                     backbone: str = 'resnet50v2',
+                     rescale: float = 1./255,
+                     upsample: int = 7,
+                     preprocess: Optional[str] = None,
+                     batch_size: int = 64,
+                     cache_dir: str = 'Features') -> np.ndarray:
+    """
+    Run the frozen backbone once over a dataset and cache the pooled features on disk.
+
+    The cache is a memory-mapped .npy file keyed by backbone, preprocessing and a hash of
+    the images, so later calls (and other processes) reuse it without recomputing or
+    loading it fully into RAM. The defaults match the transfer models, which receive
+    1/255-rescaled images and upsample them 7x in the graph. Features are computed on
+    un-augmented images.
+
+    Args:
+        X (np.ndarray): Images (num_samples, 32, 32, 3).
+        backbone (str): Key in BACKBONES.
+        rescale (float): Factor applied to pixel values before the backbone.
+        upsample (int): Upsampling factor applied in the extractor.
+        preprocess (Optional[str]): Key in PREPROCESSORS applied after rescaling, or None.
+        batch_size (int): Batch size for the extraction pass.
+        cache_dir (str): Directory holding the feature caches.
+
+    Returns:
+        np.ndarray: Read-only memory-mapped float32 array of shape (num_samples, feature_dim).
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _cache_key(X, backbone, rescale, upsample, preprocess)
+    cache_path = os.path.join(cache_dir, f'{backbone}_{key}.npy')
+
+    if os.path.exists(cache_path):
+        print(f"Loading cached {backbone} features from {cache_path}")
+        return np.load(cache_path, mmap_mode='r')
+
+    extractor = build_backbone_extractor(backbone, upsample)
+    preprocess_fn: Optional[Callable] = PREPROCESSORS[preprocess]
+    feature_dim = extractor.output_shape[-1]
+
+    tmp_path = cache_path + '.tmp.npy'
+    features = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                         shape=(X.shape[0], feature_dim))
+    for start in range(0, X.shape[0], batch_size):
+        batch = X[start:start + batch_size].astype(np.float32) * rescale
+        if preprocess_fn is not None:
+            batch = preprocess_fn(batch)
+        features[start:start + batch_size] = extractor.predict_on_batch(batch)
+    features.flush()
+    del features
+    os.replace(tmp_path, cache_path)  # only complete caches get the final name
+    print(f"Saved {backbone} features to {cache_path}")
+
+    return np.load(cache_path, mmap_mode='r')
+
+
+def build_feature_head(feature_dim: int, adam_lr: float = 1e-3) -> keras.Model:
+    """
+    Builds and compiles the dense head of build_resnet_model on top of pooled backbone features.
+
+    Args:
+        feature_dim (int): Dimension of the cached features.
+        adam_lr (float): Learning rate for the Adam optimizer.
+
+    Returns:
+        keras.Model: A compiled Keras model taking feature vectors as input.
+    """
+
+    clear_session()
+    inputs = keras.Input(shape=(feature_dim,))
+    x = layers.Dense(1028, activation='relu')(inputs)
+    x = layers.Dense(512, activation='relu')(x)
+    x = layers.Dropout(0.1)(x)
+    outputs = layers.Dense(1, activation='sigmoid')(x)
+
+    model = keras.Model(inputs, outputs, name='feature_head')
+    model.compile(loss='binary_crossentropy',
+                  optimizer=Adam(learning_rate=adam_lr),
+                  metrics=['accuracy', 'precision'])
+
+    return model
+
+
+def train_feature_head(model: keras.Model,
+                       train_features: np.ndarray,
+                       y_train: np.ndarray,
+                       val_features: np.ndarray,
+                       y_val: np.ndarray,
+                       epochs: int = 30,
+                       batch_size: int = BATCH_SIZE,
+                       early_stop_patience: int = 5) -> keras.callbacks.History:
+    """
+    Trains only the dense head on cached features.
+
+    Args:
+        model (keras.Model): Head from build_feature_head.
+        train_features (np.ndarray): Cached training features.
+        y_train (np.ndarray): Training labels.
+        val_features (np.ndarray): Cached validation features.
+        y_val (np.ndarray): Validation labels.
+        epochs (int): Number of training epochs.
+        batch_size (int): Batch size.
+        early_stop_patience (int): Patience for early stopping on val_loss.
+
+    Returns:
+        keras.callbacks.History: History object containing training metrics.
+    """
+
+    callback_early_stop = EarlyStopping(monitor='val_loss', patience=early_stop_patience, restore_best_weights=True)
+
+    return model.fit(
+        train_features,
+        y_train,
+        epochs=epochs,
+        batch_size=batch_size,
+        validation_data=(val_features, y_val),
+        callbacks=[callback_early_stop],
+        verbose=1
+    )
+
+
+def attach_head(head: keras.Model, backbone: str = 'resnet50v2', upsample: int = 7) -> keras.Model:
+    """
+    Stack a trained feature head on its backbone extractor to get an image-input model
+    equivalent to the corresponding build_*_model network.
+
+    Args:
+        head (keras.Model): Trained head from build_feature_head.
+        backbone (str): Key in BACKBONES used to extract the features.
+        upsample (int): Upsampling factor used to extract the features.
+
+    Returns:
+        keras.Model: Compiled model taking 32x32 images (rescaled as during extraction).
+    """
+
+    extractor = build_backbone_extractor(backbone, upsample)
+    inputs = keras.Input(shape=INPUT_SHAPE)
+    outputs = head(extractor(inputs))
+
+    model = keras.Model(inputs, outputs)
+    model.compile(loss='binary_crossentropy', optimizer=Adam(), metrics=['accuracy', 'precision'])
+
+    return model
@@ -0,0 +1,175 @@
+"""
+Import-time benchmark with regression thresholds.
+
+Every module is imported in a fresh interpreter with ``-X importtime``; the wall time
+must stay under its budget and none of its forbidden heavy dependencies may be loaded.
+
+    python -m src.importtime [--runs 3] [--scale 1.0] [--json Results/import_times.json]
+"""
+import os
+import sys
+import json
+import argparse
+import functools
+import subprocess
+
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('tensorflow', 'keras', 'pandas', 'matplotlib', 'plotly', 'sklearn', 'visualkeras')
+
+# Third-party packages that may legitimately be absent (e.g. PyQt5 on a headless box);
+# a module that cannot be imported because one of these is missing is skipped, not failed
+OPTIONAL_DEPENDENCIES = frozenset(HEAVY + ('numpy', 'cv2', 'PIL', 'PyQt5', 'yaml', 'serial', 'psutil',
+                                           'onnxruntime', 'tflite_runtime'))
+
+# module -> (max seconds, modules that must not be imported)
+IMPORT_BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    'src': (0.05, HEAVY),
+    'src.utils': (0.3, HEAVY),
+    'src.datastore': (0.3, HEAVY),
+    'src.export': (0.3, HEAVY),
+    'src.experiments': (0.3, HEAVY),
+    'src.runner': (0.3, HEAVY),
+    'src.sweep': (0.3, HEAVY),
+    'vehicle_animal_detection.src.alerts': (0.2, HEAVY + ('PyQt5', 'cv2')),
+    'vehicle_animal_detection.src.monitoring': (0.1, HEAVY + ('PyQt5', 'cv2', 'numpy')),
+    'vehicle_animal_detection.src.detection.yolo_detector': (0.6, HEAVY + ('PyQt5',)),
+    'vehicle_animal_detection.src.classification': (0.6, HEAVY + ('PyQt5',)),
+    'vehicle_animal_detection.src.gui.main_window': (0.9, HEAVY),
+}
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, float]]:
+    """Top-level (package, cumulative ms) entries of ``-X importtime`` output, heaviest first."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, package = line[len('import time:'):].split('|')
+        if not package[1:].startswith(' '):  # nested imports are indented
+            entries.append((package.strip(), int(cumulative) / 1000))
+    return sorted(entries, key=lambda entry: -entry[1])
+
+
+@functools.lru_cache(maxsize=None)
+def _startup_imports() -> frozenset:
+    """Packages every interpreter imports at startup (site, encodings, ...), excluded from the report."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'], capture_output=True, text=True)
+    return frozenset(name for name, _ in _parse_importtime(proc.stderr))
+
+
+def measure_import(module: str, runs: int = 3, cwd: str = REPO_ROOT) -> dict:
+    """
+    Import a module in fresh interpreters and report the fastest run.
+
+    Args:
+        module (str): Dotted module name.
+        runs (int): Number of fresh interpreters; the minimum time is kept.
+        cwd (str): Working directory (the repository root).
+
+    Returns:
+        dict: module, seconds, heaviest top-level imports (name, ms), loaded module names,
+              error (None unless the import failed) and missing (the ``name`` of a
+              ModuleNotFoundError, else None).
+    """
+
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            "try:\n"
+            "    import {0}\n"
+            "except ModuleNotFoundError as e:\n"
+            "    print('missing:' + (e.name or '')); raise\n"
+            "print(time.perf_counter() - start); print(','.join(sys.modules))").format(module)
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                              capture_output=True, text=True, cwd=cwd)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import failed'
+            last_line = proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else ''
+            missing = last_line[len('missing:'):] if last_line.startswith('missing:') else None
+            return {'module': module, 'seconds': None, 'heaviest': [], 'loaded': [], 'error': error,
+                    'missing': missing}
+        seconds, loaded = proc.stdout.strip().splitlines()[-2:]
+        result = {
+            'module': module,
+            'seconds': float(seconds),
+            'heaviest': [entry for entry in _parse_importtime(proc.stderr)
+                         if entry[0] not in _startup_imports()][:5],
+            'loaded': loaded.split(','),
+            'error': None,
+            'missing': None
+        }
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def check_import_budgets(budgets: Optional[Dict[str, Tuple[float, Tuple[str, ...]]]] = None,
+                         runs: int = 3,
+                         scale: float = 1.0) -> Tuple[List[dict], List[str]]:
+    """
+    Measure every module and compare it with its budget.
+
+    Args:
+        budgets (Optional[Dict]): module -> (max seconds, forbidden modules); default IMPORT_BUDGETS.
+        runs (int): Fresh interpreters per module.
+        scale (float): Multiplier for the time budgets on slower machines.
+
+    Returns:
+        tuple: A tuple containing:
+               - results (List[dict]): measure_import output plus 'budget' and 'status' per module.
+               - failures (List[str]): One message per exceeded budget or forbidden import.
+    """
+
+    results, failures = [], []
+    for module, (budget, forbidden) in (budgets or IMPORT_BUDGETS).items():
+        result = measure_import(module, runs)
+        result['budget'] = budget * scale
+        if result['error'] is not None:
+            # Only a missing optional third-party package is reported, not failed; a missing
+            # module of this repository (a renamed or broken import) is an error
+            missing = (result['missing'] or '').split('.')[0]
+            result['status'] = 'skipped' if missing in OPTIONAL_DEPENDENCIES else 'error'
+            if result['status'] == 'error':
+                failures.append(f"{module}: {result['error']}")
+        else:
+            heavy = sorted({name.split('.')[0] for name in result['loaded']} & set(forbidden))
+            result['forbidden'] = heavy
+            result['status'] = 'ok'
+            if heavy:
+                result['status'] = 'fail'
+                failures.append(f"{module} imports {', '.join(heavy)}")
+            if result['seconds'] > result['budget']:
+                result['status'] = 'fail'
+                failures.append(f"{module} took {result['seconds']:.3f}s (budget {result['budget']:.3f}s)")
+        results.append(result)
+
+        seconds = '-' if result['seconds'] is None else f"{result['seconds'] * 1000:7.1f} ms"
+        heaviest = ', '.join(f'{name} {ms:.0f}ms' for name, ms in result['heaviest'][:3])
+        print(f"{result['status']:>7}  {module:<55} {seconds:>10}  {heaviest or result.get('error') or ''}")
+
+    return results, failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the time budgets')
+    parser.add_argument('--json', default=None, help='write the measurements to this file')
+    args = parser.parse_args(argv)
+
+    results, failures = check_import_budgets(runs=args.runs, scale=args.scale)
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or '.', exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump([{k: v for k, v in r.items() if k != 'loaded'} for r in results], f, indent=2)
+    for failure in failures:
+        print(f"[FAIL] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,8 +4,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import tensorflow as tf
 
-from typing import List, Any
-from sklearn.metrics import confusion_matrix, classification_report, ConfusionMatrixDisplay
+from typing import List, Any, Union
+from sklearn.metrics import classification_report, ConfusionMatrixDisplay
 from sklearn.utils.class_weight import compute_class_weight
 from tensorflow import keras
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
@@ -22,9 +22,13 @@ from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau, ModelCh
 
 from src.constants import BATCH_SIZE, SEED, INPUT_SHAPE
 from src.utils import calculate_mean_std
+from src.evaluation import evaluate_single_pass
+from src.xla import resolve_jit_compile
+from src.experiments import record_result
 
 
-def build_cnn_model(input_shape: tuple, learning_rate: float = 1e-3, lr_dense: float = 1e-3) -> Sequential:
+def build_cnn_model(input_shape: tuple, learning_rate: float = 1e-3, lr_dense: float = 1e-3,
+                    jit_compile: bool = False) -> Sequential:
     """
     Builds and compiles a CNN model for binary classification.
 
@@ -32,6 +36,7 @@ def build_cnn_model(input_shape: tuple, learning_rate: float = 1e-3, lr_dense: f
         input_shape (tuple): The shape of the input data (height, width, channels).
         learning_rate (float): Learning rate for the optimizer.
         lr_dense (float): Learning rate for the regularizers in the Dense layers.
+        jit_compile (bool): Compile training and inference steps with XLA, if the model supports it.
 
     Returns:
         Sequential: Compiled CNN model.
@@ -80,15 +85,41 @@ def build_cnn_model(input_shape: tuple, learning_rate: float = 1e-3, lr_dense: f
 
     # Compile model
     adam_opt = Adam(learning_rate=learning_rate)
-    model.compile(loss='binary_crossentropy', optimizer=adam_opt, metrics=['accuracy', 'precision'])
+    model.compile(loss='binary_crossentropy', optimizer=adam_opt, metrics=['accuracy', 'precision'],
+                  jit_compile=resolve_jit_compile(model, jit_compile))
 
     return model
 
 
+def get_class_weights(train_data: Any) -> dict:
+    """
+    Compute balanced class weights from a Keras iterator or a tf.data dataset.
+
+    Args:
+        train_data (Any): An iterator exposing ``classes`` or ``y``, or a tf.data.Dataset built by
+                          preprocessing.make_tf_dataset / DatasetView.to_tf_dataset (which keep their
+                          labels as ``y``).
+
+    Returns:
+        dict: Class weights for the two classes.
+    """
+    if hasattr(train_data, 'classes'):
+        labels = np.asarray(train_data.classes)
+    elif hasattr(train_data, 'y'):
+        labels = np.asarray(train_data.y)
+    else:
+        raise ValueError("Class weights need the training labels: pass a dataset from make_tf_dataset "
+                         "or an iterator exposing 'classes' or 'y'")
+    labels = labels.flatten()
+
+    class_weights = compute_class_weight('balanced', classes=np.unique(labels), y=labels)
+    return {0: class_weights[0], 1: class_weights[1]}
+
+
 def train_model(
     model: Any,
-    train_generator: ImageDataGenerator,
-    val_generator: ImageDataGenerator,
+    train_generator: Union[ImageDataGenerator, tf.data.Dataset],
+    val_generator: Union[ImageDataGenerator, tf.data.Dataset],
     epochs: int = 30,
     early_stop_patience: int = 5,
     class_imb: bool = False
@@ -98,8 +129,9 @@ def train_model(
 
     Args:
         model (Any): The CNN model to train.
-        train_generator (ImageDataGenerator): The training data generator.
-        val_generator (ImageDataGenerator): The validation data generator.
+        train_generator (ImageDataGenerator | tf.data.Dataset): The training data generator or
+                                                                 a dataset from make_tf_dataset.
+        val_generator (ImageDataGenerator | tf.data.Dataset): The validation data generator or dataset.
         epochs (int): Number of training epochs.
         early_stop_patience (int): Patience for early stopping.
         class_imb (bool): boolean to decide whether to apply class balancings
@@ -117,8 +149,7 @@ def train_model(
 
     if class_imb:
         # Compute class weights to handle class imbalance
-        class_weights = compute_class_weight('balanced', classes=np.unique(train_generator.classes), y=train_generator.classes)
-        weights = {0: class_weights[0], 1: class_weights[1]}
+        weights = get_class_weights(train_generator)
 
         history = model.fit(
         train_generator,
@@ -146,12 +177,13 @@ def train_model(
 
 
 
-def build_resnet_model(adam_lr: float = 1e-3) -> keras.Model:
+def build_resnet_model(adam_lr: float = 1e-3, jit_compile: bool = False) -> keras.Model:
     """
     Builds and compiles a ResNet model for binary classification.
 
     Args:
         adam_lr (float): Learning rate for the Adam optimizer.
+        jit_compile (bool): Compile training and inference steps with XLA, if the model supports it.
 
     Returns:
         keras.Model: A compiled Keras model.
@@ -177,18 +209,20 @@ def build_resnet_model(adam_lr: float = 1e-3) -> keras.Model:
 
     model.compile(loss='binary_crossentropy', 
                   optimizer=adam_opt, 
-                  metrics=['accuracy', 'precision'])
+                  metrics=['accuracy', 'precision'],
+                  jit_compile=resolve_jit_compile(model, jit_compile))
     
     return model
 
 
 
-def build_inception_model(adam_lr: float = 1e-3) -> keras.Model:
+def build_inception_model(adam_lr: float = 1e-3, jit_compile: bool = False) -> keras.Model:
     """
     Builds and compiles an InceptionV3 model for binary classification using transfer learning.
 
     Args:
         adam_lr (float): Learning rate for the Adam optimizer.
+        jit_compile (bool): Compile training and inference steps with XLA, if the model supports it.
 
     Returns:
         keras.Model: A compiled Keras model.
@@ -214,17 +248,19 @@ def build_inception_model(adam_lr: float = 1e-3) -> keras.Model:
 
     model.compile(loss='binary_crossentropy', 
                   optimizer=adam_opt, 
-                  metrics=['accuracy', 'precision'])
+                  metrics=['accuracy', 'precision'],
+                  jit_compile=resolve_jit_compile(model, jit_compile))
     
     return model
 
 
-def build_efficientnet_model(adam_lr: float = 1e-3) -> keras.Model:
+def build_efficientnet_model(adam_lr: float = 1e-3, jit_compile: bool = False) -> keras.Model:
     """
     Builds and compiles an EfficientNetB0 model for binary classification using transfer learning.
 
     Args:
         adam_lr (float): Learning rate for the Adam optimizer.
+        jit_compile (bool): Compile training and inference steps with XLA, if the model supports it.
 
     Returns:
         keras.Model: A compiled Keras model.
@@ -251,14 +287,15 @@ def build_efficientnet_model(adam_lr: float = 1e-3) -> keras.Model:
 
     model.compile(loss='binary_crossentropy', 
                   optimizer=adam_opt, 
-                  metrics=['accuracy', 'precision'])
+                  metrics=['accuracy', 'precision'],
+                  jit_compile=resolve_jit_compile(model, jit_compile))
     
     return model
 
 
 def train_tf_model(model: keras.Model, 
-                train_generator: keras.preprocessing.image.ImageDataGenerator, 
-                val_generator: keras.preprocessing.image.ImageDataGenerator, 
+                train_generator: Union[keras.preprocessing.image.ImageDataGenerator, tf.data.Dataset], 
+                val_generator: Union[keras.preprocessing.image.ImageDataGenerator, tf.data.Dataset], 
                 epochs: int = 30, 
                 class_imb: bool = False) -> keras.callbacks.History:
     """
@@ -266,8 +303,10 @@ def train_tf_model(model: keras.Model,
 
     Args:
         model (keras.Model): The Keras model to train.
-        train_generator (keras.preprocessing.image.ImageDataGenerator): Data generator for the training set.
-        val_generator (keras.preprocessing.image.ImageDataGenerator): Data generator for the validation set.
+        train_generator (keras.preprocessing.image.ImageDataGenerator | tf.data.Dataset): Data generator or
+                                                                                          dataset for the training set.
+        val_generator (keras.preprocessing.image.ImageDataGenerator | tf.data.Dataset): Data generator or
+                                                                                        dataset for the validation set.
         epochs (int): Number of epochs for training. Default is 30.
         class_imb (bool): boolean to decide whether to apply class balancings
 
@@ -280,8 +319,7 @@ def train_tf_model(model: keras.Model,
 
     if class_imb:
         # Compute class weights to handle class imbalance
-        class_weights = compute_class_weight('balanced', classes=np.unique(train_generator.classes), y=train_generator.classes)
-        weights = {0: class_weights[0], 1: class_weights[1]}
+        weights = get_class_weights(train_generator)
 
         history = model.fit(
         train_generator,
@@ -346,11 +384,11 @@ def add_to_report(model_name: str,
         model_name (str): The name of the model.
         metrics (dict): A dictionary of metrics where keys are metric names and values are lists of values.
         description (str): A brief description of the model.
-        report (pd.DataFrame): The existing report DataFrame to which new data will be added.
-        file_path (str): The file path to save the updated report.
+        report (pd.DataFrame): The existing report (kept for compatibility; rows are appended, not rewritten).
+        file_path (str): The report CSV the row is appended to.
 
     Returns:
-        None: Updates the report CSV file.
+        None: Appends the row to the experiment store and the report CSV file.
     """
     
     metrics_calculated = {}
@@ -364,16 +402,16 @@ def add_to_report(model_name: str,
         'Description': description,
         **metrics_calculated
     }
-    new_row_df = pd.DataFrame([new_row])
-    report = pd.concat([report, new_row_df], ignore_index=True)
-    report.to_csv(file_path, index=False)
+    # O(1) append to the experiment store and the CSV instead of rewriting the whole report
+    record_result(file_path, new_row)
 
 
 def evaluate_model_and_save_results(model: tf.keras.Model, 
                                      model_name: str, 
                                      X_test: np.ndarray, 
                                      y_test_binary: np.ndarray, 
-                                     results_file: str = 'Results/test_metrics.csv') -> None:
+                                     results_file: str = 'Results/test_metrics.csv',
+                                     jit_compile: bool = False) -> None:
     """
     Evaluate the model on the test set and save the results to a CSV file.
 
@@ -383,52 +421,34 @@ def evaluate_model_and_save_results(model: tf.keras.Model,
         X_test (np.ndarray): The test set features.
         y_test_binary (np.ndarray): The binary labels for the test set.
         results_file (str): The file path to save the evaluation results.
+        jit_compile (bool): Run inference through an XLA-compiled fixed-shape function.
 
     Returns:
-        None: The function saves the results to a CSV file and prints evaluation metrics.
+        None: The function appends the results to the experiment store and the CSV file and prints evaluation metrics.
     """
     
-    test_datagen = ImageDataGenerator(rescale=1./255)
-    test_generator = test_datagen.flow(
-        X_test,
-        y_test_binary,
-        batch_size=BATCH_SIZE,
-        seed=SEED,
-        shuffle=False  # Keep shuffle False for evaluation
-    )
-    
-    evaluation = model.evaluate(test_generator)
-    test_loss, test_accuracy, test_precision = evaluation[0], evaluation[1] * 100, evaluation[2] * 100
+    # One inference pass gives every metric; the predictions are cached for plot_misclassified_images
+    evaluation = evaluate_single_pass(model, X_test, y_test_binary, jit_compile=jit_compile)
+    test_loss, test_accuracy, test_precision = (evaluation['loss'], evaluation['accuracy'] * 100,
+                                                evaluation['precision'] * 100)
     
     print(f'Test Loss: {test_loss:.3f}')
     print(f'Test Accuracy: {test_accuracy:.3f}%')
     print(f'Test Precision: {test_precision:.3f}%')
     
-    results_dir = os.path.dirname(results_file)
-    if not os.path.exists(results_dir):
-        os.makedirs(results_dir)
-
-    if os.path.exists(results_file):
-        df = pd.read_csv(results_file)
-    else:
-        df = pd.DataFrame(columns=['Model', 'Test Loss', 'Test Accuracy', 'Test Precision'])
-    
     new_row = {
         'Model': model_name,
         'Test Loss': round(test_loss, 3),
         'Test Accuracy': round(test_accuracy, 3),
         'Test Precision': round(test_precision, 3)
     }
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    df.to_csv(results_file, index=False)
-    
-    y_pred_prob = model.predict(test_generator)
-    y_pred = tf.where(y_pred_prob <= 0.5, 0, 1).numpy()  # Convert probabilities to binary labels
+    record_result(results_file, new_row)
     
-    cm = confusion_matrix(test_generator.y, y_pred)
+    y_pred = evaluation['y_pred']
+    cm = evaluation['confusion_matrix']
     disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=[0, 1])
     fig, ax = plt.subplots(figsize=(6, 6))
     disp.plot(xticks_rotation='horizontal', ax=ax, cmap=plt.cm.Blues)
     plt.show()
     
-    print(classification_report(test_generator.y, y_pred))
\ No newline at end of file
+    print(classification_report(np.asarray(y_test_binary).reshape(-1), y_pred))
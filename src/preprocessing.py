@@ -1,9 +1,12 @@
+import math
 import numpy as np
+import tensorflow as tf
 
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from sklearn.model_selection import train_test_split
 
 from src.constants import BINARY_LABELS, LABELS, BATCH_SIZE, SEED
+from src.datastore import make_label_lut, normalize_chunked
 
 
 def data_gen(rescale_train: bool = True) -> tuple:
@@ -66,8 +69,9 @@ def norm_X(X_train: np.ndarray, X_test: np.ndarray) -> tuple:
                - test_norm (np.ndarray): The normalized testing features.
     """
     
-    train_norm = (X_train / 255.0).astype('float32')
-    test_norm = (X_test / 255.0).astype('float32')
+    # Scale straight into float32 chunk by chunk: no float64 temporary of the whole set
+    train_norm = normalize_chunked(X_train)
+    test_norm = normalize_chunked(X_test)
 
     print("=" * 50)
     print(f"Min and Max values for X train: {np.min(train_norm)}, {np.max(train_norm)}")
@@ -91,13 +95,15 @@ def binary_y(y_train: np.ndarray, y_test: np.ndarray) -> tuple:
                - y_test_binary (np.ndarray): The binary labels for the testing set.
     """
     
-    y_train_binary = np.vectorize(BINARY_LABELS.get)(y_train.flatten())
-    y_test_binary = np.vectorize(BINARY_LABELS.get)(y_test.flatten())
+    binary_lut = make_label_lut(BINARY_LABELS)
+    y_train_binary = binary_lut[y_train.flatten()]
+    y_test_binary = binary_lut[y_test.flatten()]
 
+    label_names = np.array([LABELS[i] for i in range(len(LABELS))])
     print("=" * 70)
-    print(f"First 10 binary labels for training set: \n{y_train_binary[:10]}\n{np.vectorize(LABELS.get)(y_train.flatten())[:10]}")
+    print(f"First 10 binary labels for training set: \n{y_train_binary[:10]}\n{label_names[y_train.flatten()[:10]]}")
     print("=" * 70)
-    print(f"First 10 binary labels for test set: \n{y_test_binary[:10]}\n{np.vectorize(LABELS.get)(y_test.flatten())[:10]}")
+    print(f"First 10 binary labels for test set: \n{y_test_binary[:10]}\n{label_names[y_test.flatten()[:10]]}")
     print("=" * 70)
 
     return y_train_binary, y_test_binary
@@ -176,4 +182,141 @@ def apply_data_gen(train_datagen: ImageDataGenerator,
         seed=SEED
     )
 
-    return train_gen, val_gen
\ No newline at end of file
+    return train_gen, val_gen
+
+
+def _augment_batch(images: tf.Tensor, seed: tf.Tensor, rotation_range: float = 15.0,
+                   shift_range: float = 0.1, horizontal_flip: bool = True) -> tf.Tensor:
+    """
+    Apply the ImageDataGenerator augmentation (rotation, width/height shift, horizontal flip)
+    to a whole batch with stateless random ops, so results only depend on the seed.
+
+    Args:
+        images (tf.Tensor): Batch of float32 images (batch, height, width, channels).
+        seed (tf.Tensor): Shape (2,) int64 seed for this batch.
+        rotation_range (float): Maximum rotation in degrees.
+        shift_range (float): Maximum shift as a fraction of width/height.
+        horizontal_flip (bool): Whether to randomly flip images horizontally.
+
+    Returns:
+        tf.Tensor: The augmented batch.
+    """
+    batch = tf.shape(images)[0]
+    height = tf.cast(tf.shape(images)[1], tf.float32)
+    width = tf.cast(tf.shape(images)[2], tf.float32)
+    seeds = tf.random.experimental.stateless_split(seed, num=4)
+
+    angles = tf.random.stateless_uniform([batch], seeds[0], -1.0, 1.0) * (rotation_range * math.pi / 180.0)
+    tx = tf.random.stateless_uniform([batch], seeds[1], -shift_range, shift_range) * width
+    ty = tf.random.stateless_uniform([batch], seeds[2], -shift_range, shift_range) * height
+
+    # Output->input mapping of a rotation about the image center followed by a shift
+    cos, sin = tf.cos(angles), tf.sin(angles)
+    x_offset = ((width - 1) - (cos * (width - 1) - sin * (height - 1))) / 2.0
+    y_offset = ((height - 1) - (sin * (width - 1) + cos * (height - 1))) / 2.0
+    zeros = tf.zeros_like(angles)
+    transforms = tf.stack([cos, -sin, x_offset - cos * tx + sin * ty,
+                           sin, cos, y_offset - sin * tx - cos * ty,
+                           zeros, zeros], axis=1)
+
+    images = tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=transforms,
+        output_shape=tf.shape(images)[1:3],
+        fill_value=0.0,
+        interpolation='BILINEAR',
+        fill_mode='NEAREST'  # ImageDataGenerator default
+    )
+
+    if horizontal_flip:
+        flip = tf.random.stateless_uniform([batch], seeds[3]) < 0.5
+        images = tf.where(flip[:, None, None, None], tf.reverse(images, axis=[2]), images)
+
+    return images
+
+
+def make_tf_dataset(X: np.ndarray,
+                    y: np.ndarray,
+                    training: bool,
+                    rescale: bool = True,
+                    batch_size: int = BATCH_SIZE,
+                    seed: int = SEED,
+                    cache: bool = True) -> tf.data.Dataset:
+    """
+    Build a tf.data input pipeline equivalent to ImageDataGenerator.flow.
+
+    Training datasets are shuffled and augmented (rotation 15, shift 0.1, horizontal flip)
+    in parallel, vectorized per batch; validation/test datasets are only rescaled.
+    All randomness derives from ``seed``, so runs are reproducible while every epoch
+    still sees different augmentations.
+
+    Args:
+        X (np.ndarray): Images (num_samples, height, width, channels), uint8 or float.
+        y (np.ndarray): Labels.
+        training (bool): If True, shuffle and augment.
+        rescale (bool): If True, scale pixel values by 1./255.
+        batch_size (int): Batch size.
+        seed (int): Seed for shuffling and augmentation.
+        cache (bool): Cache the (un-augmented) samples in memory after the first epoch.
+
+    Returns:
+        tf.data.Dataset: Dataset of (images, labels) batches ready for model.fit/evaluate.
+                         The source labels are kept on it as ``y`` (see models.get_class_weights).
+    """
+    
+    dataset = tf.data.Dataset.from_tensor_slices((X, y))
+    scale = 1. / 255 if rescale else 1.0
+
+    def to_float(images, labels):
+        return tf.cast(images, tf.float32) * scale, labels
+
+    if training:
+        if cache:
+            dataset = dataset.cache()
+        dataset = dataset.shuffle(buffer_size=len(X), seed=seed, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+        # One deterministic seed per batch, different on every epoch
+        batch_seeds = tf.data.Dataset.random(seed=seed, rerandomize_each_iteration=True).batch(2)
+        dataset = tf.data.Dataset.zip((dataset, batch_seeds))
+        dataset = dataset.map(
+            lambda batch, batch_seed: (_augment_batch(to_float(*batch)[0], batch_seed), batch[1]),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=True
+        )
+    else:
+        dataset = dataset.batch(batch_size)
+        dataset = dataset.map(to_float, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+        if cache:
+            dataset = dataset.cache()
+
+    dataset = dataset.prefetch(tf.data.AUTOTUNE)
+    # Like class_names on image_dataset_from_directory: lets callers read the labels without a pass
+    dataset.y = y
+    return dataset
+
+
+def apply_tf_data(X_train: np.ndarray, 
+                  y_train: np.ndarray, 
+                  X_val: np.ndarray, 
+                  y_val: np.ndarray, 
+                  rescale_train: bool = True) -> tuple:
+    """
+    tf.data counterpart of data_gen + apply_data_gen: build the training and validation pipelines.
+
+    Args:
+        X_train (np.ndarray): The training features.
+        y_train (np.ndarray): The training labels.
+        X_val (np.ndarray): The validation features.
+        y_val (np.ndarray): The validation labels.
+        rescale_train (bool): If True, the training data will be rescaled by 1./255.
+
+    Returns:
+        tuple: A tuple containing:
+               - train_ds (tf.data.Dataset): The augmented training dataset.
+               - val_ds (tf.data.Dataset): The rescaled validation dataset.
+    """
+    
+    train_ds = make_tf_dataset(X_train, y_train, training=True, rescale=rescale_train)
+    val_ds = make_tf_dataset(X_val, y_val, training=False)
+
+    return train_ds, val_ds
@@ -0,0 +1,255 @@
+import os
+import inspect
+import tempfile
+import numpy as np
+import multiprocessing as mp
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from src.constants import INPUT_SHAPE, SEED
+
+REPORT_METRICS = ['accuracy', 'loss', 'precision', 'val_accuracy', 'val_loss', 'val_precision']
+
+
+def _init_worker(threads: int) -> None:
+    """Cap the TensorFlow/BLAS thread pools of a worker before TensorFlow is imported."""
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def stage_arrays(work_dir: str, **arrays: Optional[np.ndarray]) -> Dict[str, str]:
+    """
+    Save arrays as .npy files that worker processes memory-map instead of receiving pickled copies.
+
+    Args:
+        work_dir (str): Directory for the files.
+        **arrays (Optional[np.ndarray]): Arrays by name; None values are skipped.
+
+    Returns:
+        Dict[str, str]: Name -> path of the saved file.
+    """
+
+    os.makedirs(work_dir, exist_ok=True)
+    paths = {}
+    for name, array in arrays.items():
+        if array is not None:
+            paths[name] = os.path.join(work_dir, f'{name}.npy')
+            np.save(paths[name], np.asarray(array))
+    return paths
+
+
+def _run_one(run: Dict[str, Any]) -> Dict[str, Any]:
+    """Train one seed/fold in a worker process and return its history."""
+    import keras
+    from src import models
+    from src.preprocessing import apply_tf_data
+
+    keras.utils.set_random_seed(run['seed'])
+    os.makedirs(run['work_dir'], exist_ok=True)
+    os.chdir(run['work_dir'])  # keeps ModelCheckpoint('best_model.keras') files apart
+
+    X = np.load(run['X_path'], mmap_mode='r')
+    y = np.load(run['y_path'], mmap_mode='r')
+    if run['val_idx'] is None:
+        X_train, y_train = X, y
+        X_val = np.load(run['X_val_path'], mmap_mode='r')
+        y_val = np.load(run['y_val_path'], mmap_mode='r')
+    else:
+        X_train, y_train = X[run['train_idx']], y[run['train_idx']]
+        X_val, y_val = X[run['val_idx']], y[run['val_idx']]
+
+    train_ds, val_ds = apply_tf_data(np.asarray(X_train), np.asarray(y_train),
+                                     np.asarray(X_val), np.asarray(y_val))
+
+    builder = run['builder'] if callable(run['builder']) else getattr(models, run['builder'])
+    model = builder(**run['builder_kwargs'])
+    train_fn = getattr(models, run['train_fn'])
+    history = train_fn(model, train_ds, val_ds, epochs=run['epochs'], class_imb=run['class_imb'])
+
+    return {'run': run['index'], 'seed': run['seed'], 'fold': run['fold'], 'history': history.history}
+
+
+def best_epoch_metrics(history: Dict[str, List[float]], monitor: str = 'val_loss') -> Dict[str, float]:
+    """
+    Pick the metrics of the epoch with the best monitored value, i.e. the weights
+    EarlyStopping(restore_best_weights=True) keeps.
+
+    Args:
+        history (Dict[str, List[float]]): A Keras history dictionary.
+        monitor (str): Metric used to choose the epoch (minimized for losses, maximized otherwise).
+
+    Returns:
+        Dict[str, float]: Metric name -> value at the best epoch.
+    """
+
+    values = history[monitor]
+    best = int(np.argmin(values) if 'loss' in monitor else np.argmax(values))
+    return {key: float(series[best]) for key, series in history.items() if len(series) > best}
+
+
+def run_parallel_training(builder: Any,
+                          X_train: np.ndarray,
+                          y_train: np.ndarray,
+                          X_val: Optional[np.ndarray] = None,
+                          y_val: Optional[np.ndarray] = None,
+                          seeds: Optional[List[int]] = None,
+                          folds: int = 0,
+                          builder_kwargs: Optional[dict] = None,
+                          train_fn: str = 'train_model',
+                          epochs: int = 30,
+                          class_imb: bool = False,
+                          n_workers: Optional[int] = None,
+                          threads_per_worker: Optional[int] = None,
+                          work_dir: Optional[str] = None,
+                          history_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Train several seeds or cross-validation folds of a model builder in parallel worker processes.
+
+    Args:
+        builder (Any): A builder from src.models (or its name), e.g. build_cnn_model or build_efficientnet_model.
+        X_train (np.ndarray): The training features.
+        y_train (np.ndarray): The training (binary) labels.
+        X_val (Optional[np.ndarray]): The validation features; required unless folds > 0.
+        y_val (Optional[np.ndarray]): The validation labels; required unless folds > 0.
+        seeds (Optional[List[int]]): One run per seed (default: five seeds derived from SEED).
+        folds (int): If > 0, run stratified k-fold cross-validation on X_train instead of a fixed validation set.
+        builder_kwargs (Optional[dict]): Keyword arguments for the builder; input_shape defaults to INPUT_SHAPE.
+        train_fn (str): 'train_model' (CNN) or 'train_tf_model' (transfer models).
+        epochs (int): Number of training epochs per run.
+        class_imb (bool): boolean to decide whether to apply class balancings
+        n_workers (Optional[int]): Number of worker processes (default: number of runs, capped by cores).
+        threads_per_worker (Optional[int]): TensorFlow threads per worker (default: cores // n_workers).
+        work_dir (Optional[str]): Directory for data handoff and per-run files (default: a temporary directory).
+        history_prefix (Optional[str]): If given, each history is stored in the experiment store as <prefix>_run<i>.pkl.
+
+    Returns:
+        List[Dict[str, Any]]: Per-run results with 'run', 'seed', 'fold' and 'history', in run order.
+    """
+
+    builder_name = builder if isinstance(builder, str) else builder.__name__
+    builder_kwargs = dict(builder_kwargs or {})
+    if isinstance(builder, str):
+        needs_shape = builder_name == 'build_cnn_model'
+    else:
+        needs_shape = 'input_shape' in inspect.signature(builder).parameters
+    if needs_shape:
+        builder_kwargs.setdefault('input_shape', INPUT_SHAPE)
+
+    work_dir = os.path.abspath(work_dir or tempfile.mkdtemp(prefix='runs_'))
+    paths = stage_arrays(work_dir, X=X_train, y=y_train, X_val=X_val, y_val=y_val)
+
+    if folds:
+        from sklearn.model_selection import StratifiedKFold
+        splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=SEED)
+        splits = list(splitter.split(np.zeros(len(y_train)), np.asarray(y_train).flatten()))
+        seeds = [SEED + i for i in range(folds)] if seeds is None else seeds
+    else:
+        if X_val is None or y_val is None:
+            raise ValueError("X_val and y_val are required when folds is 0")
+        seeds = [SEED + i for i in range(5)] if seeds is None else seeds
+        splits = [(None, None)] * len(seeds)
+
+    runs = []
+    for index, (seed, (train_idx, val_idx)) in enumerate(zip(seeds, splits)):
+        runs.append({
+            'index': index,
+            'seed': seed,
+            'fold': index if folds else None,
+            'train_idx': train_idx,
+            'val_idx': val_idx,
+            'X_path': paths['X'],
+            'y_path': paths['y'],
+            'X_val_path': paths.get('X_val'),
+            'y_val_path': paths.get('y_val'),
+            'builder': builder if not isinstance(builder, str) else builder_name,
+            'builder_kwargs': builder_kwargs,
+            'train_fn': train_fn,
+            'epochs': epochs,
+            'class_imb': class_imb,
+            'work_dir': os.path.join(work_dir, f'run_{index}')
+        })
+
+    cores = os.cpu_count() or 1
+    n_workers = n_workers or min(len(runs), cores)
+    threads_per_worker = threads_per_worker or max(1, cores // n_workers)
+    print(f"Training {len(runs)} runs of {builder_name} on {n_workers} workers x {threads_per_worker} threads")
+
+    results = []
+    # spawn: TensorFlow is not fork-safe once initialized in the parent
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn'),
+                             initializer=_init_worker, initargs=(threads_per_worker,)) as executor:
+        futures = [executor.submit(_run_one, run) for run in runs]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"Run {result['run']} (seed {result['seed']}) finished after {len(result['history']['loss'])} epochs")
+            results.append(result)
+
+    results.sort(key=lambda result: result['run'])
+
+    if history_prefix:
+        from src.experiments import get_store
+        store = get_store()
+        for result in results:
+            store.add_history(f"{history_prefix}_run{result['run']}.pkl", result['history'], model=builder_name)
+
+    return results
+
+
+def aggregate_runs(results: List[Dict[str, Any]], monitor: str = 'val_loss') -> Dict[str, List[float]]:
+    """
+    Collect, per report metric, the best-epoch value of every run: the input add_to_report expects.
+
+    Args:
+        results (List[Dict[str, Any]]): Output of run_parallel_training.
+        monitor (str): Metric used to choose each run's best epoch.
+
+    Returns:
+        Dict[str, List[float]]: Metric name -> list of per-run values.
+    """
+
+    per_run = [best_epoch_metrics(result['history'], monitor) for result in results]
+    return {metric: [run[metric] for run in per_run if metric in run] for metric in REPORT_METRICS}
+
+
+def run_and_report(model_name: str,
+                   description: str,
+                   builder: Any,
+                   X_train: np.ndarray,
+                   y_train: np.ndarray,
+                   X_val: Optional[np.ndarray] = None,
+                   y_val: Optional[np.ndarray] = None,
+                   file_path: str = 'Results/report_results.csv',
+                   **kwargs: Any) -> List[Dict[str, Any]]:
+    """
+    Run run_parallel_training and append the mean/std row for all runs to the report CSV.
+
+    Args:
+        model_name (str): The name of the model in the report.
+        description (str): A brief description of the model.
+        builder (Any): A builder from src.models (or its name).
+        X_train (np.ndarray): The training features.
+        y_train (np.ndarray): The training labels.
+        X_val (Optional[np.ndarray]): The validation features.
+        y_val (Optional[np.ndarray]): The validation labels.
+        file_path (str): The report CSV to update.
+        **kwargs (Any): Extra arguments for run_parallel_training (seeds, folds, n_workers, ...).
+
+    Returns:
+        List[Dict[str, Any]]: Per-run results.
+    """
+
+    from src.models import add_to_report
+    from src.utils import initialize_report
+
+    results = run_parallel_training(builder, X_train, y_train, X_val, y_val, **kwargs)
+    report = initialize_report(file_path)
+    add_to_report(model_name, aggregate_runs(results), f"{description} ({len(results)} runs)", report, file_path)
+
+    return results
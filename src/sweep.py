@@ -0,0 +1,267 @@
+import os
+import csv
+import json
+import math
+import time
+import random
+import itertools
+import tempfile
+import numpy as np
+import multiprocessing as mp
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional, Union
+
+from src.constants import INPUT_SHAPE, SEED
+from src.runner import _init_worker, stage_arrays
+
+SWEEP_COLUMNS = ['Timestamp', 'Sweep', 'Builder', 'Config', 'Params', 'Rung', 'Epochs',
+                 'val_loss', 'val_accuracy', 'val_precision', 'Seconds']
+
+
+def expand_grid(param_grid: Union[Dict[str, list], List[dict]],
+                n_configs: Optional[int] = None,
+                seed: int = SEED) -> List[dict]:
+    """
+    Expand a parameter grid into a list of configurations.
+
+    Args:
+        param_grid (Union[Dict[str, list], List[dict]]): Parameter name -> candidate values, or an explicit list of configs.
+        n_configs (Optional[int]): If given, randomly sample this many configurations from the grid.
+        seed (int): Seed for sampling.
+
+    Returns:
+        List[dict]: Builder keyword arguments, one dict per configuration.
+    """
+
+    if isinstance(param_grid, dict):
+        keys = list(param_grid)
+        configs = [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+    else:
+        configs = [dict(config) for config in param_grid]
+    if n_configs is not None and n_configs < len(configs):
+        configs = random.Random(seed).sample(configs, n_configs)
+    return configs
+
+
+def _train_config(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Train one configuration up to the epoch budget of its rung, resuming from its last checkpoint.
+
+    The metrics are those of the last epoch, i.e. of the weights saved in the checkpoint.
+    """
+    import keras
+    from src import models
+    from src.preprocessing import apply_tf_data
+
+    keras.utils.set_random_seed(task['seed'])
+    os.makedirs(task['config_dir'], exist_ok=True)
+    checkpoint = os.path.join(task['config_dir'], 'model.keras')
+    history_path = os.path.join(task['config_dir'], 'history.json')
+
+    X = np.load(task['paths']['X'], mmap_mode='r')
+    y = np.load(task['paths']['y'], mmap_mode='r')
+    X_val = np.load(task['paths']['X_val'], mmap_mode='r')
+    y_val = np.load(task['paths']['y_val'], mmap_mode='r')
+    train_ds, val_ds = apply_tf_data(np.asarray(X), np.asarray(y), np.asarray(X_val), np.asarray(y_val))
+
+    if os.path.exists(checkpoint):
+        model = keras.models.load_model(checkpoint)
+        with open(history_path) as f:
+            history = json.load(f)
+    else:
+        builder = getattr(models, task['builder'])
+        model = builder(**task['params'])
+        history = {}
+
+    start = time.perf_counter()
+    initial_epoch = len(history.get('loss', []))
+    fit = model.fit(train_ds, validation_data=val_ds, initial_epoch=initial_epoch,
+                    epochs=task['epochs'], verbose=0)
+    for key, values in fit.history.items():
+        history.setdefault(key, []).extend(float(v) for v in values)
+
+    model.save(checkpoint)
+    with open(history_path, 'w') as f:
+        json.dump(history, f)
+
+    # Report the epoch the checkpoint holds: promoted configs resume from these weights, and
+    # the checkpoint returned by the sweep is this model, not the best epoch seen so far
+    last = len(history['val_loss']) - 1
+    return {
+        'config': task['config'],
+        'rung': task['rung'],
+        'epochs': last + 1,
+        'val_loss': history['val_loss'][last],
+        'val_accuracy': history.get('val_accuracy', [math.nan] * (last + 1))[last],
+        'val_precision': history.get('val_precision', [math.nan] * (last + 1))[last],
+        'seconds': time.perf_counter() - start
+    }
+
+
+class AshaScheduler:
+    """
+    Asynchronous successive halving (ASHA): a configuration is promoted to the next rung
+    as soon as it ranks in the top 1/eta of the configurations finished on its rung;
+    otherwise a free worker starts a new configuration on rung 0.
+    """
+
+    def __init__(self, n_configs: int, min_epochs: int = 2, max_epochs: int = 30, eta: int = 3) -> None:
+        self.n_configs = n_configs
+        self.min_epochs = min_epochs
+        self.max_epochs = max_epochs
+        self.eta = eta
+        self.max_rung = max(0, int(math.floor(math.log(max_epochs / min_epochs, eta) + 1e-9)))
+        self.rungs: Dict[int, Dict[int, float]] = {r: {} for r in range(self.max_rung + 1)}
+        self.promoted: Dict[int, set] = {r: set() for r in range(self.max_rung + 1)}
+        self.next_config = 0
+
+    def budget(self, rung: int) -> int:
+        return self.max_epochs if rung >= self.max_rung else min(self.max_epochs, self.min_epochs * self.eta ** rung)
+
+    def report(self, config: int, rung: int, val_loss: float) -> None:
+        self.rungs[rung][config] = val_loss
+
+    def next_job(self) -> Optional[tuple]:
+        """Return (config, rung) to train next, or None if nothing can start now."""
+        for rung in range(self.max_rung - 1, -1, -1):
+            finished = sorted(self.rungs[rung].items(), key=lambda item: item[1])
+            top = finished[:len(finished) // self.eta]
+            for config, _ in top:
+                if config not in self.promoted[rung]:
+                    self.promoted[rung].add(config)
+                    return config, rung + 1
+        if self.next_config < self.n_configs:
+            self.next_config += 1
+            return self.next_config - 1, 0
+        return None
+
+
+def _append_rows(results_file: str, rows: List[dict]) -> None:
+    directory = os.path.dirname(results_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    new_file = not os.path.exists(results_file)
+    with open(results_file, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SWEEP_COLUMNS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def successive_halving_sweep(builder: str,
+                             param_grid: Union[Dict[str, list], List[dict]],
+                             X_train: np.ndarray,
+                             y_train: np.ndarray,
+                             X_val: np.ndarray,
+                             y_val: np.ndarray,
+                             min_epochs: int = 2,
+                             max_epochs: int = 30,
+                             eta: int = 3,
+                             n_configs: Optional[int] = None,
+                             n_workers: Optional[int] = None,
+                             threads_per_worker: Optional[int] = None,
+                             sweep_name: str = 'sweep',
+                             results_file: str = 'Results/sweep_results.csv',
+                             work_dir: Optional[str] = None,
+                             seed: int = SEED) -> List[dict]:
+    """
+    Hyperparameter sweep of a src.models builder with ASHA on val_loss, run in a process pool.
+
+    Every configuration first trains for min_epochs; only the best 1/eta of each rung continue
+    (resuming from their checkpoint) to eta times more epochs, up to max_epochs.
+
+    Args:
+        builder (str): Name of a builder in src.models, e.g. 'build_cnn_model' or 'build_resnet_model'.
+        param_grid (Union[Dict[str, list], List[dict]]): Builder arguments to search, e.g.
+            {'learning_rate': [1e-3, 3e-4], 'lr_dense': [1e-3, 1e-4]} or {'adam_lr': [...]}.
+        X_train (np.ndarray): The training features.
+        y_train (np.ndarray): The training labels.
+        X_val (np.ndarray): The validation features.
+        y_val (np.ndarray): The validation labels.
+        min_epochs (int): Epoch budget of the first rung.
+        max_epochs (int): Epoch budget of the last rung.
+        eta (int): Reduction factor between rungs.
+        n_configs (Optional[int]): Randomly sample this many configurations from the grid.
+        n_workers (Optional[int]): Number of worker processes (default: number of cores, capped by configs).
+        threads_per_worker (Optional[int]): TensorFlow threads per worker (default: cores // n_workers).
+        sweep_name (str): Name recorded in the results file.
+        results_file (str): CSV to which every finished (config, rung) is appended.
+        work_dir (Optional[str]): Directory for data handoff and checkpoints (default: a temporary directory).
+        seed (int): Seed for sampling and training.
+
+    Returns:
+        List[dict]: The last result of every configuration, best val_loss first.
+    """
+
+    configs = expand_grid(param_grid, n_configs, seed)
+    if builder == 'build_cnn_model':
+        for config in configs:
+            config.setdefault('input_shape', INPUT_SHAPE)
+
+    work_dir = os.path.abspath(work_dir or tempfile.mkdtemp(prefix='sweep_'))
+    paths = stage_arrays(work_dir, X=X_train, y=y_train, X_val=X_val, y_val=y_val)
+
+    scheduler = AshaScheduler(len(configs), min_epochs, max_epochs, eta)
+    cores = os.cpu_count() or 1
+    n_workers = n_workers or min(len(configs), cores)
+    threads_per_worker = threads_per_worker or max(1, cores // n_workers)
+    print(f"Sweeping {len(configs)} configs of {builder}: rungs {[scheduler.budget(r) for r in range(scheduler.max_rung + 1)]} "
+          f"epochs, {n_workers} workers x {threads_per_worker} threads")
+
+    def make_task(config: int, rung: int) -> dict:
+        return {
+            'config': config,
+            'rung': rung,
+            'epochs': scheduler.budget(rung),
+            'params': configs[config],
+            'builder': builder,
+            'paths': paths,
+            'seed': seed + config,
+            'config_dir': os.path.join(work_dir, f'config_{config}')
+        }
+
+    latest: Dict[int, dict] = {}
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn'),
+                             initializer=_init_worker, initargs=(threads_per_worker,)) as executor:
+        running = set()
+
+        def fill() -> None:
+            while len(running) < n_workers:
+                job = scheduler.next_job()
+                if job is None:
+                    return
+                running.add(executor.submit(_train_config, make_task(*job)))
+
+        fill()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.discard(future)
+                result = future.result()
+                scheduler.report(result['config'], result['rung'], result['val_loss'])
+                latest[result['config']] = result
+                print(f"Config {result['config']} rung {result['rung']} ({result['epochs']} epochs): "
+                      f"val_loss {result['val_loss']:.4f}")
+                _append_rows(results_file, [{
+                    'Timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'Sweep': sweep_name,
+                    'Builder': builder,
+                    'Config': result['config'],
+                    'Params': json.dumps({k: v for k, v in configs[result['config']].items() if k != 'input_shape'}),
+                    'Rung': result['rung'],
+                    'Epochs': result['epochs'],
+                    'val_loss': round(result['val_loss'], 5),
+                    'val_accuracy': round(result['val_accuracy'], 5),
+                    'val_precision': round(result['val_precision'], 5),
+                    'Seconds': round(result['seconds'], 1)
+                }])
+            fill()
+
+    ranked = sorted(latest.values(), key=lambda result: (-result['rung'], result['val_loss']))
+    for result in ranked:
+        result['params'] = configs[result['config']]
+        result['checkpoint'] = os.path.join(work_dir, f"config_{result['config']}", 'model.keras')
+    best = ranked[0]
+    print(f"Best config {best['config']}: {best['params']} val_loss {best['val_loss']:.4f} after {best['epochs']} epochs")
+
+    return ranked
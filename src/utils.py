@@ -1,11 +1,11 @@
 import platform
 import sys
 import os
-import tensorflow as tf
-import keras
-from typing import Dict, Any
+from typing import Dict, Any, TYPE_CHECKING
 from numpy import mean, std, ndarray
-from pandas import DataFrame, read_csv
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 def is_gpu_active() -> None:
     """
@@ -18,6 +18,9 @@ def is_gpu_active() -> None:
         - GPU availability status.
     """
     
+    import tensorflow as tf
+    import keras
+
     print(f"Python Platform: {platform.platform()}")
     print(f"TensorFlow Version: {tf.__version__}")
     print(f"Keras Version: {keras.__version__}")
@@ -49,7 +52,7 @@ def calculate_mean_std(data: ndarray) -> tuple:
     return mean_value, std_value
 
 
-def initialize_report(csv_file_path: str) -> DataFrame:
+def initialize_report(csv_file_path: str) -> 'DataFrame':
     """
     Initializes a report CSV file if it does not exist.
 
@@ -59,6 +62,8 @@ def initialize_report(csv_file_path: str) -> DataFrame:
     Returns:
         DataFrame: A DataFrame containing the report structure.
     """
+    from pandas import DataFrame, read_csv
+
     os.makedirs("Results", exist_ok=True)
 
     if not os.path.exists(csv_file_path):
@@ -4,18 +4,20 @@ import numpy as np
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import plotly.figure_factory as ff
-import tensorflow as tf
-import visualkeras
 
 from pandas import DataFrame
-from PIL import ImageFont
 from collections import defaultdict
-from typing import Any, Optional
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
-from tensorflow.keras import layers
+from typing import Any, Optional, TYPE_CHECKING
 
 from src.constants import LABELS, SEED, BATCH_SIZE
 from src.utils import calculate_mean_std
+from src.evaluation import evaluate_single_pass
+from src.experiments import get_store
+
+# TensorFlow and visualkeras are imported by the functions that need them
+if TYPE_CHECKING:
+    import tensorflow as tf
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
 
 def images_viz(rows: int, cols: int, set_length: int, X: np.ndarray, y: np.ndarray, set: str = 'train') -> None:
     """
@@ -159,7 +161,7 @@ def histogram_distributions(instance: int, X: np.ndarray) -> None:
     fig2.show()
 
 
-def viz_images_generator(data_gen: ImageDataGenerator, X: np.ndarray) -> None:
+def viz_images_generator(data_gen: 'ImageDataGenerator', X: np.ndarray) -> None:
     """
     Visualize augmented images generated by an ImageDataGenerator.
 
@@ -190,14 +192,18 @@ def scatter_plot_metrics(file_name: str) -> None:
     Plot chosen metrics from a training history file.
 
     Args:
-        file_name (str): The name of the history file containing training metrics.
+        file_name (str): The name of the history in the experiment store (its former History_models file name).
 
     Returns:
         None: Displays a scatter plot of the training and validation metrics.
     """
     
-    with open("History_models/" + file_name, 'rb') as history_file:
-        history = pickle.load(history_file)
+    store = get_store()
+    history = store.history(file_name)
+    if history is None:
+        with open("History_models/" + file_name, 'rb') as history_file:
+            history = pickle.load(history_file)
+        store.add_history(file_name, history)
 
     epochs = list(range(1, len(next(iter(history.values()))) + 1))
 
@@ -365,7 +371,7 @@ def bar_plot_metric_performances(df_metric: DataFrame) -> go.Figure:
     return fig
 
 
-def plot_misclassified_images(model: tf.keras.Model, 
+def plot_misclassified_images(model: 'tf.keras.Model', 
                               X_test: np.ndarray, 
                               y_test_binary: np.ndarray, 
                               class_labels: list, 
@@ -384,18 +390,11 @@ def plot_misclassified_images(model: tf.keras.Model,
         None: Displays a grid of misclassified images with their predicted and true labels.
     """
     
-    test_datagen = ImageDataGenerator(rescale=1./255)
-    test_generator = test_datagen.flow(
-        X_test,
-        y_test_binary,
-        batch_size=BATCH_SIZE,
-        seed=SEED,
-        shuffle=False  # Keep shuffle False for evaluation
-    )
-    
-    y_pred_prob = model.predict(test_generator)
-    y_pred = np.where(y_pred_prob <= 0.5, 0, 1)
-    misclassified_indices = np.where(y_pred.flatten() != test_generator.y.flatten())[0]
+    # Reuses the predictions of evaluate_model_and_save_results when the model and test set are unchanged
+    evaluation = evaluate_single_pass(model, X_test, y_test_binary)
+    y_pred = evaluation['y_pred']
+    y_true = np.asarray(y_test_binary).reshape(-1)
+    misclassified_indices = evaluation['misclassified']
     
     if len(misclassified_indices) < num_images:
         print(f"There are only {len(misclassified_indices)} available misclassified images.")
@@ -410,7 +409,7 @@ def plot_misclassified_images(model: tf.keras.Model,
         plt.imshow(X_test[idx])
         plt.axis("off")
         predicted_label = class_labels[int(y_pred[idx])]
-        true_label = class_labels[int(test_generator.y[idx])]
+        true_label = class_labels[int(y_true[idx])]
         plt.title(f"Pred: {predicted_label}\nTrue: {true_label}", fontsize=12)
     
     plt.tight_layout()
@@ -429,6 +428,10 @@ def visualize_model(model: Any,
         font_path (Optional[str]): Path to a custom font file for labels.
     """
     
+    import visualkeras
+    from PIL import ImageFont
+    from tensorflow.keras import layers
+
     color_map = defaultdict(dict)
     color_map[layers.Conv2D]['fill'] = '#00f5d4'
     color_map[layers.MaxPooling2D]['fill'] = '#8338ec'
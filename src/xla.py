@@ -0,0 +1,148 @@
+import time
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.constants import BATCH_SIZE
+from src.experiments import record_result
+
+
+def xla_supported(model: Any, batch_size: int = 2, training: bool = True) -> bool:
+    """
+    Check whether a model compiles with XLA by tracing one jit-compiled step on a dummy batch.
+
+    Args:
+        model (Any): A built Keras model.
+        batch_size (int): Size of the dummy batch.
+        training (bool): Also compile the gradient computation, as a training step does.
+
+    Returns:
+        bool: True if XLA compilation succeeded.
+    """
+
+    dummy = tf.zeros((batch_size, *model.input_shape[1:]), dtype=tf.float32)
+
+    @tf.function(jit_compile=True)
+    def step(x):
+        # training=False so the probe never updates BatchNormalization statistics
+        if not training:
+            return model(x, training=False)
+        with tf.GradientTape() as tape:
+            loss = tf.reduce_mean(model(x, training=False))
+        return tape.gradient(loss, model.trainable_variables)
+
+    try:
+        step(dummy)
+        return True
+    except Exception as e:
+        print(f"XLA compilation not supported for {model.name}, falling back: {type(e).__name__}: {str(e)[:200]}")
+        return False
+
+
+def resolve_jit_compile(model: Any, jit_compile: bool) -> bool:
+    """The jit_compile value to pass to model.compile: the requested one, unless XLA fails on this model."""
+    return bool(jit_compile) and xla_supported(model)
+
+
+def _bucket_sizes(max_batch_size: int) -> List[int]:
+    sizes = [1]
+    while sizes[-1] < max_batch_size:
+        sizes.append(min(sizes[-1] * 4, max_batch_size))
+    return sizes
+
+
+class CompiledPredictor:
+    """
+    Fixed-shape batched inference for a Keras model, callable like the model itself.
+
+    Batches are padded into preallocated buffers of a few bucket sizes (1, 4, 16, ... up to
+    max_batch_size), so the jit-compiled function is traced once per bucket instead of once per
+    batch size. Falls back to a plain tf.function when XLA cannot compile the model.
+    """
+
+    def __init__(self, model: Any, max_batch_size: int = BATCH_SIZE, jit_compile: bool = True) -> None:
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.jit_compile = bool(jit_compile) and xla_supported(model, training=False)
+        self._predict = tf.function(lambda x: model(x, training=False), jit_compile=self.jit_compile)
+        self._buffers = {size: np.zeros((size, *model.input_shape[1:]), dtype=np.float32)
+                         for size in _bucket_sizes(max_batch_size)}
+
+    def _predict_padded(self, batch: np.ndarray) -> np.ndarray:
+        size = next(size for size in self._buffers if size >= len(batch))
+        buffer = self._buffers[size]
+        buffer[:len(batch)] = batch
+        return np.asarray(self._predict(buffer))[:len(batch)]
+
+    def __call__(self, batch: np.ndarray, training: bool = False) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.float32)
+        outputs = [self._predict_padded(batch[start:start + self.max_batch_size])
+                   for start in range(0, len(batch), self.max_batch_size)]
+        return np.concatenate(outputs) if outputs else np.empty((0, 1), dtype=np.float32)
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self(batch)
+
+
+def _train_steps_per_sec(model: Any, X: np.ndarray, y: np.ndarray, batch_size: int, steps: int) -> float:
+    dataset = tf.data.Dataset.from_tensor_slices((X, y)).repeat().batch(batch_size, drop_remainder=True)
+    model.fit(dataset, steps_per_epoch=2, epochs=1, verbose=0)  # tracing and compilation
+    start = time.perf_counter()
+    model.fit(dataset, steps_per_epoch=steps, epochs=1, verbose=0)
+    return steps / (time.perf_counter() - start)
+
+
+def benchmark_xla(builder: Any,
+                  X: np.ndarray,
+                  y: np.ndarray,
+                  builder_kwargs: Optional[dict] = None,
+                  batch_size: int = BATCH_SIZE,
+                  train_steps: int = 50,
+                  inference_batch_sizes: Sequence[int] = (1, 16, 64),
+                  n_iter: int = 50,
+                  results_file: str = 'Results/xla_benchmark.csv') -> pd.DataFrame:
+    """
+    Compare training steps/sec and inference latency on CPU with and without XLA compilation.
+
+    Args:
+        builder (Any): A builder from src.models accepting jit_compile, e.g. build_cnn_model.
+        X (np.ndarray): Normalized float32 images used for training steps and inference batches.
+        y (np.ndarray): Binary labels.
+        builder_kwargs (Optional[dict]): Extra builder arguments (e.g. input_shape for build_cnn_model).
+        batch_size (int): Training batch size.
+        train_steps (int): Timed training steps per mode.
+        inference_batch_sizes (Sequence[int]): Batch sizes for the inference latency measurement.
+        n_iter (int): Timed inference iterations per batch size.
+        results_file (str): CSV to which the comparison is appended.
+
+    Returns:
+        pd.DataFrame: One row per (mode, inference batch size).
+    """
+
+    from src.export import benchmark_latency
+
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32).reshape(-1)
+    rows = []
+    for jit_compile in (False, True):
+        model = builder(**(builder_kwargs or {}), jit_compile=jit_compile)
+        xla_active = bool(getattr(model, 'jit_compile', False))
+        steps_per_sec = _train_steps_per_sec(model, X, y, batch_size, train_steps)
+        predictor = CompiledPredictor(model, max(inference_batch_sizes), jit_compile=jit_compile)
+        for row in benchmark_latency(predictor, X, inference_batch_sizes, n_iter):
+            rows.append({
+                'Model': model.name,
+                'XLA Requested': jit_compile,
+                'XLA Active': xla_active and predictor.jit_compile,
+                'Train Steps/s': round(steps_per_sec, 2),
+                **row
+            })
+
+    for row in rows:
+        record_result(results_file, row)
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False))
+
+    return df
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from vehicle_animal_detection.src.alerts.protocol import (
+    CODE_NONE, CODE_UNKNOWN, AlertSender, DeviceEmulator, SpeciesTable, encode_frame
+)
+
+CLASSES_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'yolo_tiny', 'coco.names')
+
+
+@pytest.fixture
+def table():
+    return SpeciesTable.from_file(CLASSES_PATH)
+
+
+def test_every_species_code_round_trips(table):
+    device = DeviceEmulator(table)
+    sender = AlertSender(device, table, ack=True, ack_timeout=0.01)
+    for code, name in enumerate(table.names, start=1):
+        assert table.code(name.lower()) == code
+        assert sender.send(name.lower())
+        assert device.state == name
+        assert device.lines == ["Animal Detected".ljust(16), ("Species: " + name)[:16].ljust(16)]
+    assert sender.send("NONE")
+    assert device.state == "NONE" and device.lines[0].rstrip() == "No Animal"
+    assert device.frames_received == len(table) + 1
+    assert sender.retransmissions == sender.ack_failures == 0
+
+
+def test_corrupted_crc_is_rejected_and_decoder_resyncs(table):
+    device = DeviceEmulator(table)
+    frame = bytearray(encode_frame(0, table.code("dog")))
+    frame[-1] ^= 0xFF
+    device.write(bytes(frame))
+    assert device.crc_errors == 1
+    assert device.frames_received == 0 and device.state is None
+
+    device.write(encode_frame(1, table.code("dog")))
+    assert device.state == "DOG" and device.frames_received == 1
+
+
+def test_seq_wraps_at_255(table):
+    device = DeviceEmulator(table)
+    sender = AlertSender(device, table)
+    for n in range(258):
+        sender.send("dog" if n % 2 else "cow")
+    assert sender.seq == 258 & 0xFF == 2
+    assert device.frames_received == 258
+    assert device.lost_frames == 0 and device.duplicate_frames == 0
+    assert device.expected_seq == 2
+
+
+@pytest.mark.parametrize('retries', [0, 1, 3])
+def test_dropped_ack_is_retransmitted_up_to_retries(table, retries):
+    device = DeviceEmulator(table, drop_acks=True)
+    sender = AlertSender(device, table, ack=True, ack_timeout=0.002, retries=retries)
+    assert not sender.send("dog")
+    assert sender.frames_sent == retries + 1
+    assert sender.retransmissions == retries and sender.ack_failures == 1
+    # Retransmissions carry the same seq, so the display shows the alert once
+    assert device.frames_received == 1 and device.duplicate_frames == retries
+
+
+def test_ack_stops_retransmission(table):
+    device = DeviceEmulator(table)
+    sender = AlertSender(device, table, ack=True, ack_timeout=0.01, retries=3)
+    assert sender.send("dog")
+    assert sender.frames_sent == 1 and sender.retransmissions == 0
+
+
+def test_unknown_species_falls_back(table):
+    assert table.code("unicorn") == CODE_UNKNOWN
+    assert table.code(None) == table.code("none") == CODE_NONE
+    assert table.name(CODE_UNKNOWN) == table.name(len(table) + 1) == "UNKNOWN"
+
+    device = DeviceEmulator(table)
+    AlertSender(device, table).send("unicorn")
+    assert device.state == "UNKNOWN"
+    assert device.lines == ["Animal Detected".ljust(16), "Species: ?".ljust(16)]
+
+    # Codes past the end of the sketch's table render the same way
+    device = DeviceEmulator(table)
+    device.write(encode_frame(0, len(table) + 1))
+    assert device.lines[1] == "Species: ?".ljust(16)
@@ -0,0 +1,151 @@
+import pytest
+
+pytest.importorskip('cv2')
+pytest.importorskip('numpy')
+
+from vehicle_animal_detection.src.evaluation.harness import pareto_front, summarize_variant
+from vehicle_animal_detection.src.evaluation.metrics import (
+    alert_latencies, average_precision, ground_truth_events, match_frame, summarize_detections
+)
+
+
+def box(name, bbox, confidence=None):
+    obj = {'class': name, 'bbox': bbox}
+    if confidence is not None:
+        obj['confidence'] = confidence
+    return obj
+
+
+GROUND_TRUTH = [
+    box('dog', [0, 0, 10, 10]),
+    box('dog', [20, 0, 30, 10]),
+    box('cat', [0, 20, 10, 30]),
+]
+DETECTIONS = [
+    box('dog', [1, 0, 11, 10], 0.8),    # IoU 0.82 with the first dog, which the 0.9 box takes
+    box('dog', [20, 0, 30, 12], 0.7),   # IoU 100 / 120 with the second dog
+    box('cat', [0, 0, 10, 10], 0.6),    # no overlap with the cat
+    box('dog', [0, 0, 10, 10], 0.9),
+    box('horse', [0, 20, 10, 30], 0.95),  # on the cat, but no horse in the ground truth
+]
+
+
+def test_match_frame_matches_highest_confidence_first():
+    scored, gt_counts = match_frame(DETECTIONS, GROUND_TRUTH)
+    assert scored == [
+        ('horse', 0.95, False),
+        ('dog', 0.9, True),
+        ('dog', 0.8, False),
+        ('dog', 0.7, True),
+        ('cat', 0.6, False),
+    ]
+    assert gt_counts == {'dog': 2, 'cat': 1}
+
+
+def test_match_frame_iou_threshold_is_inclusive():
+    detection = [box('dog', [0, 0, 10, 20], 0.5)]  # IoU 100 / 200 with the first dog
+    assert match_frame(detection, GROUND_TRUTH[:1], iou_threshold=0.5)[0] == [('dog', 0.5, True)]
+    assert match_frame(detection, GROUND_TRUTH[:1], iou_threshold=0.6)[0] == [('dog', 0.5, False)]
+
+
+def test_average_precision():
+    # Ranked TP, FP, TP, FP with 3 ground-truth objects:
+    # recall 1/3 at precision 1, then 2/3 at the enveloped precision 2/3 -> 1/3 + 2/9
+    scored = [(0.6, False), (0.9, True), (0.7, True), (0.8, False)]
+    assert average_precision(scored, 3) == pytest.approx(5 / 9)
+    assert average_precision([(0.9, True), (0.8, True)], 2) == pytest.approx(1.0)
+    assert average_precision(scored, 0) == 0.0
+
+
+def test_summarize_detections():
+    scored, gt_counts = match_frame(DETECTIONS, GROUND_TRUTH)
+    summary = summarize_detections(scored, gt_counts)
+    assert summary['precision'] == pytest.approx(2 / 5)
+    assert summary['recall'] == pytest.approx(2 / 3)
+    # dog: recall 1/2 at precision 1, then 1 at 2/3; cat: never found; horse has no ground truth
+    assert summary['ap_per_class'] == pytest.approx({'dog': 5 / 6, 'cat': 0.0})
+    assert summary['mAP'] == pytest.approx(5 / 12)
+
+
+def test_ground_truth_events_bridge_gaps_up_to_max_gap():
+    frames = [21, 10, 11, 13, 20]
+    assert ground_truth_events(frames, max_gap=2) == [(10, 13), (20, 21)]
+    assert ground_truth_events(frames, max_gap=1) == [(10, 11), (13, 13), (20, 21)]
+
+
+def alert_states(alerts, stop=46, step=2):
+    return [(f, alerts.get(f, "NONE")) for f in range(0, stop, step)]
+
+
+# Annotated 10-14 and 18 (one event across the unannotated 16) and 30-32
+EVENTS = ground_truth_events([10, 12, 14, 18, 30, 32], max_gap=4)
+STATES = alert_states({16: "DOG", 18: "DOG", 34: "DOG", 36: "DOG", 40: "CAT"})
+
+
+def test_alert_latencies_bridged_gap_and_grace():
+    assert EVENTS == [(10, 18), (30, 32)]
+    latencies, missed, false_alarms = alert_latencies(EVENTS, STATES, grace_frames=4)
+    # The onset at 16 falls in the bridged gap; the one at 34 is late but within the grace frames
+    assert latencies == [6, 4]
+    assert missed == 0
+    # Only the CAT onset at 40 is outside every event
+    assert false_alarms == 1
+
+
+def test_alert_latencies_without_grace():
+    latencies, missed, false_alarms = alert_latencies(EVENTS, STATES)
+    assert latencies == [6]
+    assert missed == 1
+    # The late onset at 34 now counts as a false alarm, as does 40
+    assert false_alarms == 2
+
+
+def test_alert_latencies_state_change_is_not_a_new_onset():
+    states = alert_states({4: "DOG", 6: "CAT", 8: "CAT"}, stop=12)
+    assert alert_latencies([], states) == ([], 0, 1)
+
+
+def run(scored, gt_counts, frames, source_frames, wall, cpu, events, missed, false_alarms, latencies):
+    return {
+        'variant': {'confidence_threshold': 0.3, 'frame_skip': 2}, 'clip': 'clip.mp4',
+        'frames': frames, 'source_frames': source_frames, 'wall_seconds': wall, 'cpu_seconds': cpu,
+        'scored': scored, 'gt_counts': gt_counts,
+        'events': events, 'missed_events': missed, 'false_alarms': false_alarms,
+        'latencies_s': latencies
+    }
+
+
+def test_summarize_variant_pools_clips():
+    runs = [
+        run([('dog', 0.9, True), ('dog', 0.4, False)], {'dog': 2},
+            frames=50, source_frames=100, wall=2.0, cpu=1.0, events=2, missed=1, false_alarms=1, latencies=[0.5]),
+        run([('dog', 0.8, True), ('cat', 0.7, True)], {'dog': 1, 'cat': 1},
+            frames=30, source_frames=60, wall=2.0, cpu=0.6, events=1, missed=0, false_alarms=0, latencies=[0.2]),
+    ]
+    row = summarize_variant(runs)
+    assert row['variant'] == 'conf=0.3 skip=2'
+    assert row['confidence_threshold'] == 0.3 and row['frame_skip'] == 2
+    assert row['precision'] == pytest.approx(3 / 4)
+    assert row['recall'] == pytest.approx(3 / 4)
+    # dog: 0.9 TP, 0.8 TP, 0.4 FP over 3 -> AP 2/3; cat: AP 1
+    assert row['mAP'] == pytest.approx(5 / 6)
+    assert row['event_recall'] == pytest.approx(2 / 3)
+    assert row['alert_latency_mean_s'] == pytest.approx(0.35)
+    assert row['alert_latency_max_s'] == pytest.approx(0.5)
+    assert row['false_alarms'] == 1
+    assert row['fps'] == pytest.approx(20.0)
+    assert row['realtime_factor_fps'] == pytest.approx(40.0)
+    assert row['cpu_ms_per_frame'] == pytest.approx(20.0)
+    assert row['clips'] == 2
+
+
+def test_pareto_front_keeps_ties():
+    rows = [
+        {'variant': 'a', 'mAP': 0.5, 'fps': 10.0},
+        {'variant': 'b', 'mAP': 0.5, 'fps': 10.0},  # identical to a: neither beats the other
+        {'variant': 'c', 'mAP': 0.4, 'fps': 10.0},  # same speed as a, lower quality
+        {'variant': 'd', 'mAP': 0.3, 'fps': 30.0},
+        {'variant': 'e', 'mAP': 0.5, 'fps': 5.0},   # same quality as a, slower
+    ]
+    pareto = {row['variant']: row['pareto'] for row in pareto_front(rows)}
+    assert pareto == {'a': True, 'b': True, 'c': False, 'd': True, 'e': False}
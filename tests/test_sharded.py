@@ -0,0 +1,113 @@
+import pytest
+
+pytest.importorskip('cv2')
+pytest.importorskip('numpy')
+
+from vehicle_animal_detection.src.detection.tracking import IoUTracker, stitch_tracks
+from vehicle_animal_detection.src.pipeline.sharded import plan_segments
+
+
+def sampled(segment, frame_skip, key='owned_start'):
+    return list(range(segment[key], segment['stop'], frame_skip))
+
+
+@pytest.mark.parametrize('total_frames, frame_skip, segments, overlap', [
+    (100, 1, 4, 10),
+    (101, 2, 3, 5),
+    (1000, 3, 7, 10),
+    (5, 1, 8, 10),
+])
+def test_plan_segments_cover_every_sampled_frame_once(total_frames, frame_skip, segments, overlap):
+    plan = plan_segments(total_frames, frame_skip, segments, overlap)
+    owned = [f for segment in plan for f in sampled(segment, frame_skip)]
+    assert owned == list(range(0, total_frames, frame_skip))
+    assert len(plan) == min(segments, len(range(0, total_frames, frame_skip)))
+    assert [segment['segment'] for segment in plan] == list(range(len(plan)))
+
+
+def test_plan_segments_overlap_reprocesses_previous_frames():
+    plan = plan_segments(100, frame_skip=2, segments=4, overlap=3)
+    assert plan[0]['start'] == plan[0]['owned_start'] == 0
+    for previous, segment in zip(plan, plan[1:]):
+        assert segment['owned_start'] == previous['stop']
+        warm_up = list(range(segment['start'], segment['owned_start'], 2))
+        # The last `overlap` sampled frames the previous segment reports
+        assert warm_up == sampled(previous, 2)[-3:]
+
+
+def test_plan_segments_overlap_is_clipped_at_the_start():
+    plan = plan_segments(20, frame_skip=1, segments=4, overlap=10)
+    assert plan[1]['start'] == 0 and plan[1]['owned_start'] == 5
+
+
+def track(track_id, boxes, cls='cow', confidence=0.8):
+    """Track record as IoUTracker builds it, from {frame: box}."""
+    confidences = boxes.pop('confidences', None) or {f: confidence for f in boxes}
+    return {'track_id': track_id, 'class': cls, 'first_frame': min(boxes), 'last_frame': max(boxes),
+            'max_confidence': max(confidences.values()), 'boxes': dict(boxes), 'confidences': confidences}
+
+
+def run_tracker(detections_by_frame, frames):
+    tracker = IoUTracker()
+    for f in frames:
+        tracker.update(detections_by_frame.get(f, []), f)
+    return list(tracker.tracks.values())
+
+
+def test_track_crossing_a_boundary_is_stitched():
+    # One cow moving right one pixel per frame over frames 0..19
+    detections = {f: [{'bbox': [f, 10, f + 40, 50], 'class': 'cow', 'confidence': 0.5 + f / 100}]
+                  for f in range(20)}
+    segments = [
+        {'start': 0, 'owned_start': 0, 'stop': 10, 'tracks': run_tracker(detections, range(0, 10))},
+        {'start': 6, 'owned_start': 10, 'stop': 20, 'tracks': run_tracker(detections, range(6, 20))},
+    ]
+    tracks = stitch_tracks(segments)
+    assert len(tracks) == 1
+    assert tracks[0]['track_id'] == 1
+    assert (tracks[0]['first_frame'], tracks[0]['last_frame']) == (0, 19)
+    assert sorted(tracks[0]['boxes']) == list(range(20))
+    assert tracks[0]['max_confidence'] == pytest.approx(0.69)
+
+
+def test_parallel_same_class_tracks_stay_separate():
+    # Two cows walking side by side through the boundary
+    detections = {f: [{'bbox': [f, 10, f + 40, 50], 'class': 'cow', 'confidence': 0.7},
+                      {'bbox': [f + 100, 10, f + 140, 50], 'class': 'cow', 'confidence': 0.9}]
+                  for f in range(20)}
+    segments = [
+        {'start': 0, 'owned_start': 0, 'stop': 10, 'tracks': run_tracker(detections, range(0, 10))},
+        {'start': 6, 'owned_start': 10, 'stop': 20, 'tracks': run_tracker(detections, range(6, 20))},
+    ]
+    tracks = stitch_tracks(segments)
+    assert len(tracks) == 2
+    assert sorted(t['max_confidence'] for t in tracks) == [0.7, 0.9]
+    for t in tracks:
+        assert (t['first_frame'], t['last_frame']) == (0, 19) and len(t['boxes']) == 20
+
+
+def test_stitching_is_one_to_one():
+    # Segment 1 splits what segment 0 saw as one cow into two overlapping tracks:
+    # only the better match may continue it
+    box, shifted = [0, 0, 40, 40], [6, 0, 46, 40]
+    previous = track(1, {f: box for f in range(0, 10)})
+    closer = track(1, {f: box for f in range(6, 20)})
+    other = track(2, {f: shifted for f in range(6, 20)})
+    segments = [
+        {'start': 0, 'owned_start': 0, 'stop': 10, 'tracks': [previous]},
+        {'start': 6, 'owned_start': 10, 'stop': 20, 'tracks': [other, closer]},
+    ]
+    tracks = stitch_tracks(segments)
+    assert [(t['first_frame'], t['last_frame']) for t in tracks] == [(0, 19), (10, 19)]
+    assert tracks[0]['boxes'][15] == box and tracks[1]['boxes'][15] == shifted
+
+
+def test_warm_up_frames_do_not_count_towards_max_confidence():
+    confidences = {f: (0.99 if f < 10 else 0.6) for f in range(6, 20)}
+    segments = [
+        {'start': 0, 'owned_start': 0, 'stop': 10, 'tracks': []},
+        {'start': 6, 'owned_start': 10, 'stop': 20,
+         'tracks': [track(1, dict({f: [0, 0, 40, 40] for f in range(6, 20)}, confidences=confidences))]},
+    ]
+    tracks = stitch_tracks(segments)
+    assert len(tracks) == 1 and tracks[0]['max_confidence'] == 0.6
@@ -1,26 +1,15 @@
-import serial
-import time
-from .classification import Classifier
-from .gui import MainWindow
+import importlib
 
-class ArduinoHandler:
-    def __init__(self, port='COM3', baudrate=9600):
-        """Initialize Arduino connection."""
-        try:
-            self.arduino = serial.Serial(port=port, baudrate=baudrate, timeout=1)
-            time.sleep(2)  # wait for Arduino to initialize
-            print(f"[INFO] Arduino connected successfully on {port}.")
-        except Exception as e:
-            print(f"[WARNING] Could not connect to Arduino: {e}")
-            self.arduino = None
+# Loaded on first access so headless workers importing the detector do not pay for PyQt5
+_EXPORTS = {
+    'Classifier': '.classification',
+    'MainWindow': '.gui',
+}
 
-    def send(self, message: str):
-        """Send a message to Arduino if connected."""
-        if self.arduino:
-            try:
-                self.arduino.write((message + '\n').encode('utf-8'))
-                print(f"[INFO] Sent to Arduino: {message}")
-            except Exception as e:
-                print(f"[ERROR] Failed to send message: {e}")
-        else:
-            print("[WARNING] Arduino not connected. Message not sent.")
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
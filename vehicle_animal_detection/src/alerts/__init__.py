@@ -0,0 +1,3 @@
+from .protocol import AlertSender, TextAlertSender, DeviceEmulator, SpeciesTable
+from .sinks import (AlertSink, SerialSink, UdpMulticastSink, EventFileSink, BrokerSink,
+                    LocalBroker, AlertDispatcher, create_sinks)
@@ -0,0 +1,315 @@
+"""
+Compact framed alert protocol shared by the Python sender and the LCD sketch.
+
+Alert frame (host -> Arduino), 5 bytes:
+
+    0xA5 | seq | species code | flags | crc8(seq, code, flags)
+
+Acknowledgement frame (Arduino -> host), 3 bytes, only when the alert
+frame had FLAG_ACK_REQUEST set:
+
+    0x5A | seq | crc8(seq)
+
+Species codes come from ``coco.names``: code 0 is "NONE", codes 1..N
+follow the file order and 0xFF marks a name that is not in the table.
+The same table is compiled into the sketch through ``species_table.h``
+(see ``write_arduino_header``).
+
+``DeviceEmulator`` plays the sketch's side of the link in the tests
+(``tests/test_alert_protocol.py``).
+"""
+import time
+
+FRAME_START = 0xA5
+ACK_START = 0x5A
+FRAME_SIZE = 5
+ACK_SIZE = 3
+
+CODE_NONE = 0x00
+CODE_UNKNOWN = 0xFF
+
+FLAG_ACK_REQUEST = 0x01
+
+NONE_STATE = "NONE"
+
+
+def _build_crc8_table(poly=0x07):
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+
+_CRC8_TABLE = _build_crc8_table()
+
+
+def crc8(data):
+    """CRC-8 (poly 0x07, init 0x00), identical to crc8() in the sketch."""
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+class SpeciesTable:
+    def __init__(self, names):
+        self.names = [name.strip().upper() for name in names if name.strip()]
+        if len(self.names) >= CODE_UNKNOWN:
+            raise ValueError(f"Species table too large: {len(self.names)} names (max {CODE_UNKNOWN - 1})")
+        self._codes = {name: code for code, name in enumerate(self.names, start=1)}
+
+    @classmethod
+    def from_file(cls, classes_path):
+        with open(classes_path, 'r') as f:
+            return cls(f.readlines())
+
+    def code(self, state):
+        if state is None:
+            return CODE_NONE
+        key = str(state).strip().upper()
+        if key == NONE_STATE:
+            return CODE_NONE
+        return self._codes.get(key, CODE_UNKNOWN)
+
+    def name(self, code):
+        if code == CODE_NONE:
+            return NONE_STATE
+        if 1 <= code <= len(self.names):
+            return self.names[code - 1]
+        return "UNKNOWN"
+
+    def __len__(self):
+        return len(self.names)
+
+
+def encode_frame(seq, code, flags=0):
+    body = bytes((seq & 0xFF, code & 0xFF, flags & 0xFF))
+    return bytes((FRAME_START,)) + body + bytes((crc8(body),))
+
+
+def encode_ack(seq):
+    return bytes((ACK_START, seq & 0xFF, crc8((seq & 0xFF,))))
+
+
+class FrameDecoder:
+    """
+    Incremental byte-stream parser for alert or ack frames.
+
+    Bytes that do not start a frame are skipped, so the decoder resyncs on
+    the next start byte after line noise or a partial frame.
+    """
+
+    def __init__(self, start=FRAME_START, size=FRAME_SIZE):
+        self.start = start
+        self.size = size
+        self.buffer = bytearray()
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data):
+        """Consume bytes and return a list of decoded payload tuples."""
+        frames = []
+        for byte in data:
+            if not self.buffer and byte != self.start:
+                self.skipped_bytes += 1
+                continue
+            self.buffer.append(byte)
+            if len(self.buffer) < self.size:
+                continue
+            body, checksum = bytes(self.buffer[1:-1]), self.buffer[-1]
+            self.buffer.clear()
+            if crc8(body) != checksum:
+                self.crc_errors += 1
+                continue
+            frames.append(tuple(body))
+        return frames
+
+
+class AlertSender:
+    """
+    Sends alert states over a serial-like port (anything with ``write``
+    and, for acknowledgements, ``read``).
+    """
+
+    def __init__(self, port, species_table, ack=False, ack_timeout=0.05, retries=2):
+        self.port = port
+        self.species_table = species_table
+        self.ack = ack
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self.seq = 0
+        self.ack_decoder = FrameDecoder(start=ACK_START, size=ACK_SIZE)
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.retransmissions = 0
+        self.ack_failures = 0
+
+    def send(self, state):
+        """Send one alert state; returns False if an ack was requested and never arrived."""
+        code = self.species_table.code(state)
+        flags = FLAG_ACK_REQUEST if self.ack else 0
+        frame = encode_frame(self.seq, code, flags)
+        seq = self.seq
+        self.seq = (self.seq + 1) & 0xFF
+
+        for attempt in range(self.retries + 1 if self.ack else 1):
+            if attempt:
+                self.retransmissions += 1
+            self.port.write(frame)
+            self.bytes_sent += len(frame)
+            self.frames_sent += 1
+            if not self.ack or self._wait_for_ack(seq):
+                return True
+
+        self.ack_failures += 1
+        print(f"[WARNING] No ack from Arduino for seq {seq} after {self.retries + 1} attempts")
+        return False
+
+    def _wait_for_ack(self, seq):
+        deadline = time.monotonic() + self.ack_timeout
+        while time.monotonic() < deadline:
+            # Poll in_waiting so a port opened with a long read timeout never blocks past the deadline
+            waiting = self.port.in_waiting
+            if not waiting:
+                time.sleep(0.001)
+                continue
+            data = self.port.read(waiting)
+            for (acked_seq,) in self.ack_decoder.feed(data):
+                if acked_seq == seq:
+                    return True
+        return False
+
+
+class TextAlertSender:
+    """Legacy newline-terminated ASCII alerts, kept for old sketches and serial_test.py."""
+
+    def __init__(self, port):
+        self.port = port
+        self.bytes_sent = 0
+        self.frames_sent = 0
+
+    def send(self, state):
+        data = (state + "\n").encode()
+        self.port.write(data)
+        self.bytes_sent += len(data)
+        self.frames_sent += 1
+        return True
+
+
+class DeviceEmulator:
+    """
+    Pure-Python stand-in for the Arduino running lcd_animal_display.ino.
+
+    Implements the serial-port methods the senders use (``write``, ``read``,
+    ``in_waiting``, ``close``), parses frames exactly like the sketch, keeps
+    the two LCD lines it would show and queues acknowledgements. Like the
+    sketch it only rewrites LCD cells that changed; ``cells_written`` counts
+    them.
+    """
+
+    LCD_COLS = 16
+    LCD_ROWS = 2
+
+    def __init__(self, species_table, drop_acks=False):
+        self.species_table = species_table
+        self.drop_acks = drop_acks
+        self.decoder = FrameDecoder()
+        self.lines = [" " * self.LCD_COLS] * self.LCD_ROWS
+        self.cells_written = 0
+        self.state = None
+        self.expected_seq = None
+        self.frames_received = 0
+        self.lost_frames = 0
+        self.duplicate_frames = 0
+        self._outgoing = bytearray()
+        self.is_open = True
+
+    @property
+    def crc_errors(self):
+        return self.decoder.crc_errors
+
+    @property
+    def in_waiting(self):
+        return len(self._outgoing)
+
+    def write(self, data):
+        for seq, code, flags in self.decoder.feed(data):
+            self._handle_frame(seq, code, flags)
+        return len(data)
+
+    def read(self, size=1):
+        data = bytes(self._outgoing[:size])
+        del self._outgoing[:size]
+        return data
+
+    def close(self):
+        self.is_open = False
+
+    def _handle_frame(self, seq, code, flags):
+        if flags & FLAG_ACK_REQUEST and not self.drop_acks:
+            self._outgoing += encode_ack(seq)
+
+        if self.expected_seq is not None and seq != self.expected_seq:
+            if seq == (self.expected_seq - 1) & 0xFF:
+                # Retransmission of a frame we already showed
+                self.duplicate_frames += 1
+                return
+            self.lost_frames += (seq - self.expected_seq) & 0xFF
+        self.expected_seq = (seq + 1) & 0xFF
+        self.frames_received += 1
+
+        self.state = self.species_table.name(code)
+        if code == CODE_NONE:
+            self._render(["No Animal", "Detected"])
+        elif code == CODE_UNKNOWN or code > len(self.species_table):
+            # The sketch shows '?' for any code outside its compiled table
+            self._render(["Animal Detected", "Species: ?"])
+        else:
+            self._render(["Animal Detected", "Species: " + self.state])
+
+    def _render(self, rows):
+        target = [row[:self.LCD_COLS].ljust(self.LCD_COLS) for row in rows]
+        for shown, wanted in zip(self.lines, target):
+            self.cells_written += sum(a != b for a, b in zip(shown, wanted))
+        self.lines = target
+
+
+def write_arduino_header(classes_path, header_path):
+    """Generate species_table.h for the sketch from the same coco.names file."""
+    table = SpeciesTable.from_file(classes_path)
+    lines = [
+        "// Generated from coco.names by vehicle_animal_detection.src.alerts.protocol.",
+        "// Do not edit by hand; regenerate with:",
+        "//   python -m vehicle_animal_detection.src.alerts.protocol <coco.names> <species_table.h>",
+        "#ifndef SPECIES_TABLE_H",
+        "#define SPECIES_TABLE_H",
+        "",
+        "#include <avr/pgmspace.h>",
+        "",
+        f"#define SPECIES_COUNT {len(table)}",
+        "",
+    ]
+    for code, name in enumerate(table.names, start=1):
+        lines.append(f'const char SPECIES_{code}[] PROGMEM = "{name}";')
+    lines.append("")
+    lines.append("// Index 0 is unused: code 0 means NONE")
+    lines.append("const char* const SPECIES_NAMES[SPECIES_COUNT + 1] PROGMEM = {")
+    lines.append("  0,")
+    lines.extend(f"  SPECIES_{code}," for code in range(1, len(table) + 1))
+    lines.append("};")
+    lines.append("")
+    lines.append("#endif")
+    with open(header_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+if __name__ == '__main__':
+    import sys
+
+    classes = sys.argv[1] if len(sys.argv) > 1 else 'models/yolo_tiny/coco.names'
+    header = sys.argv[2] if len(sys.argv) > 2 else 'arduino/species_table.h'
+    write_arduino_header(classes, header)
+    print(f"[INFO] Wrote {header} from {classes}")
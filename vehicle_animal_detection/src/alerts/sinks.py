@@ -0,0 +1,359 @@
+"""
+Alert sinks and a dispatcher that fans alerts out to all of them concurrently.
+
+Every sink runs on its own worker thread behind a bounded queue, so the
+processing pipeline only pays for a non-blocking enqueue and a slow or
+disconnected sink never delays the others. Each worker keeps its own
+latency and backlog metrics.
+
+An alert is a plain dict: ``{'state': 'ELEPHANT', 'timestamp': <time.time()>}``
+plus any extra keys the caller adds. When the dispatcher has a latency
+recorder and the alert carries the frame's capture time, each sink records
+capture-to-sent latency under ``sink:<name>``.
+"""
+import json
+import os
+import queue
+import socket
+import threading
+import time
+
+from .protocol import AlertSender, TextAlertSender, SpeciesTable
+
+# Try to import pyserial gracefully
+try:
+    import serial
+except Exception:
+    serial = None
+
+
+class AlertSink:
+    """Base class: override ``send``; ``open``/``close`` run on the sink's worker thread."""
+
+    name = "sink"
+
+    def open(self):
+        pass
+
+    def send(self, alert):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SerialSink(AlertSink):
+    name = "serial"
+
+    def __init__(self, port, baudrate=9600, species_table=None, protocol='binary',
+                 ack=False, ack_timeout=0.05, retries=2):
+        self.port = port
+        self.baudrate = baudrate
+        self.species_table = species_table
+        self.protocol = protocol
+        self.ack = ack
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self.arduino = None
+        self.sender = None
+
+    def open(self):
+        if serial is None:
+            print("[WARNING] pyserial not installed.")
+            return
+        try:
+            self.arduino = serial.Serial(port=self.port, baudrate=self.baudrate, timeout=1)
+            time.sleep(2)  # wait for Arduino to reset
+            print(f"[INFO] Arduino connected on {self.port} @ {self.baudrate}")
+        except Exception as e:
+            print(f"[WARNING] Could not connect to Arduino: {e}")
+            self.arduino = None
+            return
+        if self.protocol == 'text':
+            self.sender = TextAlertSender(self.arduino)
+        else:
+            self.sender = AlertSender(self.arduino, self.species_table, ack=self.ack,
+                                      ack_timeout=self.ack_timeout, retries=self.retries)
+
+    def send(self, alert):
+        if self.sender is None:
+            raise ConnectionError(f"Arduino not connected on {self.port}")
+        if not self.sender.send(alert['state']):
+            raise TimeoutError(f"Arduino did not acknowledge {alert['state']}")
+
+    def close(self):
+        if self.arduino:
+            try:
+                self.arduino.close()
+            except Exception:
+                pass
+
+
+class _DatagramPort:
+    """File-like adapter so AlertSender can write frames to a UDP socket."""
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+
+    def write(self, data):
+        return self.sock.sendto(data, self.address)
+
+
+class UdpMulticastSink(AlertSink):
+    """Sends the same binary alert frames as the serial link to a multicast group of roadside signs."""
+
+    name = "udp"
+
+    def __init__(self, group, port, species_table, ttl=1):
+        self.group = group
+        self.port = port
+        self.species_table = species_table
+        self.ttl = ttl
+        self.sock = None
+        self.sender = None
+
+    def open(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.ttl)
+        self.sender = AlertSender(_DatagramPort(self.sock, (self.group, self.port)), self.species_table)
+
+    def send(self, alert):
+        self.sender.send(alert['state'])
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+
+
+class EventFileSink(AlertSink):
+    """Append-only JSON-lines event log."""
+
+    name = "event_file"
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.file = None
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def send(self, alert):
+        self.file.write(json.dumps(alert) + "\n")
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+class LocalBroker:
+    """
+    In-process stand-in for an MQTT broker: topic publish/subscribe with
+    the ``+`` (one level) and ``#`` (remaining levels) wildcards.
+    """
+
+    def __init__(self):
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic_filter, maxsize=0):
+        messages = queue.Queue(maxsize=maxsize)
+        with self._lock:
+            self._subscriptions.append((topic_filter, messages))
+        return messages
+
+    def unsubscribe(self, messages):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s[1] is not messages]
+
+    def publish(self, topic, payload):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        delivered = 0
+        for topic_filter, messages in subscriptions:
+            if self.matches(topic_filter, topic):
+                try:
+                    messages.put_nowait((topic, payload))
+                    delivered += 1
+                except queue.Full:
+                    pass
+        return delivered
+
+    @staticmethod
+    def matches(topic_filter, topic):
+        filter_levels = topic_filter.split('/')
+        topic_levels = topic.split('/')
+        for i, level in enumerate(filter_levels):
+            if level == '#':
+                return True
+            if i >= len(topic_levels) or (level != '+' and level != topic_levels[i]):
+                return False
+        return len(filter_levels) == len(topic_levels)
+
+
+default_broker = LocalBroker()
+
+
+class BrokerSink(AlertSink):
+    name = "broker"
+
+    def __init__(self, topic, broker=None):
+        self.topic = topic
+        self.broker = broker or default_broker
+
+    def send(self, alert):
+        self.broker.publish(self.topic, json.dumps(alert).encode('utf-8'))
+
+
+class SinkWorker:
+    """Owns one sink: a bounded queue, a worker thread and the sink's metrics."""
+
+    def __init__(self, sink, queue_size=64, latency_recorder=None):
+        self.sink = sink
+        self.latency_recorder = latency_recorder
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latency_last = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._thread = threading.Thread(target=self._run, name=f"alert-sink-{sink.name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, alert, capture_time=None):
+        item = (time.perf_counter(), capture_time, alert)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Keep the newest state: drop the oldest queued alert
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self):
+        try:
+            self.sink.open()
+        except Exception as e:
+            print(f"[ERROR] Alert sink '{self.sink.name}' failed to open: {e}")
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            enqueued, capture_time, alert = item
+            try:
+                self.sink.send(alert)
+                self.sent += 1
+                if self.latency_recorder is not None and capture_time is not None:
+                    self.latency_recorder.record_since_capture(f"sink:{self.sink.name}", capture_time)
+            except Exception as e:
+                self.failed += 1
+                print(f"[ERROR] Alert sink '{self.sink.name}' failed to send: {e}")
+            latency = time.perf_counter() - enqueued
+            self.latency_last = latency
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+        try:
+            self.sink.close()
+        except Exception:
+            pass
+
+    def metrics(self):
+        handled = self.sent + self.failed
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'backlog': self.queue.qsize(),
+            'latency_last_ms': self.latency_last * 1000,
+            'latency_avg_ms': (self.latency_total / handled * 1000) if handled else 0.0,
+            'latency_max_ms': self.latency_max * 1000
+        }
+
+    def stop(self, timeout=None):
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+
+class AlertDispatcher:
+    def __init__(self, sinks, queue_size=64, latency_recorder=None):
+        self.workers = [SinkWorker(sink, queue_size, latency_recorder) for sink in sinks]
+
+    @classmethod
+    def from_config(cls, config, latency_recorder=None):
+        alerts_cfg = config.get('alerts', {})
+        return cls(create_sinks(config), alerts_cfg.get('queue_size', 64), latency_recorder)
+
+    def dispatch(self, state, capture_time=None, **extra):
+        """Queue an alert on every sink; ``capture_time`` is the frame's perf_counter capture stamp."""
+        alert = {'state': state, 'timestamp': time.time(), **extra}
+        for worker in self.workers:
+            worker.submit(alert, capture_time)
+        return alert
+
+    def metrics(self):
+        return {worker.sink.name: worker.metrics() for worker in self.workers}
+
+    def close(self, timeout=5.0):
+        for worker in self.workers:
+            worker.stop(timeout)
+
+
+def create_sinks(config):
+    """Build the sinks enabled in the ``serial`` and ``alerts.sinks`` config sections."""
+    sinks = []
+    species_table = None
+    classes_path = config.get('models', {}).get('yolo_tiny', {}).get('classes')
+    if classes_path and os.path.exists(classes_path):
+        species_table = SpeciesTable.from_file(classes_path)
+
+    def require_species_table(sink_name):
+        # Binary frames carry species codes; without the table every alert would fail in AlertSender.send
+        if species_table is None:
+            raise FileNotFoundError(f"The {sink_name} alert sink needs the species table from "
+                                    f"models.yolo_tiny.classes, which was not found: {classes_path!r}")
+
+    serial_cfg = config.get('serial', {})
+    if serial_cfg.get('enabled', False) and serial_cfg.get('port'):
+        if serial_cfg.get('protocol', 'binary') != 'text':
+            require_species_table('serial')
+        sinks.append(SerialSink(
+            serial_cfg['port'],
+            baudrate=serial_cfg.get('baudrate', 9600),
+            species_table=species_table,
+            protocol=serial_cfg.get('protocol', 'binary'),
+            ack=serial_cfg.get('ack', False),
+            ack_timeout=serial_cfg.get('ack_timeout', 0.05),
+            retries=serial_cfg.get('retries', 2)
+        ))
+
+    sinks_cfg = config.get('alerts', {}).get('sinks', {}) or {}
+
+    udp_cfg = sinks_cfg.get('udp', {})
+    if udp_cfg.get('enabled', False):
+        require_species_table('udp')
+        sinks.append(UdpMulticastSink(udp_cfg['group'], udp_cfg['port'], species_table,
+                                      ttl=udp_cfg.get('ttl', 1)))
+
+    file_cfg = sinks_cfg.get('event_file', {})
+    if file_cfg.get('enabled', False):
+        sinks.append(EventFileSink(file_cfg['path'], fsync=file_cfg.get('fsync', False)))
+
+    broker_cfg = sinks_cfg.get('broker', {})
+    if broker_cfg.get('enabled', False):
+        sinks.append(BrokerSink(broker_cfg.get('topic', 'roadsync/alerts')))
+
+    return sinks
@@ -0,0 +1,2 @@
+from .synthetic import make_video, load_sprites
+from .suite import run_suite, compare, SUITES
@@ -0,0 +1,312 @@
+"""
+End-to-end benchmark of the headless video pipeline with regression gates.
+
+Each case is a synthetic road video (see ``synthetic.py``) at a given resolution
+and length, generated once into ``benchmarks/videos``. The case drives the same
+``FramePipeline`` as ``ProcessingThread`` (decode, detect with buffer/classifier/cascade
+as configured, smooth, alert decision) in a fresh process, so peak RSS belongs to
+that case alone. Alerts are delivered by the configured sinks plus an event-file
+sink (``benchmarks/results/<suite>_<case>_alerts.jsonl``); ``--render`` adds the
+render thread and ``--workers N`` detects in N ``ParallelDetector`` processes.
+It reports:
+    - per-stage p50/p95 latency, capture-to-alert and capture-to-sink latency (``LatencyRecorder``),
+    - fps and CPU ms per frame, network load and warm-up time,
+    - peak RSS,
+    - event-level alert latency and event recall against the sprite annotations.
+
+Results are written to ``benchmarks/results/<suite>.json``. With ``--save-baseline``
+they become ``benchmarks/baselines/<suite>.json``; otherwise they are compared with
+that baseline and the command exits with status 1 when a gated metric regressed
+beyond the tolerance, or with status 2 before running anything when there is no
+baseline to compare with. Baselines are machine specific: record them on the
+machine that runs the gate.
+
+Usage:
+    python -m src.benchmark.suite --suite quick --save-baseline
+    python -m src.benchmark.suite --suite quick --tolerance 0.1
+    python -m src.benchmark.suite --suite quick --render --workers 2 --baseline benchmarks/baselines/quick_w2.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCHMARK_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'benchmarks')
+)
+
+# name: (width, height, seconds); all at 30 fps
+SUITES = {
+    'quick': {
+        '360p_10s': (640, 360, 10),
+        '720p_10s': (1280, 720, 10),
+    },
+    'full': {
+        '360p_10s': (640, 360, 10),
+        '720p_10s': (1280, 720, 10),
+        '1080p_10s': (1920, 1080, 10),
+        '720p_60s': (1280, 720, 60),
+        '1080p_60s': (1920, 1080, 60),
+    },
+}
+FPS = 30
+
+# metric: (better direction, relative tolerance scale, absolute slack below which changes are noise)
+GATES = {
+    'fps': ('higher', 1.0, 0.5),
+    'cpu_ms_per_frame': ('lower', 1.0, 1.0),
+    'stage.detect.p50_ms': ('lower', 1.0, 1.0),
+    'stage.detect.p95_ms': ('lower', 1.5, 2.0),
+    'stage.decode.p95_ms': ('lower', 1.5, 1.0),
+    'capture_to.alert.p95_ms': ('lower', 1.5, 2.0),
+    'capture_to.sink:event_file.p95_ms': ('lower', 1.5, 2.0),
+    'peak_rss_mb': ('lower', 1.0, 20.0),
+    'alert_latency_mean_s': ('lower', 1.0, 0.1),
+    'event_recall': ('higher', 0.0, 0.05),
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (None where it cannot be read)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2 ** 20
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def ensure_video(name, width, height, seconds, video_dir=None, seed=0):
+    """Generate the case's video and annotations unless they already exist."""
+    from .synthetic import make_video
+
+    video_dir = video_dir or os.path.join(BENCHMARK_DIR, 'videos')
+    video_path = os.path.join(video_dir, f"{name}_seed{seed}.mp4")
+    annotation_path = os.path.splitext(video_path)[0] + '.csv'
+    if not (os.path.exists(video_path) and os.path.exists(annotation_path)):
+        print(f"[INFO] Generating {video_path}")
+        make_video(video_path, width, height, seconds * FPS, fps=FPS, seed=seed, annotation_path=annotation_path)
+    return video_path, annotation_path
+
+
+def run_case(config_path, video_path, annotation_path, events_path, render=False, workers=0):
+    """
+    Run the headless pipeline over one video; meant to run in a fresh process.
+
+    Alerts go through the configured sinks plus an event-file sink writing to ``events_path``
+    (the serial sink is disabled). ``render`` draws every frame on the render thread;
+    ``workers`` > 0 detects in that many ``ParallelDetector`` processes.
+    """
+    import cv2
+    from ..alerts.sinks import AlertDispatcher
+    from ..detection.yolo_detector import create_detector, load_config
+    from ..detection.renderer import AsyncRenderer, DetectionRenderer
+    from ..detection.cascade import maybe_cascade
+    from ..evaluation.annotations import load_annotations
+    from ..evaluation.metrics import ground_truth_events, alert_latencies
+    from ..monitoring.latency import LatencyRecorder
+    from ..pipeline.parallel import ParallelDetector
+    from ..pipeline.stages import FramePipeline
+
+    config = load_config(config_path)
+    config.setdefault('serial', {})['enabled'] = False  # no hardware on the benchmark machine
+    sinks_cfg = config.setdefault('alerts', {}).setdefault('sinks', {})
+    sinks_cfg['event_file'] = dict(sinks_cfg.get('event_file') or {}, enabled=True, path=events_path)
+    if os.path.exists(events_path):
+        os.remove(events_path)
+    frame_skip = config['performance']['frame_skip']
+
+    recorder = LatencyRecorder()
+    dispatcher = AlertDispatcher.from_config(config, recorder)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or FPS
+    yolo = detector = renderer = pool = None
+    try:
+        if workers:
+            frame_shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+            pool = ParallelDetector(config['config_path'], frame_shape, workers=workers)
+        else:
+            yolo = create_detector(config=config)
+            detector = maybe_cascade(yolo, config)
+        if render:
+            # Frames are drawn as in the GUI, then discarded
+            renderer = AsyncRenderer(lambda frame, meta: None, DetectionRenderer(font_scale=0.9, show_confidence=False))
+        pipeline = FramePipeline.from_config(config, on_alert=dispatcher.dispatch, recorder=recorder,
+                                             renderer=renderer)
+        states = []
+
+        def on_frame(index, frame, detections, state, smoothed_detections):
+            states.append((index, state))
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        frames = pipeline.run(cap, itertools.count(0, frame_skip), detector=detector, pool=pool, on_frame=on_frame)
+        if renderer is not None:
+            renderer.close()  # rendering is part of the measured work
+            renderer = None
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    finally:
+        if renderer is not None:
+            renderer.close()
+        if pool is not None:
+            pool.close()
+        cap.release()
+        dispatcher.close()
+    index = frames * frame_skip
+
+    annotations = load_annotations(annotation_path)
+    events = ground_truth_events([f for f in annotations if f < index], max_gap=frame_skip)
+    latencies, missed, false_alarms = alert_latencies(events, states)
+    snapshot = recorder.snapshot()
+    return {
+        'frames': frames,
+        'source_frames': index,
+        'wall_seconds': wall,
+        'fps': frames / wall if wall else 0.0,
+        'realtime_factor': index / fps / wall if wall else 0.0,
+        # CPU of this process only: detector workers are not included
+        'cpu_ms_per_frame': cpu * 1000 / frames if frames else 0.0,
+        'load_ms': yolo.load_time * 1000 if yolo is not None else None,
+        'warmup_ms': yolo.warmup_time * 1000 if yolo is not None else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'stage': {name: {k: s[k] for k in ('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms')}
+                  for name, s in snapshot['stage'].items()},
+        'capture_to': {name: {k: s[k] for k in ('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms')}
+                       for name, s in snapshot['capture_to'].items()},
+        'sinks': dispatcher.metrics(),
+        'events': len(events),
+        'event_recall': (len(events) - missed) / len(events) if events else 1.0,
+        'alert_latency_mean_s': sum(latencies) / len(latencies) / fps if latencies else 0.0,
+        'alert_latency_max_s': max(latencies) / fps if latencies else 0.0,
+        'false_alarms': false_alarms,
+    }
+
+
+def run_suite(suite='quick', config_path=None, video_dir=None, seed=0, render=False, workers=0):
+    """Run every case of ``suite`` one after another, each in its own process."""
+    import cv2
+    from ..detection.yolo_detector import load_config
+
+    config_path = load_config(config_path)['config_path']
+    cases = {}
+    for name, (width, height, seconds) in SUITES[suite].items():
+        video_path, annotation_path = ensure_video(name, width, height, seconds, video_dir, seed)
+        events_path = os.path.join(BENCHMARK_DIR, 'results', f"{suite}_{name}_alerts.jsonl")
+        # One case per fresh process: clean peak RSS, no state carried between cases
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context('spawn')) as executor:
+            cases[name] = executor.submit(run_case, config_path, video_path, annotation_path, events_path,
+                                          render, workers).result()
+        print(f"[INFO] {name}: {cases[name]['fps']:.1f} fps, "
+              f"detect p95 {cases[name]['stage'].get('detect', {}).get('p95_ms', 0):.1f} ms, "
+              f"peak RSS {cases[name]['peak_rss_mb'] or 0:.0f} MiB")
+    return {
+        'suite': suite,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': {
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': config_path,
+        'mode': {'render': render, 'workers': workers},
+        'cases': cases,
+    }
+
+
+def _lookup(metrics, dotted):
+    value = metrics
+    for key in dotted.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(results, baseline, tolerance=0.10, gates=GATES):
+    """
+    Compare gated metrics case by case.
+
+    Returns:
+        tuple: A tuple containing:
+            - list: ``(case, metric, baseline, current, change)`` rows for every compared metric
+            - list: the subset of rows that regressed beyond the tolerance
+    """
+    rows, regressions = [], []
+    for case, metrics in results['cases'].items():
+        base_metrics = baseline.get('cases', {}).get(case)
+        if base_metrics is None:
+            continue
+        for metric, (direction, scale, slack) in gates.items():
+            current, base = _lookup(metrics, metric), _lookup(base_metrics, metric)
+            if current is None or base is None:
+                continue
+            change = (current - base) / abs(base) if base else 0.0
+            worse = base - current if direction == 'higher' else current - base
+            row = (case, metric, base, current, change)
+            rows.append(row)
+            if worse > max(slack, abs(base) * tolerance * scale):
+                regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with regression gates.")
+    parser.add_argument('--suite', choices=sorted(SUITES), default='quick')
+    parser.add_argument('--config', default=None, help="YAML config (default: the package config)")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed relative regression")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--baseline', default=None, help="Baseline JSON (default: benchmarks/baselines/<suite>.json)")
+    parser.add_argument('--video-dir', default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--render', action='store_true', help="Draw every frame on the render thread")
+    parser.add_argument('--workers', type=int, default=0, help="Detector worker processes (0: detect in-thread)")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.baseline or os.path.join(BENCHMARK_DIR, 'baselines', f"{args.suite}.json")
+    if not args.save_baseline and not os.path.exists(baseline_path):
+        print(f"[ERROR] No baseline at {baseline_path}; run with --save-baseline first")
+        return 2
+
+    results = run_suite(args.suite, args.config, args.video_dir, args.seed, args.render, args.workers)
+    results_path = os.path.join(BENCHMARK_DIR, 'results', f"{args.suite}.json")
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"[INFO] Results written to {results_path}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Baseline saved to {baseline_path}")
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get('mode', results['mode']) != results['mode']:
+        print(f"[WARNING] Baseline was recorded with {baseline['mode']}, this run used {results['mode']}")
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print(f"{'case':<12} {'metric':<34} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in rows:
+        case, metric, base, current, change = row
+        flag = '  REGRESSION' if row in regressions else ''
+        print(f"{case:<12} {metric:<34} {base:>10.2f} {current:>10.2f} {change * 100:>7.1f}%{flag}")
+    if regressions:
+        print(f"[ERROR] {len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}")
+        return 1
+    print("[INFO] No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
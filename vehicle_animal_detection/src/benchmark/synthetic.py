@@ -0,0 +1,158 @@
+"""
+Synthetic road videos for benchmarking, generated locally and deterministically.
+
+A procedurally drawn road scene (sky, verge, asphalt, lane dashes, sensor noise)
+is overlaid with the RGBA animal sprites from ``assets/images``. The sprites cross
+the road one at a time, with empty-road stretches in between. The exact sprite
+boxes are written as an annotation CSV (see ``src.evaluation.annotations``), so
+the same clips work for alert latency and for the evaluation harness.
+"""
+import glob
+import os
+
+import cv2
+import numpy as np
+
+from ..evaluation.annotations import save_annotations
+
+SPRITE_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'assets', 'images')
+)
+# COCO animal names a sprite file name may contain (e.g. 'cow.png')
+SPRITE_CLASSES = ['dog', 'cat', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe']
+
+MIN_BOX_SIZE = 8   # visible boxes smaller than this (pixels) are not annotated
+
+
+def load_sprites(directory=SPRITE_DIR):
+    """``(class_name, bgr, alpha)`` for every RGBA PNG whose name contains a COCO animal class."""
+    sprites = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.png'))):
+        stem = os.path.splitext(os.path.basename(path))[0].lower()
+        class_name = next((c for c in SPRITE_CLASSES if c in stem), None)
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if class_name is None or image is None:
+            continue
+        if image.ndim == 3 and image.shape[2] == 4:
+            bgr, alpha = image[:, :, :3], image[:, :, 3]
+        else:
+            bgr = image if image.ndim == 3 else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            alpha = np.full(bgr.shape[:2], 255, dtype=np.uint8)
+        # Crop to the opaque part so annotated boxes are tight
+        ys, xs = np.nonzero(alpha > 16)
+        if len(xs):
+            bgr = bgr[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+            alpha = alpha[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+        sprites.append((class_name, np.ascontiguousarray(bgr), np.ascontiguousarray(alpha)))
+    if not sprites:
+        raise FileNotFoundError(f"No animal sprites (*.png named after a COCO animal class) in {directory}")
+    return sprites
+
+
+def road_background(width, height, seed=0):
+    """A two-lane road seen from the roadside camera, with verge, sky and lane markings."""
+    rng = np.random.default_rng(seed)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    horizon = int(height * 0.35)
+    sky = np.linspace(235, 170, horizon, dtype=np.float32)[:, None]
+    frame[:horizon] = np.stack([sky, sky * 0.85, sky * 0.6], axis=-1).astype(np.uint8)
+    frame[horizon:] = (60, 120, 70)  # verge (BGR)
+
+    road = np.array([[int(width * 0.42), horizon], [int(width * 0.58), horizon],
+                     [width, height], [0, height]], dtype=np.int32)
+    cv2.fillPoly(frame, [road], (90, 90, 90))
+    for y in range(horizon + 10, height, max(8, height // 12)):
+        t = (y - horizon) / (height - horizon)
+        dash = max(2, int(height * 0.04 * t))
+        thickness = max(1, int(width * 0.006 * t))
+        cv2.line(frame, (width // 2, y), (width // 2, min(height - 1, y + dash)), (230, 230, 230), thickness)
+
+    noise = rng.normal(0, 6, frame.shape).astype(np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def crossing_schedule(frames, fps, sprites, seed=0, empty_seconds=2.0, crossing_seconds=3.0):
+    """``(start_frame, end_frame, sprite_index, y_fraction, direction)`` of each crossing, alternating with empty road."""
+    rng = np.random.default_rng(seed)
+    schedule = []
+    start = int(fps * 1.0)
+    while start < frames:
+        length = int(fps * crossing_seconds * rng.uniform(0.8, 1.2))
+        schedule.append((start, min(frames, start + length), int(rng.integers(len(sprites))),
+                         float(rng.uniform(0.55, 0.85)), 1 if rng.random() < 0.5 else -1))
+        start += length + int(fps * empty_seconds * rng.uniform(0.7, 1.3))
+    return schedule
+
+
+def _paste(frame, bgr, alpha, x, y):
+    """Alpha-blend ``bgr`` with its top-left corner at (x, y); returns the visible box or None."""
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = max(0, x), max(0, y), min(w, x + bgr.shape[1]), min(h, y + bgr.shape[0])
+    if x2 <= x1 or y2 <= y1:
+        return None
+    sprite = bgr[y1 - y:y2 - y, x1 - x:x2 - x].astype(np.float32)
+    a = alpha[y1 - y:y2 - y, x1 - x:x2 - x, None].astype(np.float32) / 255.0
+    roi = frame[y1:y2, x1:x2]
+    roi[...] = (sprite * a + roi.astype(np.float32) * (1.0 - a)).astype(np.uint8)
+    return [x1, y1, x2, y2]
+
+
+def make_video(path, width, height, frames, fps=30, seed=0, sprites=None, annotation_path=None):
+    """
+    Write a synthetic road video and its annotation CSV.
+
+    Args:
+        path: Output video (.mp4 or .avi).
+        width, height: Frame size.
+        frames: Number of frames.
+        fps: Frame rate.
+        seed: Seed for the scene noise and crossing schedule.
+        sprites: ``load_sprites()`` result (loaded from ``assets/images`` by default).
+        annotation_path: CSV path (default: next to the video).
+
+    Returns:
+        dict: ``{frame_index: [{'bbox': [...], 'class': ...}]}`` as written to the CSV.
+    """
+    sprites = sprites or load_sprites()
+    annotation_path = annotation_path or os.path.splitext(path)[0] + '.csv'
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    background = road_background(width, height, seed)
+    fourcc = cv2.VideoWriter_fourcc(*('MJPG' if path.lower().endswith('.avi') else 'mp4v'))
+    writer = cv2.VideoWriter(path, fourcc, fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a video writer for {path}")
+
+    schedule = crossing_schedule(frames, fps, sprites, seed)
+    resized = {}
+    annotations = {}
+    crossing = 0
+    for index in range(frames):
+        frame = background.copy()
+        while crossing < len(schedule) and index >= schedule[crossing][1]:
+            crossing += 1
+        if crossing < len(schedule) and index >= schedule[crossing][0]:
+            start, end, sprite_index, y_fraction, direction = schedule[crossing]
+            class_name, bgr, alpha = sprites[sprite_index]
+            # Nearer (lower) crossings are larger
+            key = (sprite_index, y_fraction)
+            if key not in resized:
+                scale = height * 0.45 * y_fraction / bgr.shape[0]
+                size = (max(1, int(bgr.shape[1] * scale)), max(1, int(bgr.shape[0] * scale)))
+                resized[key] = (cv2.resize(bgr, size, interpolation=cv2.INTER_AREA),
+                                cv2.resize(alpha, size, interpolation=cv2.INTER_AREA))
+            sprite_bgr, sprite_alpha = resized[key]
+            t = (index - start) / max(1, end - start - 1)
+            t = t if direction > 0 else 1.0 - t
+            x = int(-sprite_bgr.shape[1] + t * (width + sprite_bgr.shape[1]))
+            y = int(height * y_fraction - sprite_bgr.shape[0] / 2)
+            box = _paste(frame, sprite_bgr, sprite_alpha, x, y)
+            if box and box[2] - box[0] >= MIN_BOX_SIZE and box[3] - box[1] >= MIN_BOX_SIZE:
+                annotations[index] = [{'bbox': box, 'class': class_name}]
+        writer.write(frame)
+    writer.release()
+
+    save_annotations(annotation_path, annotations)
+    return annotations
@@ -0,0 +1 @@
+from .classifier import Classifier
@@ -0,0 +1,139 @@
+"""
+Second-stage animal/vehicle classifier for YOLO crops.
+
+All crops of a frame (or of several frames) are resized to 32x32 into one
+preallocated batch and scored with a single forward pass of the CNN built by
+``src.models.build_cnn_model``. The model outputs P(animal) (see
+``src.constants.BINARY_LABELS``: vehicle=0, animal=1), which is blended with
+the YOLO confidence.
+
+TensorFlow and the model are loaded on first use and cached per path, so
+several Classifier instances (or threads) share one loaded model.
+"""
+import os
+import threading
+
+import cv2
+import numpy as np
+
+CROP_SIZE = (32, 32)
+_RESCALE = np.float32(1.0 / 255.0)
+
+_model_cache = {}
+_model_lock = threading.Lock()
+
+
+def load_model(path):
+    """Load (once) and return the Keras model at ``path``.
+
+    ``.keras`` files are loaded whole; ``.h5`` files are treated as weights
+    for the architecture from ``build_cnn_model``. Quantized ``.tflite`` and
+    ``.onnx`` exports from ``src.export`` run without full TensorFlow.
+    """
+    key = os.path.abspath(path)
+    with _model_lock:
+        if key not in _model_cache:
+            if path.endswith('.tflite'):
+                from src.export import TFLiteModel
+                model = TFLiteModel(path)
+            elif path.endswith('.onnx'):
+                from src.export import OpenCVOnnxModel
+                model = OpenCVOnnxModel(path)
+            elif path.endswith('.h5'):
+                from src.models import build_cnn_model
+                from src.constants import INPUT_SHAPE
+                model = build_cnn_model(INPUT_SHAPE)
+                model.load_weights(path)
+            else:
+                from tensorflow import keras
+                model = keras.models.load_model(path)
+            _model_cache[key] = model
+            print(f"[INFO] Classifier model loaded from {path}")
+        return _model_cache[key]
+
+
+class Classifier:
+    def __init__(self, config_path=None, config=None, max_batch_size=64):
+        if config is None:
+            from ..detection.yolo_detector import load_config
+            config = load_config(config_path)
+        cfg = config['models']['classifier']
+        self.model_path = cfg['path']
+        # A crop is vetoed only when the CNN is at least this sure it is a vehicle
+        self.confidence_threshold = cfg.get('confidence_threshold', 0.8)
+        self.yolo_weight = cfg.get('yolo_weight', 0.5)
+        self.max_batch_size = cfg.get('max_batch_size', max_batch_size)
+        # XLA-compiled fixed-shape inference for Keras models (TFLite/ONNX exports run as they are)
+        self.jit_compile = cfg.get('jit_compile', False)
+        self._compiled = None
+        self._batch = np.empty((self.max_batch_size, CROP_SIZE[1], CROP_SIZE[0], 3), dtype=np.float32)
+
+    @property
+    def model(self):
+        model = load_model(self.model_path)
+        if not self.jit_compile or not hasattr(model, 'input_shape'):
+            return model
+        if self._compiled is None:
+            from src.xla import CompiledPredictor
+            self._compiled = CompiledPredictor(model, self.max_batch_size)
+        return self._compiled
+
+    def _fill_batch(self, crops):
+        if len(crops) > len(self._batch):
+            self._batch = np.empty((len(crops), CROP_SIZE[1], CROP_SIZE[0], 3), dtype=np.float32)
+        batch = self._batch[:len(crops)]
+        for slot, crop in zip(batch, crops):
+            resized = cv2.resize(crop, CROP_SIZE, interpolation=cv2.INTER_AREA)
+            # OpenCV frames are BGR; the CNN was trained on RGB CIFAR-10
+            np.multiply(resized[:, :, ::-1], _RESCALE, out=slot, dtype=np.float32)
+        return batch
+
+    def classify_crops(self, crops):
+        """Return P(animal) for each crop, using one forward pass per ``max_batch_size`` crops."""
+        if not crops:
+            return np.empty((0,), dtype=np.float32)
+        scores = []
+        for start in range(0, len(crops), self.max_batch_size):
+            batch = self._fill_batch(crops[start:start + self.max_batch_size])
+            scores.append(np.asarray(self.model(batch, training=False)).reshape(-1))
+        return np.concatenate(scores)
+
+    def classify_frames(self, frames_detections):
+        """
+        Score the detections of one or more frames in a single batch.
+
+        Args:
+            frames_detections: list of ``(frame, detections)`` pairs; detections
+                are the dicts returned by the YOLO detector.
+
+        Returns:
+            list: per frame, the detections that survive the classifier, each with
+                  ``yolo_confidence``, ``classifier_score`` and a blended ``confidence``.
+        """
+        crops, owners = [], []
+        for frame_index, (frame, detections) in enumerate(frames_detections):
+            h, w = frame.shape[:2]
+            for det in detections:
+                x1, y1, x2, y2 = map(int, det['bbox'])
+                x1, y1 = max(0, x1), max(0, y1)
+                x2, y2 = min(w, x2), min(h, y2)
+                if x2 <= x1 or y2 <= y1:
+                    continue
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append((frame_index, det))
+
+        results = [[] for _ in frames_detections]
+        for (frame_index, det), score in zip(owners, self.classify_crops(crops)):
+            score = float(score)
+            if 1.0 - score >= self.confidence_threshold:
+                continue
+            results[frame_index].append({
+                **det,
+                'yolo_confidence': det['confidence'],
+                'classifier_score': score,
+                'confidence': self.yolo_weight * det['confidence'] + (1.0 - self.yolo_weight) * score
+            })
+        return results
+
+    def classify(self, frame, detections):
+        return self.classify_frames([(frame, detections)])[0]
@@ -1 +1,6 @@
-from .yolo_detector import YOLOTinyDetector
\ No newline at end of file
+from .yolo_detector import (YOLOTinyDetector, DetectionBuffer, create_detector, init_detector, get_detector,
+                            load_config, DEFAULT_CONFIG_PATH)
+from .renderer import DetectionRenderer, AsyncRenderer
+from .smoothing import DetectionSmoother, alert_state
+from .tracking import IoUTracker, stitch_tracks
+from .cascade import CascadeGate, CascadeDetector, maybe_cascade
@@ -0,0 +1,94 @@
+"""
+Annotation rendering, kept apart from detection.
+
+Detectors return detection dicts only; boxes and labels are drawn here, and only
+for frames that are actually displayed or written. ``AsyncRenderer`` moves the
+drawing onto its own thread so it does not add to detection latency.
+"""
+import queue
+import threading
+
+import cv2
+
+
+class DetectionRenderer:
+    def __init__(self, color=(0, 255, 0), thickness=2, font_scale=0.7, show_confidence=True):
+        self.color = color
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.show_confidence = show_confidence
+
+    def label(self, det):
+        text = str(det.get('class') or '').upper()
+        if det.get('track_id') is not None:
+            text = f"{text} #{det['track_id']}"
+        if self.show_confidence and det.get('confidence') is not None:
+            text = f"{text} ({det['confidence']:.2f})"
+        return text
+
+    def draw(self, frame, detections, copy=True):
+        """Return ``frame`` with boxes and labels; the input is left untouched unless ``copy`` is False."""
+        out = frame.copy() if copy else frame
+        h, w = out.shape[:2]
+        for det in detections:
+            x1, y1, x2, y2 = map(int, det['bbox'])
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(w - 1, x2), min(h - 1, y2)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            cv2.rectangle(out, (x1, y1), (x2, y2), self.color, self.thickness)
+            cv2.putText(out, self.label(det), (x1, max(0, y1 - 10)),
+                        cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, self.color, self.thickness)
+        return out
+
+
+class AsyncRenderer:
+    """
+    Draws on a background thread and hands annotated frames to ``callback(frame, meta)``.
+
+    With ``drop=False`` (playback/recording) ``submit`` blocks when ``max_pending`` frames are
+    waiting, so no frame is lost; with ``drop=True`` (live display) the oldest pending frame is
+    replaced instead.
+    """
+
+    def __init__(self, callback, renderer=None, max_pending=8, drop=False):
+        self.callback = callback
+        self.renderer = renderer or DetectionRenderer()
+        self.drop = drop
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='renderer', daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, detections, meta=None):
+        # The frame is owned by the renderer from here on and drawn in place
+        item = (frame, list(detections), meta)
+        if not self.drop:
+            self._queue.put(item)
+            return
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            frame, detections, meta = item
+            try:
+                self.callback(self.renderer.draw(frame, detections, copy=False), meta)
+            except Exception as e:
+                print(f"[ERROR] Rendering failed: {e}")
+
+    def close(self):
+        """Render everything still pending, then stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,64 @@
+"""
+Detection smoothing and the per-frame alert decision, shared by the GUI thread
+and headless (sharded) video processing.
+"""
+
+
+class DetectionSmoother:
+    def __init__(self, smoothing_frames=5):
+        self.smoothing_frames = smoothing_frames
+        self.detection_history = []
+
+    def update(self, current_detections):
+        self.detection_history.append(current_detections)
+        if len(self.detection_history) > self.smoothing_frames:
+            self.detection_history.pop(0)
+
+    def get_smoothed_detections(self):
+        if not self.detection_history:
+            return []
+        smoothed_detections = []
+        all_detections = [det for frame_dets in self.detection_history for det in frame_dets]
+        for det in all_detections:
+            similar_dets = [d for d in all_detections if self.iou(det['bbox'], d['bbox']) > 0.3]
+            if len(similar_dets) >= 2:
+                avg_bbox = self.average_bbox([d['bbox'] for d in similar_dets])
+                avg_conf = sum(d['confidence'] for d in similar_dets) / len(similar_dets)
+                smoothed_detections.append({
+                    'bbox': avg_bbox,
+                    'class': det.get('class', None),
+                    'confidence': avg_conf
+                })
+        return smoothed_detections
+
+    @staticmethod
+    def average_bbox(bboxes):
+        avg_bbox = [sum(box[i] for box in bboxes) / len(bboxes) for i in range(4)]
+        return [int(coord) for coord in avg_bbox]
+
+    @staticmethod
+    def iou(box1, box2):
+        x1 = max(box1[0], box2[0])
+        y1 = max(box1[1], box2[1])
+        x2 = min(box1[2], box2[2])
+        y2 = min(box1[3], box2[3])
+        intersection = max(0, x2 - x1) * max(0, y2 - y1)
+        area1 = max(0, (box1[2] - box1[0])) * max(0, (box1[3] - box1[1]))
+        area2 = max(0, (box2[2] - box2[0])) * max(0, (box2[3] - box2[1]))
+        union = area1 + area2 - intersection
+        return intersection / union if union > 0 else 0
+
+
+def alert_state(smoothed_detections, frame_shape):
+    """Alert message for one frame: the first valid detection's species, upper-cased, or "NONE"."""
+    h, w = frame_shape[:2]
+    for detection in smoothed_detections:
+        x1, y1, x2, y2 = map(int, detection['bbox'])
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w - 1, x2), min(h - 1, y2)
+        if x2 <= x1 or y2 <= y1:
+            continue
+
+        # Class from YOLO, or from the classifier stage when models.classifier is enabled
+        return detection['class'].upper()  # only use first detection
+    return "NONE"
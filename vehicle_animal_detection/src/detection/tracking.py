@@ -0,0 +1,144 @@
+"""
+Greedy IoU tracker and stitching of tracks from separately processed video segments.
+"""
+from .smoothing import DetectionSmoother
+
+
+class IoUTracker:
+    def __init__(self, iou_threshold=0.3, max_missed=5):
+        """
+        Args:
+            iou_threshold: Minimum IoU between a track's last box and a same-class detection.
+            max_missed: Processed frames a track survives without a match.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = {}    # track_id -> track record (see _new_track)
+        self._active = {}   # track_id -> frames since the last match
+        self._next_id = 1
+
+    def _new_track(self, det, frame_index):
+        track = {
+            'track_id': self._next_id,
+            'class': det['class'],
+            'first_frame': frame_index,
+            'last_frame': frame_index,
+            'max_confidence': det.get('confidence', 0.0),
+            'boxes': {},
+            'confidences': {}
+        }
+        self.tracks[self._next_id] = track
+        self._next_id += 1
+        return track
+
+    def update(self, detections, frame_index):
+        """Return copies of ``detections`` with a ``track_id``, matching the highest IoU pairs first."""
+        pairs = []
+        for d, det in enumerate(detections):
+            for track_id in self._active:
+                track = self.tracks[track_id]
+                if track['class'] != det['class']:
+                    continue
+                iou = DetectionSmoother.iou(track['boxes'][track['last_frame']], det['bbox'])
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, d, track_id))
+
+        assigned = {}
+        for _, d, track_id in sorted(pairs, reverse=True):
+            if d not in assigned and track_id not in assigned.values():
+                assigned[d] = track_id
+
+        tracked = []
+        for d, det in enumerate(detections):
+            track = self.tracks[assigned[d]] if d in assigned else self._new_track(det, frame_index)
+            track['last_frame'] = frame_index
+            track['boxes'][frame_index] = list(det['bbox'])
+            track['confidences'][frame_index] = det.get('confidence', 0.0)
+            track['max_confidence'] = max(track['max_confidence'], det.get('confidence', 0.0))
+            self._active[track['track_id']] = -1
+            tracked.append(dict(det, track_id=track['track_id']))
+
+        for track_id in list(self._active):
+            self._active[track_id] += 1
+            if self._active[track_id] > self.max_missed:
+                del self._active[track_id]
+        return tracked
+
+
+def _clip_track(track, start, stop):
+    frames = sorted(f for f in track['boxes'] if start <= f < stop)
+    if not frames:
+        return None
+    confidences = {f: track['confidences'][f] for f in frames}
+    return dict(track, first_frame=frames[0], last_frame=frames[-1],
+                boxes={f: track['boxes'][f] for f in frames}, confidences=confidences,
+                max_confidence=max(confidences.values()))
+
+
+def stitch_tracks(segments, min_iou=0.5):
+    """
+    Join tracks of consecutive segments into global tracks.
+
+    Each segment is a dict with ``start`` (first processed frame), ``owned_start``/``stop``
+    (the frames it reports) and ``tracks`` (``IoUTracker.tracks.values()``). Segment k
+    processes the last frames owned by segment k - 1 as warm-up; a track of k is the
+    continuation of a same-class track of k - 1 when their boxes on those shared frames
+    have a mean IoU of at least ``min_iou``. Matching is one-to-one, highest mean IoU
+    first, so two tracks of k never continue the same track of k - 1.
+
+    Returns:
+        list: Tracks restricted to their owned frames, renumbered from 1 in order of appearance.
+    """
+    parent = {}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for k, segment in enumerate(segments):
+        for track in segment['tracks']:
+            parent[(k, track['track_id'])] = (k, track['track_id'])
+
+    for k in range(1, len(segments)):
+        shared = range(segments[k]['start'], segments[k]['owned_start'])
+        pairs = []
+        for track in segments[k]['tracks']:
+            for candidate in segments[k - 1]['tracks']:
+                if candidate['class'] != track['class']:
+                    continue
+                ious = [DetectionSmoother.iou(track['boxes'][f], candidate['boxes'][f])
+                        for f in shared if f in track['boxes'] and f in candidate['boxes']]
+                if ious and sum(ious) / len(ious) >= min_iou:
+                    pairs.append((sum(ious) / len(ious), track['track_id'], candidate['track_id']))
+
+        matched, consumed = set(), set()
+        for _, track_id, candidate_id in sorted(pairs, reverse=True):
+            if track_id in matched or candidate_id in consumed:
+                continue
+            matched.add(track_id)
+            consumed.add(candidate_id)
+            parent[find((k, track_id))] = find((k - 1, candidate_id))
+
+    merged = {}
+    for k, segment in enumerate(segments):
+        for track in segment['tracks']:
+            track = _clip_track(track, segment['owned_start'], segment['stop'])
+            if track is None:
+                continue  # seen only in the warm-up frames, which the previous segment reports
+            root = find((k, track['track_id']))
+            if root not in merged:
+                merged[root] = track
+            else:
+                target = merged[root]
+                target['first_frame'] = min(target['first_frame'], track['first_frame'])
+                target['last_frame'] = max(target['last_frame'], track['last_frame'])
+                target['max_confidence'] = max(target['max_confidence'], track['max_confidence'])
+                target['boxes'].update(track['boxes'])
+                target['confidences'].update(track['confidences'])
+
+    tracks = sorted(merged.values(), key=lambda t: (t['first_frame'], t['track_id']))
+    for track_id, track in enumerate(tracks, start=1):
+        track['track_id'] = track_id
+    return tracks
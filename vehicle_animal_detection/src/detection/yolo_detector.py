@@ -1,74 +1,225 @@
+import os
+import threading
+import time
+
 import cv2
 import numpy as np
 
+# Letterbox border colour (114 grey, as in the YOLO reference preprocessing) and pixel scale
+PAD_VALUE = 114 / 255.0
+_PIXEL_SCALE = np.float32(1 / 255.0)
+
+DEFAULT_CONFIG_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config', 'config.yaml')
+)
+
+# Config entries holding file paths, resolved relative to the config file
+_PATH_KEYS = [
+    ('models', 'yolo_tiny', 'weights'),
+    ('models', 'yolo_tiny', 'config'),
+    ('models', 'yolo_tiny', 'classes'),
+    ('models', 'classifier', 'path'),
+    ('models', 'cascade', 'path'),
+]
+# Files the application writes: always relative to the config file, never to the working directory
+_OUTPUT_PATH_KEYS = [
+    ('alerts', 'sinks', 'event_file', 'path'),
+    ('monitoring', 'latency_json'),
+    ('monitoring', 'latency_prometheus'),
+]
+
+
+def resolve_path(path, base_dir):
+    """Resolve ``path`` against the config directory; fall back to the working directory for old configs."""
+    if not path or os.path.isabs(path):
+        return path
+    candidate = os.path.normpath(os.path.join(base_dir, path))
+    if os.path.exists(candidate) or not os.path.exists(path):
+        return candidate
+    return os.path.abspath(path)
+
+
+def _resolve_entries(config, key_paths, resolve):
+    for keys in key_paths:
+        section = config
+        for key in keys[:-1]:
+            section = section.get(key) or {}
+        if keys[-1] in section:
+            section[keys[-1]] = resolve(section[keys[-1]])
+
+
+def load_config(config_path=None):
+    """Load the YAML config and make its model and output paths absolute, independent of the working directory."""
+    import yaml
+    config_path = os.path.abspath(config_path or DEFAULT_CONFIG_PATH)
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    base_dir = os.path.dirname(config_path)
+    _resolve_entries(config, _PATH_KEYS, lambda path: resolve_path(path, base_dir))
+    # Empty output paths keep meaning "do not write"
+    _resolve_entries(config, _OUTPUT_PATH_KEYS,
+                     lambda path: os.path.normpath(os.path.join(base_dir, path)) if path else path)
+    config['config_path'] = config_path
+    return config
+
+
+class DetectionBuffer:
+    """Union of the detections of the last ``buffer_size`` frames, with overlapping boxes removed."""
+
+    def __init__(self, buffer_size=3, debug=False):
+        self.buffer_size = buffer_size
+        self.debug = debug
+        self.frames = []
+
+    def update(self, frame_detections):
+        self.frames.append(frame_detections)
+        if len(self.frames) > self.buffer_size:
+            self.frames.pop(0)
+
+        all_detections = [det for frame_dets in self.frames for det in frame_dets]
+
+        final_detections = self._remove_duplicates(all_detections)
+
+        # 🔎 Debug: print how many detections found (models.yolo_tiny.debug; too slow for every frame otherwise)
+        if self.debug:
+            print(f"[YOLO DEBUG] Detections found: {len(final_detections)}")
+            for det in final_detections:
+                print(f"  -> {det}")
+
+        return final_detections
+
+    def _remove_duplicates(self, detections):
+        final_detections = []
+        for det in detections:
+            if not any(self._iou(det['bbox'], d['bbox']) > 0.5 for d in final_detections):
+                final_detections.append(det)
+        return final_detections
+
+    def _iou(self, box1, box2):
+        x1 = max(box1[0], box2[0])
+        y1 = max(box1[1], box2[1])
+        x2 = min(box1[2], box2[2])
+        y2 = min(box1[3], box2[3])
+
+        intersection = max(0, x2 - x1) * max(0, y2 - y1)
+        area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+        area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+        union = area1 + area2 - intersection
+
+        return intersection / union if union > 0 else 0
+
+
 class YOLOTinyDetector:
-    def __init__(self, config):
+    def __init__(self, config, net=None):
         self.config = config
-        self.net = cv2.dnn.readNet(
-            self.config['models']['yolo_tiny']['weights'],
-            self.config['models']['yolo_tiny']['config']
-        )
-        with open(self.config['models']['yolo_tiny']['classes'], 'r') as f:
+        yolo_cfg = self.config['models']['yolo_tiny']
+        start = time.perf_counter()
+        # A pre-initialised network (e.g. created at application start) can be reused as is
+        self.net = net if net is not None else cv2.dnn.readNet(yolo_cfg['weights'], yolo_cfg['config'])
+        self.load_time = time.perf_counter() - start
+        self.warmup_time = 0.0
+        self.input_size = tuple(yolo_cfg.get('input_size', (416, 416)))
+        with open(yolo_cfg['classes'], 'r') as f:
             self.classes = [line.strip() for line in f.readlines()]
 
         self.output_layers = self.net.getUnconnectedOutLayersNames()
         self.conf_threshold = self.config['models']['yolo_tiny']['confidence_threshold']
         self.nms_threshold = self.config['models']['yolo_tiny']['nms_threshold']
+        self.debug = yolo_cfg.get('debug', False)
         self.animal_classes = ['dog', 'cat', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe']
 
-        self.frame_buffer = []
-        self.buffer_size = 3  # smooth detections across frames
+        # Detections of the last frames (not the frames themselves, which callers may draw on)
+        self.detection_buffer = DetectionBuffer(buffer_size=3, debug=self.debug)  # smooth detections across frames
 
-    def detect(self, frame, return_detections=True):
-        # Optional buffering to smooth detections
-        self.frame_buffer.append(frame)
-        if len(self.frame_buffer) > self.buffer_size:
-            self.frame_buffer.pop(0)
+        # Reusable NCHW network input; the letterbox geometry is recomputed only when the frame size changes
+        self._blob = np.full((1, 3, self.input_size[1], self.input_size[0]), PAD_VALUE, dtype=np.float32)
+        self._letterbox = None
+        self._batch_blob = None
 
-        all_detections = []
-        for buffered_frame in self.frame_buffer:
-            all_detections.extend(self._detect_single_frame(buffered_frame))
+    def warmup(self, runs=1):
+        """Run forward passes on a blank blob so OpenCV's first-inference setup happens before real frames."""
+        start = time.perf_counter()
+        for _ in range(runs):
+            self.net.setInput(self._blob)
+            self.net.forward(self.output_layers)
+        self.warmup_time = time.perf_counter() - start
+        return self.warmup_time
 
-        final_detections = self._remove_duplicates(all_detections)
+    def detect(self, frame):
+        """Return the animal detections of ``frame``; the frame is never modified (see renderer.py)."""
+        # Optional buffering to smooth detections; each frame goes through the network once
+        return self.detection_buffer.update(self.detect_frame(frame))
 
-        # 🔎 Debug: print how many detections found
-        print(f"[YOLO DEBUG] Detections found: {len(final_detections)}")
-        for det in final_detections:
-            print(f"  -> {det}")
+    def detect_frame(self, frame):
+        """Detections of this frame alone, without the cross-frame buffer (used by worker processes)."""
+        return self._detect_single_frame(frame)
 
-        # Draw bounding boxes on frame
-        for det in final_detections:
-            x1, y1, x2, y2 = det['bbox']
-            color = (0, 255, 0)
-            label = f"{det['class']} ({det['confidence']:.2f})"
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-            cv2.putText(frame, label, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    def _prepare_letterbox(self, frame_shape):
+        height, width = frame_shape[:2]
+        in_w, in_h = self.input_size
+        scale = min(in_w / width, in_h / height)
+        new_w, new_h = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+        pad_x, pad_y = (in_w - new_w) // 2, (in_h - new_h) // 2
+        self._blob[...] = PAD_VALUE
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._roi = self._blob[0, :, pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+        self._letterbox = (frame_shape[:2], scale, pad_x, pad_y)
 
-        if return_detections:
-            return frame, final_detections
-        else:
-            return frame
+    def preprocess(self, frame):
+        """Letterbox ``frame`` (aspect ratio kept, one resize) into the reusable NCHW float32 blob."""
+        if self._letterbox is None or self._letterbox[0] != frame.shape[:2]:
+            self._prepare_letterbox(frame.shape)
+        resized = cv2.resize(frame, (self._resized.shape[1], self._resized.shape[0]),
+                             dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        # HWC BGR uint8 -> CHW RGB float32 in [0, 1], written straight into the blob
+        np.multiply(resized.transpose(2, 0, 1)[::-1], _PIXEL_SCALE, out=self._roi, dtype=np.float32)
+        return self._blob
+
+    def to_source_boxes(self, outputs, letterbox=None):
+        """Map normalized (cx, cy, w, h) network boxes to [x, y, w, h] in source-frame pixels."""
+        _, scale, pad_x, pad_y = letterbox or self._letterbox
+        in_w, in_h = self.input_size
+        w = outputs[:, 2] * in_w / scale
+        h = outputs[:, 3] * in_h / scale
+        x = (outputs[:, 0] * in_w - pad_x) / scale - w / 2
+        y = (outputs[:, 1] * in_h - pad_y) / scale - h / 2
+        return np.stack([x, y, w, h], axis=1).astype(int)
+
+    def detect_batch(self, frames):
+        """Detections of each frame (as ``detect_frame``) from one forward pass over a batch blob."""
+        if len(frames) == 1:
+            return [self.detect_frame(frames[0])]
+        if self._batch_blob is None or len(self._batch_blob) != len(frames):
+            self._batch_blob = np.empty((len(frames),) + self._blob.shape[1:], dtype=np.float32)
+        letterboxes = []
+        for n, frame in enumerate(frames):
+            self._batch_blob[n] = self.preprocess(frame)[0]
+            letterboxes.append(self._letterbox)
+        self.net.setInput(self._batch_blob)
+        layer_outputs = self.net.forward(self.output_layers)
+
+        # Region outputs are (N, rows, 85) or batch-major (N * rows, 85), depending on the OpenCV version
+        layer_outputs = [output.reshape(len(frames), -1, output.shape[-1]) for output in layer_outputs]
+        return [self._parse_outputs(np.vstack([output[n] for output in layer_outputs]), frame.shape, letterboxes[n])
+                for n, frame in enumerate(frames)]
 
     def _detect_single_frame(self, frame):
-        height, width = frame.shape[:2]
-        blob = cv2.dnn.blobFromImage(frame, 1/255.0, (416, 416), swapRB=True, crop=False)
-        self.net.setInput(blob)
+        self.net.setInput(self.preprocess(frame))
         layer_outputs = self.net.forward(self.output_layers)
 
-        boxes, confidences, class_ids = [], [], []
-
-        for output in layer_outputs:
-            for detection in output:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
-                if confidence > self.conf_threshold:
-                    center_x, center_y, w, h = (detection[:4] * np.array([width, height, width, height])).astype('int')
-                    x = int(center_x - w/2)
-                    y = int(center_y - h/2)
-                    boxes.append([x, y, w, h])
-                    confidences.append(float(confidence))
-                    class_ids.append(class_id)
+        outputs = np.vstack([output.reshape(-1, output.shape[-1]) for output in layer_outputs])
+        return self._parse_outputs(outputs, frame.shape, self._letterbox)
+
+    def _parse_outputs(self, outputs, frame_shape, letterbox):
+        height, width = frame_shape[:2]
+        scores = outputs[:, 5:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences > self.conf_threshold
+
+        boxes = self.to_source_boxes(outputs[keep], letterbox).tolist()
+        confidences = confidences[keep].astype(float).tolist()
+        class_ids = class_ids[keep].tolist()
 
         indices = cv2.dnn.NMSBoxes(boxes, confidences, self.conf_threshold, self.nms_threshold)
 
@@ -79,45 +230,55 @@ class YOLOTinyDetector:
             class_name = self.classes[class_ids[i]]
             if class_name in self.animal_classes:
                 animal_detections.append({
-                    'bbox': [x, y, x+w, y+h],
+                    'bbox': [max(0, x), max(0, y), min(width, x + w), min(height, y + h)],
                     'class': class_name,
                     'confidence': confidences[i]
                 })
 
         # 🔎 Debug: raw YOLO detections before filtering
-        print(f"[YOLO DEBUG] Frame raw detections: {len(animal_detections)}")
+        if self.debug:
+            print(f"[YOLO DEBUG] Frame raw detections: {len(animal_detections)}")
 
         return animal_detections
 
-    def _remove_duplicates(self, detections):
-        final_detections = []
-        for det in detections:
-            if not any(self._iou(det['bbox'], d['bbox']) > 0.5 for d in final_detections):
-                final_detections.append(det)
-        return final_detections
+def create_detector(config_path=None, config=None, warmup_runs=None):
+    """
+    Build a detector with its weights loaded and warmed up, reporting load and warm-up time.
 
-    def _iou(self, box1, box2):
-        x1 = max(box1[0], box2[0])
-        y1 = max(box1[1], box2[1])
-        x2 = min(box1[2], box2[2])
-        y2 = min(box1[3], box2[3])
+    Args:
+        config_path: YAML config (default: the package config); ignored when ``config`` is given.
+        config: An already loaded config (see ``load_config``).
+        warmup_runs: Warm-up forward passes (default: ``models.yolo_tiny.warmup_runs``, 1).
+    """
+    if config is None:
+        config = load_config(config_path)
+    detector = YOLOTinyDetector(config)
+    if warmup_runs is None:
+        warmup_runs = config['models']['yolo_tiny'].get('warmup_runs', 1)
+    if warmup_runs:
+        detector.warmup(warmup_runs)
+    print(f"[INFO] YOLO network loaded in {detector.load_time * 1000:.0f} ms, "
+          f"warm-up ({warmup_runs} runs) {detector.warmup_time * 1000:.0f} ms")
+    return detector
 
-        intersection = max(0, x2 - x1) * max(0, y2 - y1)
-        area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
-        area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
-        union = area1 + area2 - intersection
 
-        return intersection / union if union > 0 else 0
+# Process-wide detector shared by the GUI thread and workers
+yolo_detector = None
+_detector_lock = threading.Lock()
 
 
-# Create a singleton detector instance (optional)
-yolo_detector = None
-def detect(frame, return_detections=True):
+def init_detector(config_path=None, config=None, warmup_runs=None):
+    """Create the shared detector at application (or worker process) start."""
     global yolo_detector
-    if yolo_detector is None:
-        import yaml
-        with open('vehicle_animal_detection/config/config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
-        yolo_detector = YOLOTinyDetector(config)
-    return yolo_detector.detect(frame, return_detections)
+    with _detector_lock:
+        if yolo_detector is None:
+            yolo_detector = create_detector(config_path, config, warmup_runs)
+    return yolo_detector
+
+
+def get_detector(config_path=None):
+    return yolo_detector if yolo_detector is not None else init_detector(config_path)
+
 
+def detect(frame):
+    return get_detector().detect(frame)
@@ -0,0 +1,3 @@
+from .annotations import load_annotations, save_annotations, find_clips
+from .metrics import match_frame, average_precision, summarize_detections, ground_truth_events, alert_latencies
+from .harness import run_harness, expand_grid, pareto_front
@@ -0,0 +1,54 @@
+"""
+Ground truth for labeled clips.
+
+Each clip ``name.mp4`` (or .avi) has a ``name.csv`` next to it with one row per
+object and frame::
+
+    frame,class,x1,y1,x2,y2
+    120,cow,410,220,590,360
+    122,cow,414,221,596,362
+
+``frame`` is the 0-based frame index in the video and ``class`` a COCO name as
+reported by YOLO. A clip is annotated exhaustively: a frame without rows is an
+empty-road frame. Consecutive annotated frames form an event for alert latency.
+"""
+import csv
+import os
+
+FIELDS = ['frame', 'class', 'x1', 'y1', 'x2', 'y2']
+VIDEO_EXTENSIONS = ('.mp4', '.avi')
+
+
+def load_annotations(path):
+    """Return ``{frame_index: [{'bbox': [x1, y1, x2, y2], 'class': str}, ...]}``."""
+    annotations = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            annotations.setdefault(int(row['frame']), []).append({
+                'bbox': [float(row[k]) for k in ('x1', 'y1', 'x2', 'y2')],
+                'class': row['class'].strip()
+            })
+    return annotations
+
+
+def save_annotations(path, annotations):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for frame_index in sorted(annotations):
+            for obj in annotations[frame_index]:
+                writer.writerow([frame_index, obj['class']] + [int(round(v)) for v in obj['bbox']])
+
+
+def find_clips(directory):
+    """``(video_path, annotation_path)`` for every video in ``directory`` that has a sibling CSV."""
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        annotation_path = os.path.join(directory, stem + '.csv')
+        if ext.lower() in VIDEO_EXTENSIONS and os.path.exists(annotation_path):
+            clips.append((os.path.join(directory, name), annotation_path))
+    return clips
@@ -0,0 +1,258 @@
+"""
+Accuracy-versus-throughput evaluation of detector and pipeline settings.
+
+Every variant (a set of config overrides) runs over every labeled clip in its
+own worker process. A run records:
+    - precision/recall at the operating threshold and mAP@0.5 of the per-frame
+      YOLO detections on the sampled frames,
+    - event-level alert latency, missed events and false alarms of the smoothed
+      alert state (the signal the sign and Arduino receive),
+    - wall-clock fps and CPU time per processed frame.
+Results are pooled per variant and written with a Pareto column (no other
+variant has both higher mAP and higher fps).
+
+Variants run in parallel with one OpenCV thread each, so fps is comparable
+between variants of one run; use ``--workers 1`` for absolute numbers.
+
+Usage:
+    python -m src.evaluation.harness clips/ --grid confidence_threshold=0.2,0.3,0.5 frame_skip=1,2,4 input_size=320,416
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .annotations import find_clips, load_annotations
+from .metrics import match_frame, summarize_detections, ground_truth_events, alert_latencies
+
+# Overridable settings and where they live in the config
+VARIANT_KEYS = {
+    'confidence_threshold': ('models', 'yolo_tiny', 'confidence_threshold'),
+    'nms_threshold': ('models', 'yolo_tiny', 'nms_threshold'),
+    'input_size': ('models', 'yolo_tiny', 'input_size'),
+    'frame_skip': ('performance', 'frame_skip'),
+}
+# Pipeline settings that are not config entries
+PIPELINE_KEYS = {'smoothing_frames': 5, 'buffer_size': 3}
+
+_SHORT_NAMES = {'confidence_threshold': 'conf', 'nms_threshold': 'nms', 'input_size': 'size',
+                'frame_skip': 'skip', 'smoothing_frames': 'smooth', 'buffer_size': 'buffer'}
+
+DEFAULT_GRID = {
+    'confidence_threshold': [0.2, 0.3, 0.5],
+    'frame_skip': [1, 2, 4],
+    'input_size': [320, 416],
+}
+
+
+def variant_name(variant):
+    return ' '.join(f"{_SHORT_NAMES.get(k, k)}={v}" for k, v in variant.items())
+
+
+def expand_grid(grid):
+    """Cartesian product of ``{key: [values]}`` as a list of variant dicts."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def parse_grid(items):
+    """Parse ``key=v1,v2`` command-line items into a grid."""
+    def value(text):
+        for cast in (int, float):
+            try:
+                return cast(text)
+            except ValueError:
+                pass
+        return text
+
+    grid = {}
+    for item in items:
+        key, _, values = item.partition('=')
+        if key not in VARIANT_KEYS and key not in PIPELINE_KEYS:
+            raise ValueError(f"Unknown variant setting '{key}'; expected one of "
+                             f"{sorted(VARIANT_KEYS) + sorted(PIPELINE_KEYS)}")
+        grid[key] = [value(v) for v in values.split(',') if v]
+    return grid
+
+
+def apply_variant(config, variant):
+    for key, value in variant.items():
+        if key not in VARIANT_KEYS:
+            continue
+        if key == 'input_size' and not isinstance(value, (list, tuple)):
+            value = [value, value]
+        section = config
+        for part in VARIANT_KEYS[key][:-1]:
+            section = section.setdefault(part, {})
+        section[VARIANT_KEYS[key][-1]] = value
+    return config
+
+
+def _init_worker(threads):
+    import cv2
+    cv2.setNumThreads(threads)
+
+
+def evaluate_clip(config_path, variant, video_path, annotation_path, iou_threshold=0.5):
+    """Run one variant over one clip; returns the raw counts that ``summarize_variant`` pools."""
+    import cv2
+    from ..detection.yolo_detector import create_detector, load_config
+    from ..detection.cascade import maybe_cascade
+    from ..pipeline.stages import FramePipeline
+
+    config = apply_variant(load_config(config_path), variant)
+    detector = maybe_cascade(create_detector(config=config))
+    pipeline = FramePipeline.from_config(
+        config,
+        buffer_size=variant.get('buffer_size', PIPELINE_KEYS['buffer_size']),
+        smoothing_frames=variant.get('smoothing_frames', PIPELINE_KEYS['smoothing_frames'])
+    )
+    frame_skip = config['performance']['frame_skip']
+    annotations = load_annotations(annotation_path)
+    scored, gt_counts, states = [], {}, []
+
+    def on_frame(index, frame, frame_detections, state, smoothed_detections):
+        states.append((index, state))
+        # Precision/recall score the detector's own output on the frame, before buffering
+        frame_scored, frame_counts = match_frame(frame_detections, annotations.get(index, []), iou_threshold)
+        scored.extend(frame_scored)
+        for name, count in frame_counts.items():
+            gt_counts[name] = gt_counts.get(name, 0) + count
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        frames = pipeline.run(cap, itertools.count(0, frame_skip), detector=detector, on_frame=on_frame)
+    finally:
+        cap.release()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    index = frames * frame_skip
+
+    events = ground_truth_events([f for f in annotations if f < index], max_gap=frame_skip)
+    latencies, missed, false_alarms = alert_latencies(events, states)
+    return {
+        'variant': variant, 'clip': os.path.basename(video_path),
+        'frames': frames, 'source_frames': index, 'wall_seconds': wall, 'cpu_seconds': cpu,
+        'scored': scored, 'gt_counts': gt_counts,
+        'events': len(events), 'missed_events': missed, 'false_alarms': false_alarms,
+        'latencies_s': [frames_late / fps if fps else float(frames_late) for frames_late in latencies]
+    }
+
+
+def summarize_variant(runs):
+    """Pool the runs of one variant over all clips into one report row."""
+    scored = [s for run in runs for s in run['scored']]
+    gt_counts = {}
+    for run in runs:
+        for name, count in run['gt_counts'].items():
+            gt_counts[name] = gt_counts.get(name, 0) + count
+    detection = summarize_detections(scored, gt_counts)
+    frames = sum(run['frames'] for run in runs)
+    wall = sum(run['wall_seconds'] for run in runs)
+    events = sum(run['events'] for run in runs)
+    latencies = sorted(l for run in runs for l in run['latencies_s'])
+    return {
+        'variant': variant_name(runs[0]['variant']),
+        **{k: v for k, v in runs[0]['variant'].items()},
+        'precision': detection['precision'],
+        'recall': detection['recall'],
+        'mAP': detection['mAP'],
+        'event_recall': (events - sum(run['missed_events'] for run in runs)) / events if events else 1.0,
+        'alert_latency_mean_s': sum(latencies) / len(latencies) if latencies else 0.0,
+        'alert_latency_max_s': latencies[-1] if latencies else 0.0,
+        'false_alarms': sum(run['false_alarms'] for run in runs),
+        'fps': frames / wall if wall else 0.0,
+        'realtime_factor_fps': sum(run['source_frames'] for run in runs) / wall if wall else 0.0,
+        'cpu_ms_per_frame': sum(run['cpu_seconds'] for run in runs) * 1000 / frames if frames else 0.0,
+        'clips': len(runs),
+    }
+
+
+def pareto_front(rows, quality='mAP', speed='fps'):
+    """Mark rows that no other row beats on both ``quality`` and ``speed``."""
+    for row in rows:
+        row['pareto'] = not any(
+            other[quality] >= row[quality] and other[speed] >= row[speed]
+            and (other[quality] > row[quality] or other[speed] > row[speed])
+            for other in rows
+        )
+    return rows
+
+
+def run_harness(clips, variants, config_path=None, workers=None, iou_threshold=0.5):
+    """
+    Evaluate every variant on every ``(video_path, annotation_path)`` clip in parallel.
+
+    Returns:
+        list: One summary row per variant, sorted by fps, with a ``pareto`` flag.
+    """
+    from ..detection.yolo_detector import load_config
+
+    config_path = load_config(config_path)['config_path']
+    runs = {}
+    ctx = mp.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=ctx,
+                             initializer=_init_worker, initargs=(1,)) as executor:
+        futures = {
+            executor.submit(evaluate_clip, config_path, variant, video_path, annotation_path, iou_threshold): v
+            for v, variant in enumerate(variants) for video_path, annotation_path in clips
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            runs.setdefault(futures[future], []).append(result)
+            print(f"[INFO] {done}/{len(futures)} {variant_name(result['variant'])} on {result['clip']}: "
+                  f"{result['frames'] / result['wall_seconds']:.1f} fps")
+
+    rows = [summarize_variant(runs[v]) for v in sorted(runs)]
+    return sorted(pareto_front(rows), key=lambda row: row['fps'])
+
+
+def write_report(rows, out_dir='Results'):
+    os.makedirs(out_dir, exist_ok=True)
+    fields = []
+    for row in rows:
+        fields.extend(k for k in row if k not in fields)
+    paths = {}
+    for name, selected in (('detector_variants.csv', rows), ('detector_pareto.csv', [r for r in rows if r['pareto']])):
+        paths[name] = os.path.join(out_dir, name)
+        with open(paths[name], 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(selected)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy vs throughput of detector settings on labeled clips.")
+    parser.add_argument('clips', help="Directory of videos with sibling annotation CSVs")
+    parser.add_argument('--config', default=None, help="YAML config (default: the package config)")
+    parser.add_argument('--grid', nargs='*', default=None,
+                        help="Settings to sweep, e.g. confidence_threshold=0.2,0.3 frame_skip=1,2")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--iou', type=float, default=0.5, help="IoU for a true positive")
+    parser.add_argument('--out-dir', default='Results')
+    args = parser.parse_args(argv)
+
+    clips = find_clips(args.clips)
+    if not clips:
+        parser.error(f"No annotated clips in {args.clips}")
+    variants = expand_grid(parse_grid(args.grid) if args.grid else DEFAULT_GRID)
+    print(f"[INFO] {len(variants)} variants x {len(clips)} clips")
+
+    rows = run_harness(clips, variants, args.config, args.workers, args.iou)
+    print(f"{'variant':<40} {'P':>6} {'R':>6} {'mAP':>6} {'ev.R':>6} {'lat s':>6} {'fps':>7} {'cpu ms':>7}")
+    for row in rows:
+        print(f"{row['variant']:<40} {row['precision']:>6.3f} {row['recall']:>6.3f} {row['mAP']:>6.3f} "
+              f"{row['event_recall']:>6.3f} {row['alert_latency_mean_s']:>6.2f} {row['fps']:>7.1f} "
+              f"{row['cpu_ms_per_frame']:>7.1f}{'  *' if row['pareto'] else ''}")
+    paths = write_report(rows, args.out_dir)
+    print(f"[INFO] Report written to {paths['detector_variants.csv']} (Pareto front: {paths['detector_pareto.csv']})")
+    return rows
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Detection and alert metrics: VOC-style matching and AP, and event-level alert latency.
+"""
+from ..detection.smoothing import DetectionSmoother
+
+
+def match_frame(detections, ground_truth, iou_threshold=0.5):
+    """
+    Greedily match one frame's detections (highest confidence first) to its ground truth.
+
+    Returns:
+        tuple: A tuple containing:
+            - list: ``(class, confidence, is_true_positive)`` per detection
+            - dict: number of ground-truth objects per class
+    """
+    gt_counts = {}
+    for obj in ground_truth:
+        gt_counts[obj['class']] = gt_counts.get(obj['class'], 0) + 1
+
+    matched = set()
+    scored = []
+    for det in sorted(detections, key=lambda d: d['confidence'], reverse=True):
+        best, best_iou = None, iou_threshold
+        for g, obj in enumerate(ground_truth):
+            if g in matched or obj['class'] != det['class']:
+                continue
+            iou = DetectionSmoother.iou(det['bbox'], obj['bbox'])
+            if iou >= best_iou:
+                best, best_iou = g, iou
+        if best is not None:
+            matched.add(best)
+        scored.append((det['class'], det['confidence'], best is not None))
+    return scored, gt_counts
+
+
+def average_precision(scored, n_ground_truth):
+    """All-point interpolated AP from ``(confidence, is_true_positive)`` pairs of one class."""
+    if n_ground_truth == 0:
+        return 0.0
+    tp = fp = 0
+    recalls, precisions = [], []
+    for _, is_tp in sorted(scored, key=lambda s: s[0], reverse=True):
+        tp += is_tp
+        fp += not is_tp
+        recalls.append(tp / n_ground_truth)
+        precisions.append(tp / (tp + fp))
+    # Precision envelope, then area under the recall steps
+    for i in range(len(precisions) - 2, -1, -1):
+        precisions[i] = max(precisions[i], precisions[i + 1])
+    ap, previous_recall = 0.0, 0.0
+    for recall, precision in zip(recalls, precisions):
+        ap += (recall - previous_recall) * precision
+        previous_recall = recall
+    return ap
+
+
+def summarize_detections(scored, gt_counts):
+    """
+    Precision and recall at the operating threshold, and mAP over the ground-truth classes.
+
+    Args:
+        scored: ``(class, confidence, is_true_positive)`` of every detection.
+        gt_counts: Ground-truth objects per class.
+    """
+    tp = sum(1 for _, _, is_tp in scored if is_tp)
+    n_gt = sum(gt_counts.values())
+    per_class = {
+        name: average_precision([(c, t) for cls, c, t in scored if cls == name], count)
+        for name, count in gt_counts.items() if count
+    }
+    return {
+        'precision': tp / len(scored) if scored else 0.0,
+        'recall': tp / n_gt if n_gt else 0.0,
+        'mAP': sum(per_class.values()) / len(per_class) if per_class else 0.0,
+        'ap_per_class': per_class
+    }
+
+
+def ground_truth_events(annotated_frames, max_gap=1):
+    """Group annotated frame indices into ``(start, end)`` events; gaps up to ``max_gap`` frames are bridged."""
+    events = []
+    for frame_index in sorted(annotated_frames):
+        if events and frame_index - events[-1][1] <= max_gap:
+            events[-1][1] = frame_index
+        else:
+            events.append([frame_index, frame_index])
+    return [tuple(event) for event in events]
+
+
+def alert_latencies(events, states, grace_frames=0):
+    """
+    Frames from each event's start to the first processed frame with an alert.
+
+    Args:
+        events: ``(start, end)`` frame ranges from ``ground_truth_events``.
+        states: ``(frame_index, state)`` of every processed frame, in order ("NONE" = no alert).
+        grace_frames: Frames after an event's end during which a late alert still counts.
+
+    Returns:
+        tuple: A tuple containing:
+            - list: latency in frames of every detected event
+            - int: number of missed events
+            - int: number of alert onsets outside any event (false alarms)
+    """
+    latencies, missed = [], 0
+    alerting = [frame_index for frame_index, state in states if state != "NONE"]
+    for start, end in events:
+        hit = next((f for f in alerting if start <= f <= end + grace_frames), None)
+        if hit is None:
+            missed += 1
+        else:
+            latencies.append(hit - start)
+
+    false_alarms = 0
+    previous = "NONE"
+    for frame_index, state in states:
+        if state != "NONE" and previous == "NONE":
+            if not any(start <= frame_index <= end + grace_frames for start, end in events):
+                false_alarms += 1
+        previous = state
+    return latencies, missed, false_alarms
@@ -1,7 +1,6 @@
 import sys
 import cv2
 import numpy as np
-import yaml
 import time
 
 from PyQt5.QtWidgets import (
@@ -11,60 +10,13 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap
 
-from ..detection.yolo_detector import detect
-from ..classification.classifier import Classifier
-
-# Try to import pyserial gracefully
-try:
-    import serial
-except Exception:
-    serial = None
-
-
-# --------------------------- Detection Smoother ---------------------------
-class DetectionSmoother:
-    def __init__(self, smoothing_frames=5):
-        self.smoothing_frames = smoothing_frames
-        self.detection_history = []
-
-    def update(self, current_detections):
-        self.detection_history.append(current_detections)
-        if len(self.detection_history) > self.smoothing_frames:
-            self.detection_history.pop(0)
-
-    def get_smoothed_detections(self):
-        if not self.detection_history:
-            return []
-        smoothed_detections = []
-        all_detections = [det for frame_dets in self.detection_history for det in frame_dets]
-        for det in all_detections:
-            similar_dets = [d for d in all_detections if self.iou(det['bbox'], d['bbox']) > 0.3]
-            if len(similar_dets) >= 2:
-                avg_bbox = self.average_bbox([d['bbox'] for d in similar_dets])
-                avg_conf = sum(d['confidence'] for d in similar_dets) / len(similar_dets)
-                smoothed_detections.append({
-                    'bbox': avg_bbox,
-                    'class': det.get('class', None),
-                    'confidence': avg_conf
-                })
-        return smoothed_detections
-
-    @staticmethod
-    def average_bbox(bboxes):
-        avg_bbox = [sum(box[i] for box in bboxes) / len(bboxes) for i in range(4)]
-        return [int(coord) for coord in avg_bbox]
-
-    @staticmethod
-    def iou(box1, box2):
-        x1 = max(box1[0], box2[0])
-        y1 = max(box1[1], box2[1])
-        x2 = min(box1[2], box2[2])
-        y2 = min(box1[3], box2[3])
-        intersection = max(0, x2 - x1) * max(0, y2 - y1)
-        area1 = max(0, (box1[2] - box1[0])) * max(0, (box1[3] - box1[1]))
-        area2 = max(0, (box2[2] - box2[0])) * max(0, (box2[3] - box2[1]))
-        union = area1 + area2 - intersection
-        return intersection / union if union > 0 else 0
+from ..detection.yolo_detector import load_config, init_detector, get_detector, DEFAULT_CONFIG_PATH
+from ..detection.renderer import DetectionRenderer, AsyncRenderer
+from ..detection.cascade import maybe_cascade
+from ..alerts.sinks import AlertDispatcher
+from ..monitoring.latency import LatencyRecorder
+from ..pipeline.parallel import ParallelDetector
+from ..pipeline.stages import FramePipeline
 
 
 # --------------------------- Processing Thread ---------------------------
@@ -74,135 +26,119 @@ class ProcessingThread(QThread):
     finished_signal = pyqtSignal(list)
     error_signal = pyqtSignal(str)
     alert_signal = pyqtSignal(str)
+    latency_signal = pyqtSignal(dict)
 
     def __init__(self, config, video_path, config_path):
         super().__init__()
         self.config = config
         self.video_path = video_path
         self.config_path = config_path
-        #self.classifier = Classifier(self.config_path)
-        self.detection_smoother = DetectionSmoother()
 
         self.last_state = None
         self.last_species = None
-        self.arduino = None
 
         self.cooldown = 0   # persistence counter
 
-        serial_cfg = self.config.get('serial', {}) if isinstance(self.config, dict) else {}
-        if serial_cfg.get('enabled', False):
-            if serial is None:
-                print("[WARNING] pyserial not installed.")
-            else:
-                port = serial_cfg.get('port', None)
-                baud = serial_cfg.get('baudrate', 9600)
-                if port:
-                    try:
-                        self.arduino = serial.Serial(port=port, baudrate=baud, timeout=1)
-                        time.sleep(2)
-                        print(f"[INFO] Arduino connected on {port} @ {baud}")
-                    except Exception as e:
-                        print(f"[WARNING] Could not connect to Arduino: {e}")
-                        self.arduino = None
-
-    def send_to_arduino(self, value):
-        if self.arduino:
-            try:
-                self.arduino.write((value + "\n").encode())
-                print(f"[SERIAL SENT] {value}")
-            except Exception as e:
-                print(f"[ERROR] Failed to send: {e}")
-
-    def send_alert(self, state):
+        self.monitoring_cfg = self.config.get('monitoring', {})
+        self.latency_recorder = LatencyRecorder()
+
+        # Serial, UDP, event-file and broker sinks each send on their own thread
+        self.alert_dispatcher = AlertDispatcher.from_config(self.config, self.latency_recorder)
+
+    def send_to_arduino(self, value, capture_time=None):
+        self.alert_dispatcher.dispatch(value, capture_time=capture_time)
+        print(f"[ALERT QUEUED] {value}")
+
+    def send_alert(self, state, capture_time=None):
         if state != self.last_state:
-            self.send_to_arduino(state)
+            self.send_to_arduino(state, capture_time)
             self.alert_signal.emit(state)
             self.last_state = state
 
     def run(self):
-        cap = cv2.VideoCapture(self.video_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
-        processed_frames = []
-
-        if total_frames == 0:
-            self.error_signal.emit("Video could not be opened or contains no frames.")
-            self.finished_signal.emit(processed_frames)
-            return
-
-        for i in range(0, total_frames, self.config['performance']['frame_skip']):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            frame = cv2.resize(frame, tuple(self.config['performance']['target_resolution']))
-            frame, detections = detect(frame, return_detections=True)
-            self.detection_smoother.update(detections)
-            smoothed_detections = self.detection_smoother.get_smoothed_detections()
-
-            detected = False
-            species = None
-
-            for detection in smoothed_detections:
-                x1, y1, x2, y2 = map(int, detection['bbox'])
-                h, w = frame.shape[:2]
-                x1, y1 = max(0, x1), max(0, y1)
-                x2, y2 = min(w - 1, x2), min(h - 1, y2)
-                if x2 <= x1 or y2 <= y1:
-                    continue
-
-                # YOLO already gives class → no classifier needed
-                detected = True
-                species = detection['class'].upper()
-
-                # Draw bounding box & label (confidence directly from YOLO)
-                label = f"{species}"
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(frame, label, (x1, y1 - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-                break  # only use first detection
-
-   
-
-            # --------------- UPDATED SERIAL LOGIC (LCD SAFE) ---------------
-            # ---------------------- RELIABLE SERIAL LOGIC ----------------------
-            # If detection found, update species immediately
-            # --------------- UPDATED SERIAL LOGIC (LCD SAFE) ---------------
-            # ---------------------- RELIABLE SERIAL LOGIC ----------------------
-            # If detection found, update species immediately
-            if detected:
-                msg = species
-            else:
-                msg = "NONE"
-
-            # Always send message if different OR if enough time passed
-            current_time = time.time()
-
-            # Send only if changed AND at least 1 second passed
-            # Send ONLY when YOLO state changes
-            if msg != self.last_state:
-                self.send_alert(msg)
-                self.last_state = msg
-
-            # --------------------------------------------------------------
-
-            processed_frames.append(frame)
-            self.frame_processed_signal.emit(frame)
-
-            try:
-                progress_value = int((i + 1) / total_frames * 100)
-            except:
-                progress_value = 0
-            self.progress_signal.emit(progress_value)
-
-        cap.release()
-        if self.arduino:
-            try:
-                self.arduino.close()
-            except:
-                pass
-
-        self.finished_signal.emit(processed_frames)
+        self.processed_frames = []
+        cap = renderer = pool = None
+        try:
+            cap = cv2.VideoCapture(self.video_path)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+            if total_frames == 0:
+                self.error_signal.emit("Video could not be opened or contains no frames.")
+                return
+
+            if self.config['performance'].get('render', True):
+                renderer = AsyncRenderer(self._on_rendered, DetectionRenderer(font_scale=0.9, show_confidence=False))
+
+            report_every = self.monitoring_cfg.get('report_every', 50)
+            frame_skip = self.config['performance']['frame_skip']
+            frame_indices = range(0, total_frames, frame_skip)
+
+            # Detection in worker processes reading frames from shared memory, or on this thread
+            workers = self.config['performance'].get('detector_workers', 0)
+            if workers:
+                frame_shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+                try:
+                    pool = ParallelDetector(self.config['config_path'], frame_shape, workers=workers,
+                                            slots=self.config['performance'].get('frame_slots') or None)
+                except (RuntimeError, TimeoutError) as e:
+                    print(f"[WARNING] Detector workers unavailable, detecting on this thread: {e}")
+                if pool is not None and self.config['models'].get('cascade', {}).get('enabled', False):
+                    print("[WARNING] The cascade gate runs in-thread only; detector workers run YOLO on every frame")
+
+            # Buffer, second-stage classifier (its model loads on the first batch), smoothing and alerts
+            pipeline = FramePipeline.from_config(self.config, on_alert=self.send_alert,
+                                                 recorder=self.latency_recorder, renderer=renderer)
+            # Normally created and warmed up when the window opened; optionally gated by the 32x32 CNN
+            detector = maybe_cascade(get_detector(self.config_path), self.config) if pool is None else None
+
+            def on_frame(i, frame, detections, state, smoothed_detections):
+                try:
+                    progress_value = int((i + 1) / total_frames * 100)
+                except:
+                    progress_value = 0
+                self.progress_signal.emit(progress_value)
+
+                if report_every and (i // frame_skip) % report_every == 0:
+                    self.latency_signal.emit(self.latency_recorder.snapshot())
+
+            pipeline.run(cap, frame_indices, detector=detector, pool=pool, on_frame=on_frame)
+
+            if pool is not None:
+                print(f"[INFO] Detector worker metrics: {pool.metrics()}")
+        except Exception as e:
+            print(f"[ERROR] Video processing failed: {type(e).__name__}: {e}")
+            self.error_signal.emit(f"Video processing failed: {e}")
+        finally:
+            # Worker processes, the render thread and the sink threads must not outlive a failed run
+            if pool is not None:
+                pool.close()
+            if cap is not None:
+                cap.release()
+            if renderer is not None:
+                renderer.close()
+            self.alert_dispatcher.close()
+            self._report_latency()
+            self.finished_signal.emit(self.processed_frames)
+
+    def _report_latency(self):
+        print(f"[INFO] Alert sink metrics: {self.alert_dispatcher.metrics()}")
+        self.latency_signal.emit(self.latency_recorder.snapshot())
+        try:
+            self.latency_recorder.export(
+                json_path=self.monitoring_cfg.get('latency_json'),
+                prometheus_path=self.monitoring_cfg.get('latency_prometheus')
+            )
+        except OSError as e:
+            print(f"[WARNING] Could not export latency metrics: {e}")
+
+    def _on_rendered(self, frame, meta):
+        # Runs on the render thread; Qt queues the signal to the GUI thread
+        max_size = self.config['gui'].get('display_max_size')
+        if max_size and max(frame.shape[:2]) > max_size:
+            scale = max_size / max(frame.shape[:2])
+            frame = cv2.resize(frame, (int(frame.shape[1] * scale), int(frame.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        self.processed_frames.append(frame)
+        self.frame_processed_signal.emit(frame)
 
 
 # --------------------------- GUI Main Window ---------------------------
@@ -211,8 +147,14 @@ class MainWindow(QMainWindow):
         super().__init__(parent)
         self.config_path = config_path
 
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        # Model paths in the config are resolved relative to the config file
+        self.config = load_config(config_path)
+        try:
+            # Load and warm up YOLO now rather than on the first frame of the first video
+            init_detector(config=self.config)
+        except (cv2.error, OSError) as e:
+            # A missing classes file raises OSError rather than cv2.error
+            print(f"[ERROR] Could not load the YOLO network: {e}")
 
         self.setWindowTitle(self.config['gui']['window_title'])
         self.setGeometry(
@@ -267,6 +209,7 @@ class MainWindow(QMainWindow):
             self.processing_thread.frame_processed_signal.connect(self.update_image)
             self.processing_thread.finished_signal.connect(self.processing_finished)
             self.processing_thread.alert_signal.connect(self.show_alert)
+            self.processing_thread.latency_signal.connect(self.show_latency)
             self.processing_thread.start()
             self.process_button.setEnabled(False)
             self.load_button.setEnabled(False)
@@ -302,9 +245,14 @@ class MainWindow(QMainWindow):
     def show_alert(self, message: str):
         print("[ALERT]", message)
 
+    def show_latency(self, snapshot: dict):
+        for point, summary in snapshot['capture_to'].items():
+            print(f"[LATENCY] capture->{point}: p50 {summary['p50_ms']:.1f} ms, "
+                  f"p95 {summary['p95_ms']:.1f} ms, p99 {summary['p99_ms']:.1f} ms (n={summary['count']})")
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    main_window = MainWindow('vehicle_animal_detection/config/config.yaml')
+    main_window = MainWindow(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CONFIG_PATH)
     main_window.show()
     sys.exit(app.exec_())
@@ -0,0 +1 @@
+from .latency import FrameTimings, LatencyHistogram, LatencyRecorder
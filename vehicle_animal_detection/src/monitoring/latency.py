@@ -0,0 +1,180 @@
+"""
+Capture-to-alert latency instrumentation.
+
+Each processed frame carries a ``FrameTimings`` with ``time.perf_counter()``
+stamps for every pipeline stage. A ``LatencyRecorder`` turns them into
+fixed-bucket histograms, both per stage and end to end from capture, which
+can be read live (p50/p95/p99) or exported as JSON or Prometheus text.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+# Stage order through the pipeline; each stamp is taken when that stage finishes
+STAGES = ('capture', 'decode', 'detect', 'smooth', 'alert')
+
+
+def _default_bounds_ms(low=0.1, high=120000.0, factor=1.25):
+    bounds = []
+    value = low
+    while value < high:
+        bounds.append(round(value, 4))
+        value *= factor
+    bounds.append(high)
+    return bounds
+
+
+DEFAULT_BOUNDS_MS = _default_bounds_ms()
+
+
+class LatencyHistogram:
+    """Thread-safe histogram over exponentially growing millisecond buckets."""
+
+    def __init__(self, bounds_ms=DEFAULT_BOUNDS_MS):
+        self.bounds_ms = list(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms):
+        index = bisect.bisect_left(self.bounds_ms, value_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum_ms += value_ms
+            self.min_ms = min(self.min_ms, value_ms)
+            self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, q):
+        """Estimate the q-th percentile (0-100) by interpolating inside the bucket."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q / 100.0 * self.count
+            cumulative = 0
+            for index, bucket_count in enumerate(self.counts):
+                if cumulative + bucket_count >= rank and bucket_count:
+                    lower = self.bounds_ms[index - 1] if index > 0 else 0.0
+                    upper = self.bounds_ms[index] if index < len(self.bounds_ms) else self.max_ms
+                    lower, upper = max(lower, self.min_ms), min(upper, self.max_ms)
+                    fraction = (rank - cumulative) / bucket_count
+                    return lower + (upper - lower) * fraction
+                cumulative += bucket_count
+            return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.sum_ms / self.count if self.count else 0.0,
+            'min_ms': self.min_ms if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99)
+        }
+
+
+class FrameTimings:
+    """Per-frame stage stamps; ``mark`` records the end of a stage."""
+
+    __slots__ = ('frame_index', 'stamps')
+
+    def __init__(self, frame_index=None):
+        self.frame_index = frame_index
+        self.stamps = {}
+
+    def mark(self, stage, timestamp=None):
+        self.stamps[stage] = time.perf_counter() if timestamp is None else timestamp
+        return self.stamps[stage]
+
+    @property
+    def capture_time(self):
+        return self.stamps.get('capture')
+
+    def stage_durations_ms(self):
+        """Duration of each stage measured from the previous recorded stage."""
+        durations = {}
+        previous = None
+        for stage in STAGES:
+            if stage not in self.stamps:
+                continue
+            if previous is not None:
+                durations[stage] = (self.stamps[stage] - previous) * 1000
+            previous = self.stamps[stage]
+        return durations
+
+
+class LatencyRecorder:
+    def __init__(self, bounds_ms=DEFAULT_BOUNDS_MS):
+        self.bounds_ms = bounds_ms
+        self.stage = {}          # stage name -> histogram of that stage's duration
+        self.from_capture = {}   # stage or sink name -> histogram of capture-to-that-point latency
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, name):
+        with self._lock:
+            if name not in table:
+                table[name] = LatencyHistogram(self.bounds_ms)
+            return table[name]
+
+    def record_frame(self, timings):
+        for stage, duration_ms in timings.stage_durations_ms().items():
+            self._histogram(self.stage, stage).observe(duration_ms)
+        capture = timings.capture_time
+        if capture is None:
+            return
+        for stage, stamp in timings.stamps.items():
+            if stage != 'capture':
+                self._histogram(self.from_capture, stage).observe((stamp - capture) * 1000)
+
+    def record_since_capture(self, name, capture_time, now=None):
+        """Record a capture-to-``name`` latency, e.g. when a sink finished updating a sign."""
+        now = time.perf_counter() if now is None else now
+        self._histogram(self.from_capture, name).observe((now - capture_time) * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            stage, from_capture = dict(self.stage), dict(self.from_capture)
+        return {
+            'stage': {name: h.summary() for name, h in stage.items()},
+            'capture_to': {name: h.summary() for name, h in from_capture.items()}
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix='roadsync'):
+        lines = []
+        with self._lock:
+            groups = (('stage_latency_ms', 'stage', dict(self.stage)),
+                      ('capture_to_latency_ms', 'point', dict(self.from_capture)))
+        for metric, label, histograms in groups:
+            name = f"{prefix}_{metric}"
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(histograms.items()):
+                with histogram._lock:
+                    counts = list(histogram.counts)
+                    total, count = histogram.sum_ms, histogram.count
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds_ms + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label}="{key}"}} {total}')
+                lines.append(f'{name}_count{{{label}="{key}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_path=None, prometheus_path=None):
+        for path, text in ((json_path, self.to_json), (prometheus_path, self.to_prometheus)):
+            if not path:
+                continue
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(text())
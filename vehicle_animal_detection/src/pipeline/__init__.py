@@ -0,0 +1,4 @@
+from .frame_ring import FrameRing
+from .parallel import ParallelDetector, encode_detections, decode_detections
+from .stages import FramePipeline, detect_in_thread
+from .sharded import plan_segments, process_video_sharded
@@ -0,0 +1,70 @@
+"""
+Fixed-size frame slots in one ``multiprocessing.shared_memory`` block.
+
+The capture side decodes straight into a slot and passes only the slot number to a
+detector process, which reads the frame in place. Slot ownership is tracked by the
+creating process (see ``ParallelDetector``), so the ring itself needs no locks.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def attach_shared_memory(name):
+    """Attach to an existing block without letting this process's resource tracker unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class FrameRing:
+    def __init__(self, slots, frame_shape, dtype=np.uint8, name=None):
+        """
+        Create (``name=None``) or attach to a ring of ``slots`` frames of at most ``frame_shape``.
+
+        Smaller frames fit in a slot too; their shape travels with the slot number.
+        """
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slot_nbytes * slots)
+        else:
+            self.shm = attach_shared_memory(name)
+        self._array = np.ndarray((slots, self.slot_nbytes), dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """Arguments to re-open the ring in another process: ``FrameRing(**ring.spec())``."""
+        return {'slots': self.slots, 'frame_shape': self.frame_shape, 'dtype': self.dtype.str, 'name': self.name}
+
+    def view(self, slot, shape=None):
+        """Writable array over ``slot`` (no copy), with ``shape`` if the frame is smaller than the slot."""
+        shape = tuple(shape) if shape is not None else self.frame_shape
+        nbytes = int(np.prod(shape)) * self.dtype.itemsize
+        return self._array[slot, :nbytes].view(self.dtype).reshape(shape)
+
+    def write(self, slot, frame):
+        if frame.nbytes > self.slot_nbytes:
+            raise ValueError(f"Frame of shape {frame.shape} does not fit a {self.frame_shape} slot")
+        view = self.view(slot, frame.shape)
+        view[...] = frame
+        return view
+
+    def close(self):
+        self._array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # a caller still holds a slot view; the mapping goes away with it
+        if self.owner:
+            self.shm.unlink()
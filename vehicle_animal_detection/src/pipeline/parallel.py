@@ -0,0 +1,228 @@
+"""
+YOLO inference in worker processes fed through a shared-memory frame ring.
+
+Frames are decoded straight into ring slots; workers get ``(slot, shape)`` and read
+the frame in place, and only compact detection records (an N x 6 float32 array)
+come back. Results are yielded in capture order, so smoothing and alert logic in
+the caller see the same sequence as with in-thread detection.
+
+The CNN cascade (``models.cascade``) is in-thread only: its hold/force state
+follows consecutive frames, which a worker never sees, so workers always run YOLO.
+"""
+import multiprocessing as mp
+import os
+import queue
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .frame_ring import FrameRing
+
+# Columns of a detection record
+RECORD_FIELDS = ('x1', 'y1', 'x2', 'y2', 'class_id', 'confidence')
+
+# Frame gaps up to this size are skipped with grab() instead of a (slow) seek
+MAX_GRAB_GAP = 8
+
+
+def encode_detections(detections, class_ids):
+    """Pack detection dicts into an (N, 6) float32 array (see RECORD_FIELDS)."""
+    records = np.empty((len(detections), len(RECORD_FIELDS)), dtype=np.float32)
+    for row, det in zip(records, detections):
+        row[:4] = det['bbox']
+        row[4] = class_ids[det['class']]
+        row[5] = det['confidence']
+    return records
+
+
+def decode_detections(records, classes):
+    return [{
+        'bbox': [int(v) for v in row[:4]],
+        'class': classes[int(row[4])],
+        'confidence': float(row[5])
+    } for row in records]
+
+
+def _detection_worker(config_path, ring_spec, tasks, results, threads):
+    cv2.setNumThreads(threads)
+    ring = None
+    try:
+        from ..detection.yolo_detector import create_detector
+        detector = create_detector(config_path)
+        class_ids = {name: i for i, name in enumerate(detector.classes)}
+        ring = FrameRing(**ring_spec)
+        results.put(('ready', os.getpid(), detector.classes))
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, shape = task
+            start = time.perf_counter()
+            detections = detector.detect_frame(ring.view(slot, shape))
+            results.put((seq, encode_detections(detections, class_ids), time.perf_counter() - start))
+    except Exception as e:
+        results.put(('error', os.getpid(), f"{type(e).__name__}: {e}"))
+    finally:
+        if ring is not None:
+            ring.close()
+
+
+class ParallelDetector:
+    def __init__(self, config_path, frame_shape, workers=2, slots=None, threads_per_worker=1,
+                 ready_timeout=120.0):
+        """
+        Start ``workers`` detector processes, each loading (and warming up) its own network.
+
+        Args:
+            config_path: YAML config passed to ``create_detector`` in every worker.
+            frame_shape: (height, width, channels) of the largest frame.
+            workers: Number of detector processes.
+            slots: Frames in flight (default: two per worker plus two).
+            threads_per_worker: OpenCV threads per worker.
+            ready_timeout: Seconds to wait for the workers to load their networks.
+        """
+        ctx = mp.get_context('spawn')  # OpenCV/Qt state must not be forked
+        self.ring = FrameRing(slots or workers * 2 + 2, frame_shape)
+        self.free = list(range(self.ring.slots))
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.processes = [
+            ctx.Process(target=_detection_worker, daemon=True, name=f'detector-{n}',
+                        args=(config_path, self.ring.spec(), self.tasks, self.results, threads_per_worker))
+            for n in range(workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        self.classes = None
+        self.frames = 0
+        self.detect_seconds = 0.0
+        self._seq = 0
+        self._done = {}
+        deadline = time.monotonic() + ready_timeout
+        for _ in self.processes:
+            message = self._receive(timeout=max(0.0, deadline - time.monotonic()))
+            if message[0] != 'ready':
+                self.close()
+                raise RuntimeError(f"Detector worker failed to start: {message}")
+            self.classes = message[2]
+        print(f"[INFO] {workers} detector workers ready, {self.ring.slots} frame slots of {tuple(frame_shape)}")
+
+    def _receive(self, timeout=None):
+        waited = 0.0
+        while True:
+            try:
+                message = self.results.get(timeout=1.0)
+            except queue.Empty:
+                waited += 1.0
+                if not all(process.is_alive() for process in self.processes):
+                    raise RuntimeError("A detector worker exited unexpectedly")
+                if timeout is not None and waited >= timeout:
+                    raise TimeoutError("Timed out waiting for detector workers")
+                continue
+            if message[0] == 'error':
+                raise RuntimeError(f"Detector worker {message[1]} failed: {message[2]}")
+            return message
+
+    def _run(self, fill):
+        in_flight = deque()  # (seq, slot, shape, frame_index, meta) in capture order
+        exhausted = False
+        while True:
+            while not exhausted and self.free:
+                slot = self.free.pop()
+                item = fill(slot)
+                if item is None:
+                    self.free.append(slot)
+                    exhausted = True
+                    break
+                frame_index, shape, meta = item
+                self.tasks.put((self._seq, slot, shape))
+                in_flight.append((self._seq, slot, shape, frame_index, meta))
+                self._seq += 1
+            if not in_flight:
+                return
+
+            seq, slot, shape, frame_index, meta = in_flight.popleft()
+            while seq not in self._done:
+                message = self._receive()
+                self._done[message[0]] = message[1:]
+            records, seconds = self._done.pop(seq)
+            self.frames += 1
+            self.detect_seconds += seconds
+            try:
+                # The view is only valid until the caller asks for the next frame
+                yield frame_index, self.ring.view(slot, shape), decode_detections(records, self.classes), meta
+            finally:
+                self.free.append(slot)
+
+    def process_frames(self, frames):
+        """Detect on ``(frame_index, frame, meta)`` items; each frame is copied once into the ring."""
+        frames = iter(frames)
+
+        def fill(slot):
+            for frame_index, frame, meta in frames:
+                self.ring.write(slot, frame)
+                return frame_index, frame.shape, meta
+            return None
+
+        return self._run(fill)
+
+    def process_capture(self, cap, frame_indices, on_capture=None, on_decoded=None):
+        """
+        Decode frames of ``cap`` straight into ring slots and yield
+        ``(frame_index, frame_view, detections, meta)`` in order.
+
+        ``on_capture(frame_index)`` runs before each read and returns the frame's ``meta``;
+        ``on_decoded(meta)`` runs after it (e.g. for latency marks).
+        """
+        frame_indices = iter(frame_indices)
+        position = [None]  # index of the next frame the capture will return
+
+        def fill(slot):
+            for frame_index in frame_indices:
+                gap = frame_index - position[0] if position[0] is not None else -1
+                if 0 <= gap <= MAX_GRAB_GAP:
+                    for _ in range(gap):
+                        cap.grab()
+                else:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+                meta = on_capture(frame_index) if on_capture else None
+                view = self.ring.view(slot)
+                ok, frame = cap.read(view)
+                if not ok:
+                    return None
+                position[0] = frame_index + 1
+                if not np.shares_memory(frame, view):
+                    # The decoder allocated its own buffer (e.g. a frame size change)
+                    self.ring.write(slot, frame)
+                if on_decoded:
+                    on_decoded(meta)
+                return frame_index, frame.shape, meta
+            return None
+
+        return self._run(fill)
+
+    def metrics(self):
+        return {
+            'workers': len(self.processes),
+            'slots': self.ring.slots,
+            'frames': self.frames,
+            'detect_ms_avg': self.detect_seconds * 1000 / self.frames if self.frames else 0.0
+        }
+
+    def close(self):
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
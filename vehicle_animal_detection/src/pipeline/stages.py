@@ -0,0 +1,137 @@
+"""
+The per-frame video pipeline shared by the GUI thread and the headless tools.
+
+Frames come from ``detect_in_thread`` (one detector on the calling thread) or from
+``ParallelDetector.process_capture`` (detector worker processes) as
+``(frame_index, frame, detections, timings)``. ``FramePipeline`` then runs the
+remaining stages on each of them: detection buffer, optional classifier, smoother,
+optional tracker, the alert decision (with ``on_alert`` on every state change),
+latency recording and optional rendering. ``ProcessingThread``, sharded
+processing, the evaluation harness and the benchmark suite all drive it, so they
+measure and report the same pipeline.
+"""
+import cv2
+
+from ..detection.yolo_detector import DetectionBuffer
+from ..detection.smoothing import DetectionSmoother, alert_state
+from ..monitoring.latency import FrameTimings
+from .parallel import MAX_GRAB_GAP
+
+
+def start_timings(frame_index):
+    timings = FrameTimings(frame_index)
+    timings.mark('capture')
+    return timings
+
+
+def detect_in_thread(cap, frame_indices, detector):
+    """
+    Read ``frame_indices`` from ``cap`` and detect on this thread, yielding
+    ``(frame_index, frame, detections, timings)`` like ``ParallelDetector.process_capture``.
+    Stops at the first frame that cannot be read.
+    """
+    position = None  # index of the next frame the capture will return
+    for frame_index in frame_indices:
+        gap = frame_index - position if position is not None else -1
+        if 0 <= gap <= MAX_GRAB_GAP:
+            for _ in range(gap):
+                cap.grab()
+        else:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        timings = start_timings(frame_index)
+        ret, frame = cap.read()
+        if not ret:
+            return
+        position = frame_index + 1
+
+        # No resize here: the detector letterboxes the source frame and returns source-frame boxes
+        timings.mark('decode')
+        yield frame_index, frame, detector.detect_frame(frame), timings
+
+
+class FramePipeline:
+    def __init__(self, classifier=None, buffer_size=3, smoothing_frames=5, on_alert=None,
+                 recorder=None, renderer=None, tracker=None):
+        """
+        Args:
+            classifier: Optional ``Classifier`` run on the buffered detections of each frame.
+            buffer_size: Frames merged by the ``DetectionBuffer``.
+            smoothing_frames: Frames averaged by the ``DetectionSmoother``.
+            on_alert: ``on_alert(state, capture_time)``, called when the alert state changes.
+            recorder: Optional ``LatencyRecorder`` fed with every frame's timings.
+            renderer: Optional ``AsyncRenderer`` that draws the smoothed detections.
+            tracker: Optional ``IoUTracker`` updated with the smoothed detections.
+        """
+        self.classifier = classifier
+        self.detection_buffer = DetectionBuffer(buffer_size=buffer_size)
+        self.smoother = DetectionSmoother(smoothing_frames)
+        self.on_alert = on_alert
+        self.recorder = recorder
+        self.renderer = renderer
+        self.tracker = tracker
+        self.last_state = None
+        self.frames = 0
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """Pipeline with the second-stage classifier when ``models.classifier.enabled`` is set."""
+        from ..classification.classifier import Classifier
+
+        if config['models'].get('classifier', {}).get('enabled', False):
+            kwargs.setdefault('classifier', Classifier(config=config))
+        return cls(**kwargs)
+
+    def process(self, frame_index, frame, detections, timings, copy_frame=False):
+        """
+        Run the stages after detection on one frame.
+
+        Returns:
+            tuple: The frame's alert state and its smoothed detections.
+        """
+        # Union with the previous frames' detections, as YOLOTinyDetector.detect does
+        detections = self.detection_buffer.update(detections)
+        # Detection leaves the frame untouched, so the classifier crops from it directly
+        if self.classifier and detections:
+            detections = self.classifier.classify(frame, detections)
+        timings.mark('detect')
+        self.smoother.update(detections)
+        smoothed_detections = self.smoother.get_smoothed_detections()
+        timings.mark('smooth')
+        if self.tracker is not None:
+            self.tracker.update(smoothed_detections, frame_index)
+
+        state = alert_state(smoothed_detections, frame.shape)
+        # Alert ONLY when the state changes
+        if state != self.last_state:
+            if self.on_alert:
+                self.on_alert(state, timings.capture_time)
+            self.last_state = state
+        timings.mark('alert')
+        if self.recorder is not None:
+            self.recorder.record_frame(timings)
+
+        # Boxes are drawn on the render thread; a shared-memory slot is reused once the next frame is requested
+        if self.renderer is not None:
+            self.renderer.submit(frame.copy() if copy_frame else frame, smoothed_detections)
+        self.frames += 1
+        return state, smoothed_detections
+
+    def run(self, cap, frame_indices, detector=None, pool=None, on_frame=None):
+        """
+        Process ``frame_indices`` of ``cap`` with ``pool`` (a ``ParallelDetector``) or, without
+        one, with ``detector`` on this thread.
+
+        ``on_frame(frame_index, frame, detections, state, smoothed_detections)`` runs after each
+        frame; ``detections`` are that frame's own detector output, before buffering.
+        """
+        if pool is not None:
+            frames = pool.process_capture(cap, frame_indices, on_capture=start_timings,
+                                          on_decoded=lambda timings: timings.mark('decode'))
+        else:
+            frames = detect_in_thread(cap, frame_indices, detector)
+        for frame_index, frame, detections, timings in frames:
+            state, smoothed_detections = self.process(frame_index, frame, detections, timings,
+                                                      copy_frame=pool is not None)
+            if on_frame:
+                on_frame(frame_index, frame, detections, state, smoothed_detections)
+        return self.frames
@@ -0,0 +1,2 @@
+from .client import DetectionClient, ServiceBusy
+from .server import DetectionService, serve
@@ -0,0 +1,78 @@
+"""
+Blocking client for the detection service, for the GUI, recorders and test harnesses.
+"""
+import json
+import socket
+import time
+
+import numpy as np
+
+from .protocol import (MAGIC, REQUEST, RESPONSE, OP_DETECT, OP_METRICS, STATUS_OK, STATUS_BUSY,
+                       DEFAULT_PORT)
+
+
+class ServiceBusy(RuntimeError):
+    pass
+
+
+class DetectionClient:
+    def __init__(self, unix_path=None, host='127.0.0.1', port=DEFAULT_PORT, timeout=10.0):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _recv_exactly(self, n):
+        buffer = bytearray(n)
+        view = memoryview(buffer)
+        received = 0
+        while received < n:
+            count = self.sock.recv_into(view[received:])
+            if not count:
+                raise ConnectionError("Detection service closed the connection")
+            received += count
+        return buffer
+
+    def _request(self, op, frame=None):
+        if frame is not None:
+            frame = np.ascontiguousarray(frame, dtype=np.uint8)
+            height, width = frame.shape[:2]
+            channels = frame.shape[2] if frame.ndim == 3 else 1
+            self.sock.sendall(REQUEST.pack(MAGIC, op, height, width, channels, frame.nbytes))
+            self.sock.sendall(memoryview(frame).cast('B'))  # raw pixels, no copy or encoding
+        else:
+            self.sock.sendall(REQUEST.pack(MAGIC, op, 0, 0, 0, 0))
+        magic, status, length = RESPONSE.unpack(self._recv_exactly(RESPONSE.size))
+        if magic != MAGIC:
+            raise ConnectionError("Unexpected response from the detection service")
+        body = json.loads(bytes(self._recv_exactly(length)).decode('utf-8'))
+        if status == STATUS_BUSY:
+            raise ServiceBusy(body)
+        if status != STATUS_OK:
+            raise RuntimeError(f"Detection service error: {body}")
+        return body
+
+    def detect(self, frame, busy_retries=0, busy_backoff=0.005):
+        """Detections of ``frame`` (BGR uint8), retrying up to ``busy_retries`` times when the queue is full."""
+        for attempt in range(busy_retries + 1):
+            try:
+                return self._request(OP_DETECT, frame)
+            except ServiceBusy:
+                if attempt == busy_retries:
+                    raise
+                time.sleep(busy_backoff * (attempt + 1))
+
+    def metrics(self):
+        return self._request(OP_METRICS)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,32 @@
+"""
+Wire format of the local detection service.
+
+Every message is a fixed header followed by a payload:
+
+    request:  magic 'RSD1' | op (u8) | height (u16) | width (u16) | channels (u8) | payload length (u32)
+    response: magic 'RSD1' | status (u8) | payload length (u32)
+
+A ``detect`` request carries the raw BGR uint8 frame (height x width x channels,
+C order), so no JPEG encode/decode happens on either side. Responses carry JSON:
+the detection list, the metrics dict or an error message.
+"""
+import json
+import struct
+
+MAGIC = b'RSD1'
+REQUEST = struct.Struct('!4sBHHBI')
+RESPONSE = struct.Struct('!4sBI')
+
+OP_DETECT = 1
+OP_METRICS = 2
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_BUSY = 2   # queue full; retry later
+
+DEFAULT_PORT = 8765
+
+
+def pack_response(status, body):
+    payload = json.dumps(body).encode('utf-8')
+    return RESPONSE.pack(MAGIC, status, len(payload)) + payload
@@ -0,0 +1,224 @@
+"""
+Local asyncio detection service sharing one loaded YOLO model between clients.
+
+Requests from all connections go into one bounded queue. A batcher task takes the
+first waiting frame, keeps collecting until ``max_batch_size`` frames or
+``max_wait_ms`` have passed, and runs them as one ``detect_batch`` forward pass on
+a dedicated inference thread. A full queue answers ``STATUS_BUSY`` instead of
+growing, which keeps tail latency bounded under overload.
+
+Usage:
+    python -m src.service.server [--config config.yaml] [--unix /tmp/roadsync.sock | --port 8765]
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ..monitoring.latency import LatencyHistogram
+from .protocol import (MAGIC, REQUEST, OP_DETECT, OP_METRICS, STATUS_OK, STATUS_ERROR, STATUS_BUSY,
+                       DEFAULT_PORT, pack_response)
+
+
+class DetectionService:
+    def __init__(self, detector, max_batch_size=8, max_wait_ms=5.0, max_queue=64):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        # cv2.dnn networks are not thread-safe: all inference runs on this one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self._batcher = None
+
+        self.requests = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = {}   # batch size -> number of batches
+        self.latency = {name: LatencyHistogram() for name in ('queue_wait', 'inference', 'total')}
+        self._started = time.perf_counter()
+
+    def start(self):
+        self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def stop(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def detect(self, frame):
+        """Queue ``frame`` for the next batch and return its detections; None when the queue is full."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((frame, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return None
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return await future
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            start = time.perf_counter()
+            for _, _, queued in batch:
+                self.latency['queue_wait'].observe((start - queued) * 1000)
+            try:
+                results = await loop.run_in_executor(self._executor, self.detector.detect_batch,
+                                                     [frame for frame, _, _ in batch])
+                sizes = [len(batch)]
+            except Exception as e:
+                if len(batch) == 1:
+                    results, sizes = [e], []
+                else:
+                    # One bad frame must not fail the other requests of its batch: retry them one by one
+                    results, sizes = [], []
+                    for frame, _, _ in batch:
+                        try:
+                            results.append((await loop.run_in_executor(
+                                self._executor, self.detector.detect_batch, [frame]))[0])
+                            sizes.append(1)
+                        except Exception as frame_error:
+                            results.append(frame_error)
+            done = time.perf_counter()
+            self.latency['inference'].observe((done - start) * 1000)
+            for size in sizes:
+                self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+            for (_, future, queued), detections in zip(batch, results):
+                if future.done():  # the client may have gone away
+                    continue
+                if isinstance(detections, Exception):
+                    future.set_exception(detections)
+                else:
+                    self.latency['total'].observe((done - queued) * 1000)
+                    future.set_result(detections)
+
+    def metrics(self):
+        batches = sum(self.batch_sizes.values())
+        elapsed = time.perf_counter() - self._started
+        return {
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'batches': batches,
+            'mean_batch_size': sum(k * v for k, v in self.batch_sizes.items()) / batches if batches else 0.0,
+            'batch_sizes': {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            'frames_per_second': sum(k * v for k, v in self.batch_sizes.items()) / elapsed if elapsed else 0.0,
+            'latency_ms': {name: h.summary() for name, h in self.latency.items()}
+        }
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(REQUEST.size)
+                    magic, op, height, width, channels, length = REQUEST.unpack(header)
+                    if magic != MAGIC:
+                        writer.write(pack_response(STATUS_ERROR, "bad magic"))
+                        break
+                    payload = await reader.readexactly(length) if length else b''
+                except asyncio.IncompleteReadError:
+                    break  # client closed the connection (possibly mid-request)
+
+                if op == OP_METRICS:
+                    writer.write(pack_response(STATUS_OK, self.metrics()))
+                elif op == OP_DETECT:
+                    if channels != 3 or height == 0 or width == 0:
+                        # Rejected here so a malformed frame never reaches a shared batch
+                        writer.write(pack_response(STATUS_ERROR,
+                                                   f"expected a non-empty BGR frame, got {height}x{width}x{channels}"))
+                    elif length != height * width * channels:
+                        writer.write(pack_response(STATUS_ERROR, f"expected {height}x{width}x{channels} bytes"))
+                    else:
+                        frame = np.frombuffer(payload, dtype=np.uint8).reshape(height, width, channels)
+                        try:
+                            detections = await self.detect(frame)
+                        except Exception as e:
+                            writer.write(pack_response(STATUS_ERROR, f"{type(e).__name__}: {e}"))
+                        else:
+                            if detections is None:
+                                writer.write(pack_response(STATUS_BUSY, "queue full"))
+                            else:
+                                writer.write(pack_response(STATUS_OK, detections))
+                else:
+                    writer.write(pack_response(STATUS_ERROR, f"unknown op {op}"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(config_path=None, unix_path=None, host='127.0.0.1', port=DEFAULT_PORT,
+                max_batch_size=None, max_wait_ms=None, max_queue=None):
+    """Load the detector once and serve it until cancelled (Unix socket if ``unix_path``, else TCP)."""
+    from ..detection.yolo_detector import create_detector
+
+    detector = create_detector(config_path)
+    service_cfg = detector.config.get('service', {})
+    service = DetectionService(
+        detector,
+        max_batch_size=max_batch_size or service_cfg.get('max_batch_size', 8),
+        max_wait_ms=max_wait_ms if max_wait_ms is not None else service_cfg.get('max_wait_ms', 5.0),
+        max_queue=max_queue or service_cfg.get('max_queue', 64)
+    )
+    service.start()
+
+    unix_path = unix_path or service_cfg.get('unix_socket')
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        server = await asyncio.start_unix_server(service.handle_connection, path=unix_path)
+        print(f"[INFO] Detection service listening on {unix_path}")
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        print(f"[INFO] Detection service listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        print(f"[INFO] Detection service metrics: {service.metrics()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve YOLO detection to local clients with dynamic batching.")
+    parser.add_argument('--config', default=None, help="YAML config (default: the package config)")
+    parser.add_argument('--unix', default=None, help="Unix socket path (default: TCP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch-size', type=int, default=None)
+    parser.add_argument('--max-wait-ms', type=float, default=None)
+    parser.add_argument('--max-queue', type=int, default=None)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.config, args.unix, args.host, args.port,
+                          args.max_batch_size, args.max_wait_ms, args.max_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()